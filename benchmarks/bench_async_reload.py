@@ -0,0 +1,93 @@
+"""Measure event-loop latency while the global config is reloaded, calling reload_config
+on the loop against awaiting areload_config. A ticker task sleeps 1 ms at a time and
+records how late it wakes up.
+
+Usage:
+    uv run python benchmarks/bench_async_reload.py
+    uv run python benchmarks/bench_async_reload.py --size 50 --formats json
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from pi_conf import areload_config, cache, reload_config, set_config
+
+TICK = 0.001
+
+
+def write_config(path: str, fmt: str, size_mb: float):
+    ## Each section is roughly 75 bytes in either format
+    sections = int(size_mb * 1024 * 1024 / 75)
+    with open(path, "w") as fp:
+        if fmt == "json":
+            fp.write("{")
+            fp.write(
+                ",".join(
+                    f'"service_{i}": {{"host": "host-{i}.example.com", "port": {8000 + i % 1000}}}'
+                    for i in range(sections)
+                )
+            )
+            fp.write("}")
+        else:
+            for i in range(sections):
+                fp.write(f'[service_{i}]\nhost = "host-{i}.example.com"\n')
+                fp.write(f"port = {8000 + i % 1000}\n")
+
+
+async def ticker(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def measure(reload) -> tuple[float, list]:
+    lags: list = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(0.05)  ## Let the ticker settle
+    start = time.perf_counter()
+    await reload()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    return elapsed, lags
+
+
+def report(label: str, elapsed: float, lags: list):
+    lags = sorted(lags)
+    p99 = lags[int(len(lags) * 0.99)] if lags else 0.0
+    print(
+        f"      {label:<15} reload={elapsed:>6.2f} s  ticks={len(lags):>5}  "
+        f"median lag={statistics.median(lags) * 1e3:>6.2f} ms  p99={p99 * 1e3:>7.2f} ms  "
+        f"max={lags[-1] * 1e3:>8.2f} ms"
+    )
+
+
+async def sync_reload():
+    reload_config()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=10, help="File size in MB")
+    parser.add_argument("--formats", default="json,toml")
+    args = parser.parse_args()
+    cache.set_parse_cache(enabled=False)  ## Each reload parses the file again
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in args.formats.split(","):
+            path = os.path.join(tmpdir, f"config.{fmt}")
+            write_config(path, fmt, args.size)
+            print(f"{fmt:<5} {os.path.getsize(path) / 1024 / 1024:.1f} MiB file")
+            set_config(path)
+            report("reload_config", *asyncio.run(measure(sync_reload)))
+            report("areload_config", *asyncio.run(measure(areload_config)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark merging a freshly loaded 50k key config into the global one, as
+`set_config` and `reload_config` do with `_update_converted`, against `update`,
+which copies every nested subtree and list so the source is never shared.
+
+Usage:
+    uv run python benchmarks/bench_attrdict_merge.py
+"""
+
+import timeit
+
+from pi_conf import AttrDict, Config
+
+SECTIONS = 500
+KEYS_PER_SECTION = 100
+
+
+def make_source() -> Config:
+    d = {
+        f"section_{i}": {
+            **{f"key_{j}": j for j in range(KEYS_PER_SECTION - 1)},
+            "hosts": [{"name": f"host-{j}", "port": 8000 + j} for j in range(4)],
+        }
+        for i in range(SECTIONS)
+    }
+    return Config.from_dict(d)
+
+
+def legacy_convert(cls, value):
+    """The previous _convert_value, re-converting any dict that isn't a `cls`"""
+    if isinstance(value, dict) and not isinstance(value, cls):
+        result = AttrDict()
+        for k, v in value.items():
+            dict.__setitem__(result, k, legacy_convert(cls, v))
+        return result
+    elif isinstance(value, list):
+        return [legacy_convert(cls, v) for v in value]
+    return value
+
+
+def legacy_update(target: Config, source: dict):
+    for k, v in dict(source).items():
+        dict.__setitem__(target, k, legacy_convert(type(target), v))
+
+
+def main():
+    source = make_source()
+    n_keys = SECTIONS * KEYS_PER_SECTION
+    number = 5
+    legacy = timeit.timeit(lambda: legacy_update(Config(), source), number=number) / number
+    fast = timeit.timeit(lambda: Config()._update_converted(source), number=number) / number
+    print(f"merge {n_keys} keys, copying update  {legacy * 1e3:>9.2f} ms")
+    print(f"merge {n_keys} keys, converted merge {fast * 1e3:>9.2f} ms ({legacy / fast:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time Config.diff_config between two configs that differ in a single leaf, for configs of
+growing size. Snapshots frozen with reuse share their unchanged sections, so their
+diff only descends along the path to the changed leaf and checks the siblings on it by
+identity, here that is the flat top level of every service. Frozen configs built
+separately skip the sections whose cached hashes differ straight to their changed keys,
+equal sections and mutable configs are walked in full.
+
+Usage:
+    uv run python benchmarks/bench_diff.py
+    uv run python benchmarks/bench_diff.py --sections 1000,25000 --repeat 10
+"""
+
+import argparse
+import time
+
+from pi_conf import Config, FrozenConfig
+
+
+def make_dict(sections: int, rps: int = 0) -> dict:
+    ## Four nodes per section: the section, host, limits and limits.rps
+    d = {f"service_{i}": {"host": f"host-{i}", "limits": {"rps": i}} for i in range(sections)}
+    d[f"service_{sections // 2}"]["limits"]["rps"] = rps
+    return d
+
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", default="2500,25000,250000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for sections in [int(s) for s in args.sections.split(",")]:
+        old, new = Config.from_dict(make_dict(sections)), Config.from_dict(make_dict(sections, 1))
+        old_frozen = old.freeze_config()
+        new_frozen = new.freeze_config()
+        new_reused = FrozenConfig.from_dict(new, reuse=old_frozen)
+        assert old.diff_config(new).changed == [f"service_{sections // 2}.limits.rps"]
+
+        mutable = timed(lambda: old.diff_config(new), args.repeat)
+        frozen = timed(lambda: old_frozen.diff_config(new_frozen), args.repeat)
+        reused = timed(lambda: old_frozen.diff_config(new_reused), args.repeat)
+        print(
+            f"{sections * 4:>8} nodes  mutable={mutable * 1e3:>8.2f} ms  "
+            f"frozen={frozen * 1e3:>8.2f} ms  frozen with reuse={reused * 1e3:>8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compare a cold parse of each config format against loading its sidecar from the
+disk cache, as a new process would after another one parsed the file.
+
+Usage:
+    uv run python benchmarks/bench_disk_cache.py
+    uv run python benchmarks/bench_disk_cache.py --sizes 1,10 --formats toml,json
+
+The pure-Python YAML loader takes minutes to parse the 50 MB file.
+"""
+
+import argparse
+import configparser
+import json
+import os
+import tempfile
+import time
+
+from pi_conf import cache
+from pi_conf.config import _parse_config_file
+from pi_conf.module_check import has_yaml
+
+if has_yaml:
+    import yaml
+
+FORMATS = ["toml", "json", "ini", "yaml"]
+
+
+def make_dict(size_mb: float) -> dict:
+    ## Each section is roughly 75 bytes in any of the formats
+    return {
+        f"service_{i}": {"host": f"host-{i}.example.com", "port": 8000 + i % 1000, "debug": "no"}
+        for i in range(int(size_mb * 1024 * 1024 / 75))
+    }
+
+
+def write_config(path: str, fmt: str, d: dict):
+    with open(path, "w") as fp:
+        if fmt == "toml":
+            for name, section in d.items():
+                fp.write(f"[{name}]\n")
+                fp.write(f"host = \"{section['host']}\"\nport = {section['port']}\n")
+                fp.write(f"debug = \"{section['debug']}\"\n")
+        elif fmt == "json":
+            json.dump(d, fp)
+        elif fmt == "ini":
+            parser = configparser.ConfigParser()
+            parser.read_dict({k: {kk: str(vv) for kk, vv in v.items()} for k, v in d.items()})
+            parser.write(fp)
+        else:
+            yaml.safe_dump(d, fp)
+
+
+def measure(path: str, fmt: str, size_mb: float, cache_dir: str):
+    ext = f".{fmt}"
+    start = time.perf_counter()
+    _parse_config_file(path, ext)
+    cold = time.perf_counter() - start
+
+    disk_cache = cache.DiskCache(enabled=True, directory=cache_dir)
+    disk_cache.get_or_parse(path, ext, _parse_config_file)  ## Writes the sidecar
+    disk_cache = cache.DiskCache(enabled=True, directory=cache_dir)
+    start = time.perf_counter()
+    disk_cache.get_or_parse(path, ext, _parse_config_file)
+    cached = time.perf_counter() - start
+    assert disk_cache.hits == 1
+
+    actual_mb = os.path.getsize(path) / 1024 / 1024
+    print(
+        f"{fmt:<5} {actual_mb:>6.1f} MiB  parse={cold * 1e3:>9.1f} ms  "
+        f"sidecar={cached * 1e3:>8.1f} ms  speedup={cold / cached:>6.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="File sizes in MB")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size_mb in [float(s) for s in args.sizes.split(",")]:
+            d = make_dict(size_mb)
+            for fmt in args.formats.split(","):
+                if fmt == "yaml" and not has_yaml:
+                    print("yaml   skipped, pyyaml is not installed")
+                    continue
+                path = os.path.join(tmpdir, f"config_{size_mb:g}.{fmt}")
+                write_config(path, fmt, d)
+                measure(path, fmt, size_mb, os.path.join(tmpdir, "cache"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark converting wide, deep and list heavy dicts to a Config with the
+iterative converter, against the previous recursive converter.
+
+Usage:
+    uv run python benchmarks/bench_from_dict.py
+"""
+
+import sys
+import timeit
+
+from pi_conf import AttrDict, Config
+
+
+def legacy_from_dict(d: dict) -> AttrDict:
+    """The previous converter, recursing once per nesting level and list element"""
+    result = AttrDict()
+    for k, v in d.items():
+        dict.__setitem__(result, k, legacy_convert(v))
+    return result
+
+
+def legacy_convert(value):
+    if isinstance(value, dict) and not isinstance(value, AttrDict):
+        return legacy_from_dict(value)
+    elif isinstance(value, list):
+        return [legacy_convert(v) for v in value]
+    return value
+
+
+def wide() -> dict:
+    return {f"customer_{i}": {f"flag_{j}": j % 2 == 0 for j in range(20)} for i in range(10_000)}
+
+
+def deep() -> dict:
+    d: dict = {"leaf": 1}
+    for i in range(sys.getrecursionlimit() * 5):
+        d = {f"level_{i % 10}": d}
+    return d
+
+
+def list_heavy() -> dict:
+    return {
+        "rules": [
+            {"id": i, "match": [{"field": "path", "patterns": [str(i), str(i + 1)]}]}
+            for i in range(50_000)
+        ]
+    }
+
+
+def bench(label: str, func, number: int = 3) -> str:
+    try:
+        seconds = timeit.timeit(func, number=number) / number
+    except RecursionError:
+        return f"{label:<10} {'RecursionError':>12}"
+    return f"{label:<10} {seconds * 1e3:>9.1f} ms"
+
+
+def main():
+    for name, make in [("wide", wide), ("deep", deep), ("list-heavy", list_heavy)]:
+        d = make()
+        legacy = bench("legacy", lambda: legacy_from_dict(d))
+        iterative = bench("iterative", lambda: Config.from_dict(d))
+        print(f"{name:<11} {legacy} | {iterative}")
+
+
+if __name__ == "__main__":
+    main()
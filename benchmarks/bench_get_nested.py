@@ -0,0 +1,82 @@
+"""Microbenchmark reading the same dotted paths repeatedly with the previous
+get_nested, the current get_nested (cached path splitting) and a compiled
+accessor from AttrDict.compile_path, which reads its bound keys with chained dict
+lookups unrolled for paths of up to four keys.
+
+Usage:
+    uv run python benchmarks/bench_get_nested.py
+"""
+
+import timeit
+
+from pi_conf import Config
+from pi_conf.attr_dict import sentinel
+
+PATHS = [f"service_{i % 6}.limits.group_{i}.rps" for i in range(36)]
+
+
+def legacy_get_nested(d, keys, default=sentinel, list_item=0, split_delimiter="."):
+    """The previous get_nested, splitting the key string on every call"""
+    current = d
+    for key in keys.split(split_delimiter):
+        if isinstance(current, dict):
+            if key in current:
+                current = current[key]
+            elif default is not sentinel:
+                return default
+            else:
+                raise KeyError(f"Key not found: '{key}'")
+        elif list_item is not None and isinstance(current, list):
+            if list_item < len(current):
+                current = current[list_item]
+                if isinstance(current, dict) and key in current:
+                    current = current[key]
+                elif default is not sentinel:
+                    return default
+                else:
+                    raise KeyError(f"Key not found: '{key}'")
+            else:
+                if default is not sentinel:
+                    return default
+                raise KeyError(f"'{key}', List index out of range")
+        elif default is not sentinel:
+            return default
+        else:
+            raise KeyError(f"'{key}' is not a nested dictionary")
+    return current
+
+
+def main():
+    cfg = Config.from_dict(
+        {
+            f"service_{s}": {"limits": {f"group_{i}": {"rps": i} for i in range(36)}}
+            for s in range(6)
+        }
+    )
+    accessors = [cfg.compile_path(p) for p in PATHS]
+    number = 20_000
+    calls = number * len(PATHS)
+
+    def run_legacy():
+        for p in PATHS:
+            legacy_get_nested(cfg, p)
+
+    def run_get_nested():
+        for p in PATHS:
+            cfg.get_nested(p)
+
+    def run_accessor():
+        for accessor in accessors:
+            accessor()
+
+    for label, func in [
+        ("legacy get_nested", run_legacy),
+        ("get_nested", run_get_nested),
+        ("cfg.compile_path(...)()", run_accessor),
+    ]:
+        seconds = timeit.timeit(func, number=number)
+        print(f"{label:<20} {seconds / calls * 1e9:>8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
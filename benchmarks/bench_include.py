@@ -0,0 +1,92 @@
+"""Compare loading a whole shared config against loading only two of its sections with
+load_config(include=...), for each config format.
+
+Usage:
+    uv run python benchmarks/bench_include.py
+    uv run python benchmarks/bench_include.py --sections 1000 --formats yaml,ini
+"""
+
+import argparse
+import configparser
+import json
+import os
+import tempfile
+import time
+
+from pi_conf import cache, load_config
+from pi_conf.module_check import has_yaml
+
+FORMATS = ["toml", "json", "ini", "yaml"]
+INCLUDE = ["service_7", "service_42.limits"]
+
+
+def make_dict(sections: int) -> dict:
+    return {
+        f"service_{i}": {
+            "host": f"host-{i}.example.com",
+            "port": 8000 + i,
+            "debug": "no",
+            "limits": {"rps": i, "burst": 2 * i},
+        }
+        for i in range(sections)
+    }
+
+
+def write_config(path: str, fmt: str, d: dict):
+    with open(path, "w") as fp:
+        if fmt == "toml":
+            for name, s in d.items():
+                fp.write(f"[{name}]\nhost = \"{s['host']}\"\nport = {s['port']}\n")
+                fp.write(f"debug = \"{s['debug']}\"\n[{name}.limits]\n")
+                fp.write(f"rps = {s['limits']['rps']}\nburst = {s['limits']['burst']}\n")
+        elif fmt == "json":
+            json.dump(d, fp)
+        elif fmt == "ini":
+            ## INI has no nesting, the limits are flattened into the section
+            parser = configparser.ConfigParser()
+            parser.read_dict(
+                {k: {kk: str(vv) for kk, vv in v.items() if kk != "limits"} for k, v in d.items()}
+            )
+            parser.write(fp)
+        else:
+            import yaml
+
+            yaml.safe_dump(d, fp)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=300)
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    cache.set_parse_cache(enabled=False)  ## Measure the parse, not the cache
+
+    d = make_dict(args.sections)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in args.formats.split(","):
+            if fmt == "yaml" and not has_yaml:
+                print("yaml  skipped, pyyaml is not installed")
+                continue
+            path = os.path.join(tmpdir, f"config.{fmt}")
+            write_config(path, fmt, d)
+            include = INCLUDE if fmt != "ini" else [s.split(".")[0] for s in INCLUDE]
+            whole = best_of(lambda: load_config(path=path), args.repeat)
+            some = best_of(lambda: load_config(path=path, include=include), args.repeat)
+            print(
+                f"{fmt:<5} whole={whole * 1e3:>8.2f} ms  include={some * 1e3:>8.2f} ms  "
+                f"speedup={whole / some:>5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
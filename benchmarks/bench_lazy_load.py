@@ -0,0 +1,52 @@
+"""Compare eager and lazy conversion of a large shared config when a service only
+reads 2 of its 300 sections: time to build the Config and the peak memory
+allocated while doing so (not counting the already parsed dict).
+
+Usage:
+    uv run python benchmarks/bench_lazy_load.py
+"""
+
+import time
+import tracemalloc
+
+from pi_conf import Config
+
+SECTIONS = 300
+
+
+def make_dict() -> dict:
+    return {
+        f"service_{i}": {
+            f"group_{j}": {"enabled": True, "limit": j, "tags": [f"t{j}", {"weight": j}]}
+            for j in range(100)
+        }
+        for i in range(SECTIONS)
+    }
+
+
+def measure(label: str, d: dict, lazy: bool):
+    tracemalloc.start()
+    start = time.perf_counter()
+    cfg = Config.from_dict(d, lazy=lazy)
+    built = time.perf_counter() - start
+    total = 0
+    for section in ("service_0", "service_150"):
+        for group in cfg[section].values():
+            total += group.limit + group.tags[1].weight
+    used = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<6} build={built * 1e3:>8.1f} ms  build+read={used * 1e3:>8.1f} ms  "
+        f"peak={peak / 1024 / 1024:>7.2f} MiB"
+    )
+
+
+def main():
+    d = make_dict()
+    measure("eager", d, lazy=False)
+    measure("lazy", d, lazy=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare loading layered config files one after another with Config.load_config
+against load_configs, which parses them in a thread or process pool and merges them
+in a single pass.
+
+Usage:
+    uv run python benchmarks/bench_load_configs.py
+    uv run python benchmarks/bench_load_configs.py --files 32 --size 0.5 --formats json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from pi_conf import Config, cache, load_configs
+
+
+def write_layer(path: str, fmt: str, layer: int, size_mb: float):
+    ## Each section is roughly 75 bytes in either format, every layer overrides the ports
+    sections = int(size_mb * 1024 * 1024 / 75)
+    d = {
+        f"service_{i}": {"host": f"host-{i}.example.com", "port": 8000 + layer}
+        for i in range(sections)
+    }
+    with open(path, "w") as fp:
+        if fmt == "json":
+            json.dump(d, fp)
+        else:
+            for name, s in d.items():
+                fp.write(f"[{name}]\nhost = \"{s['host']}\"\nport = {s['port']}\n")
+
+
+def sequential(paths: list[str]) -> Config:
+    cfg = Config()
+    for path in paths:
+        cfg.load_config(path, overwrite=True)
+    return cfg
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--size", type=float, default=1, help="Size of each file in MB")
+    parser.add_argument("--formats", default="json,toml")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    cache.set_parse_cache(enabled=False)  ## Measure the parse, not the cache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in args.formats.split(","):
+            paths = [os.path.join(tmpdir, f"layer_{i}.{fmt}") for i in range(args.files)]
+            for i, path in enumerate(paths):
+                write_layer(path, fmt, i, args.size)
+            print(f"{fmt:<5} {args.files} files of {args.size:g} MB")
+
+            seq = best_of(lambda: sequential(paths), args.repeat)
+            print(f"      Config.load_config loop    {seq:>7.2f} s")
+            for executor in ("thread", "process"):
+                t = best_of(lambda: load_configs(paths, executor=executor), args.repeat)
+                print(f"      load_configs({executor + ')':<9}     {t:>7.2f} s  {seq / t:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Time merging a small overlay into configs of growing size with merge_into. The time
+follows the size of the overlay, not of the config it is merged into, because
+untouched branches are never visited.
+
+Usage:
+    uv run python benchmarks/bench_merge.py
+    uv run python benchmarks/bench_merge.py --sections 1000,100000 --overlay 100
+"""
+
+import argparse
+import time
+
+from pi_conf import Config
+from pi_conf.merge import merge_into
+
+
+def make_config(sections: int) -> Config:
+    return Config.from_dict(
+        {
+            f"service_{i}": {"host": f"host-{i}", "port": i, "limits": {"rps": i}}
+            for i in range(sections)
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", default="1000,10000,100000")
+    parser.add_argument("--overlay", type=int, default=10, help="Sections set by the overlay")
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    overlay = {f"service_{i}": {"limits": {"rps": -i}} for i in range(args.overlay)}
+    for sections in [int(s) for s in args.sections.split(",")]:
+        cfg = make_config(sections)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            merge_into(cfg, overlay, overwrite=True)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        print(f"{sections:>8} sections  merge={elapsed * 1e6:>8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
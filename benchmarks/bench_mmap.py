@@ -0,0 +1,83 @@
+"""Compare parsing a large local JSON or TOML config read through open_func against
+decoding it straight from a memory map (pi_conf.open_func.read_mapped).
+
+Usage:
+    uv run python benchmarks/bench_mmap.py
+    uv run python benchmarks/bench_mmap.py --size 20 --formats json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+from pi_conf import config
+from pi_conf.config import _parse_config_file
+
+
+def write_config(path: str, fmt: str, size_mb: float):
+    ## Each section is roughly 75 bytes in either format
+    sections = int(size_mb * 1024 * 1024 / 75)
+    with open(path, "w") as fp:
+        if fmt == "json":
+            d = {
+                f"service_{i}": {"host": f"host-{i}.example.com", "port": 8000 + i % 1000}
+                for i in range(sections)
+            }
+            json.dump(d, fp)
+        else:
+            for i in range(sections):
+                fp.write(f'[service_{i}]\nhost = "host-{i}.example.com"\n')
+                fp.write(f"port = {8000 + i % 1000}\n")
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def read_peak_mb(read) -> float:
+    """Peak Python allocations while reading the text, mapped pages aren't counted"""
+    tracemalloc.start()
+    text = read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del text
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=100, help="File size in MB")
+    parser.add_argument("--formats", default="json,toml")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in args.formats.split(","):
+            path = os.path.join(tmpdir, f"config.{fmt}")
+            write_config(path, fmt, args.size)
+            ext = f".{fmt}"
+            print(f"{fmt:<5} {os.path.getsize(path) / 1024 / 1024:.1f} MiB file")
+
+            with mock.patch.object(config, "read_mapped", lambda path: None):
+                parse = best_of(lambda: _parse_config_file(path, ext), args.repeat)
+            ## tomllib.load reads the bytes, then decodes them
+            read = (lambda: open(path, "rb").read().decode()) if fmt == "toml" else None
+            peak = read_peak_mb(read or (lambda: open(path).read()))
+            print(f"      open_func  parse={parse:>7.2f} s  read peak={peak:>7.1f} MiB")
+
+            parse = best_of(lambda: _parse_config_file(path, ext), args.repeat)
+            peak = read_peak_mb(lambda: config.read_mapped(path))
+            print(f"      mmap       parse={parse:>7.2f} s  read peak={peak:>7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
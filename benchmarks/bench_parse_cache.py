@@ -0,0 +1,48 @@
+"""Compare loading the same unchanged TOML file repeatedly, as a worker pool does for
+each job, with the parse cache on and off.
+
+Usage:
+    uv run python benchmarks/bench_parse_cache.py
+"""
+
+import os
+import tempfile
+import time
+
+from pi_conf import cache, load_config
+
+SECTIONS = 200
+LOADS = 200
+
+
+def write_config(path: str):
+    with open(path, "w") as fp:
+        for i in range(SECTIONS):
+            fp.write(f"[service_{i}]\nhost = 'host-{i}'\nport = {8000 + i}\n")
+            fp.write(f"tags = ['a', 'b', 'c']\nlimits = {{ rps = {i}, burst = {2 * i} }}\n\n")
+    os.utime(path, (time.time() - 60, time.time() - 60))  ## Outside the racy window
+
+
+def measure(label: str, path: str, enabled: bool):
+    cache.set_parse_cache(enabled=enabled)
+    start = time.perf_counter()
+    for _ in range(LOADS):
+        load_config(path=path)
+    elapsed = time.perf_counter() - start
+    info = cache.get_parse_cache().info()
+    print(
+        f"{label:<10} {elapsed / LOADS * 1e3:>7.3f} ms/load  "
+        f"hits={info.hits} misses={info.misses}"
+    )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "config.toml")
+        write_config(path)
+        measure("no cache", path, enabled=False)
+        measure("cache", path, enabled=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark the cost of capturing a Provenance stack at different stack depths.
+
+Compares the previous `inspect.stack()` based capture with the single walk of raw
+frames done by `ProvenanceManager.capture_frames`.
+
+Usage:
+    uv run python benchmarks/bench_provenance_capture.py
+"""
+
+import inspect
+import os
+import timeit
+
+from pi_conf.provenance import PROVENANCE_DEPTH, Provenance, ProvenanceManager, ProvenanceOp
+
+DEPTHS = [10, 50, 200]
+
+
+def legacy_capture(depth=None) -> list[str]:
+    """The previous implementation, calling inspect.stack() once per frame"""
+    stack = []
+    for i in range(len(inspect.stack())):
+        frame = inspect.stack()[i]
+        module_path = frame.filename
+        base_name = os.path.basename(module_path)
+        if os.path.basename(os.path.dirname(module_path)) == "pi_conf":
+            continue
+        stack.append(f"{base_name}::{frame.function}:{frame.lineno}")
+    if depth is not None:
+        return stack[-depth:][::-1]
+    return stack[::-1]
+
+
+def at_depth(depth: int, func):
+    """Call func with `depth` extra frames on the stack"""
+    if depth <= 0:
+        return func()
+    return at_depth(depth - 1, func)
+
+
+def bench(label: str, depth: int, func, number: int) -> None:
+    seconds = timeit.timeit(lambda: at_depth(depth, func), number=number)
+    print(f"{label:<28} depth={depth:<4} {seconds / number * 1e6:>12.1f} us/capture")
+
+
+def main():
+    for depth in DEPTHS:
+        bench("legacy inspect.stack()", depth, lambda: legacy_capture(PROVENANCE_DEPTH), 3)
+        bench(
+            "capture_frames",
+            depth,
+            lambda: ProvenanceManager.capture_frames(PROVENANCE_DEPTH),
+            2000,
+        )
+        bench("Provenance(...)", depth, lambda: Provenance("dict", ProvenanceOp.set), 2000)
+        bench(
+            "Provenance(...).stack",
+            depth,
+            lambda: Provenance("dict", ProvenanceOp.set).stack,
+            2000,
+        )
+
+
+if __name__ == "__main__":
+    main()
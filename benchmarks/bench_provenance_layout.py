@@ -0,0 +1,63 @@
+"""Compare the memory used by provenance records in the previous layout (a __dict__
+per record and a freshly built list of stack strings) with the slotted, interned
+Provenance records that share identical stacks.
+
+Usage:
+    uv run python benchmarks/bench_provenance_layout.py [events]
+"""
+
+import sys
+import tracemalloc
+
+from pi_conf.provenance import (
+    PROVENANCE_DEPTH,
+    Provenance,
+    ProvenanceOp,
+    format_frames,
+    get_provenance_manager,
+)
+
+SOURCES = [f"/etc/service-{i}/config.toml" for i in range(10)] + ["dict"]
+
+
+class LegacyProvenance:
+    """The previous layout, stack strings formatted into a new list per record"""
+
+    def __init__(self, source: str, operation: str):
+        self.source = source
+        self.operation = operation
+        self.stack = format_frames(get_provenance_manager().capture_frames(PROVENANCE_DEPTH))
+
+
+def build(factory, events: int, read_stack: bool) -> list:
+    records = []
+    for i in range(events):
+        ## Build a new string each time, as a path read from a file or str(Path) would
+        source = "".join(SOURCES[i % len(SOURCES)])
+        record = factory(source, ProvenanceOp.update if i % 2 else "update")
+        if read_stack:
+            record.stack
+        records.append(record)
+    return records
+
+
+def measure(label: str, factory, events: int, read_stack: bool) -> float:
+    tracemalloc.start()
+    records = build(factory, events, read_stack)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    print(f"{label:<36} {current / 1024 / 1024:>8.2f} MiB ({current / events:>6.1f} B/event)")
+    return current
+
+
+def main(events: int = 100_000):
+    print(f"events={events}")
+    legacy = measure("legacy __dict__ + list stack", LegacyProvenance, events, read_stack=True)
+    slotted = measure("slotted, stack not read", Provenance, events, read_stack=False)
+    slotted_read = measure("slotted, stack read", Provenance, events, read_stack=True)
+    print(f"reduction: {legacy / slotted:.1f}x unread, {legacy / slotted_read:.1f}x read")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,36 @@
+"""Stress the provenance manager with create/destroy cycles of Config objects and
+report its footprint and the traced memory along the way, which should stay flat.
+
+Usage:
+    uv run python benchmarks/bench_provenance_memory.py [cycles]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from pi_conf import Config
+from pi_conf.provenance import get_provenance_manager
+
+
+def main(cycles: int = 1_000_000):
+    pm = get_provenance_manager()
+    report_every = max(cycles // 10, 1)
+    tracemalloc.start()
+    for i in range(1, cycles + 1):
+        cfg = Config.from_dict({"a": i, "b": {"c": i}})
+        cfg.update({"d": i})
+        del cfg
+        if i % report_every == 0:
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            fp = pm.footprint()
+            print(
+                f"cycles={i:<9} traced={current / 1024:>9.1f} KiB peak={peak / 1024:>9.1f} KiB "
+                f"tracked={fp['objects']} events={fp['events']} manager={fp['bytes']} B"
+            )
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,114 @@
+"""Compare the peak RSS and time of loading a large JSON or YAML config with the default
+loader (parse to plain dicts, then convert) and with stream=True. Each load runs in
+its own process so that peak RSS isn't shared between them.
+
+Usage:
+    uv run python benchmarks/bench_streaming.py
+    uv run python benchmarks/bench_streaming.py --size 200 --formats json
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from pi_conf.module_check import has_yaml
+
+
+def write_config(path: str, fmt: str, size_mb: float):
+    ## Each section is roughly 150 bytes as JSON
+    d = {
+        f"service_{i}": {
+            "host": f"host-{i}.example.com",
+            "port": 8000 + i % 1000,
+            "tags": ["a", "b"],
+            "limits": {"rps": i, "burst": 2 * i},
+        }
+        for i in range(int(size_mb * 1024 * 1024 / 150))
+    }
+    with open(path, "w") as fp:
+        if fmt == "json":
+            json.dump(d, fp)
+        else:
+            import yaml
+
+            yaml.safe_dump(d, fp, default_flow_style=True, width=1 << 20)
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as fp:
+        return next(int(line.split()[1]) for line in fp if line.startswith(field))
+
+
+def rss_kb() -> int:
+    """Current RSS, resetting the peak to it on Linux so the peak of the load is seen"""
+    try:
+        with open("/proc/self/clear_refs", "w") as fp:
+            fp.write("5")
+        return _status_kb("VmRSS:")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss_kb() -> int:
+    try:
+        return _status_kb("VmHWM:")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def child(path: str, stream: bool):
+    from pi_conf import load_config
+
+    before = rss_kb()
+    start = time.perf_counter()
+    cfg = load_config(path=path, stream=stream)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_kb()
+    print(json.dumps({"seconds": elapsed, "peak_kb": peak - before, "sections": len(cfg)}))
+
+
+def measure(path: str, fmt: str, stream: bool):
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", path, "--stream", str(int(stream))],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    ).stdout
+    result = json.loads(out)
+    label = "stream" if stream else "default"
+    print(
+        f"{fmt:<5} {label:<8} time={result['seconds']:>7.2f} s  "
+        f"peak RSS growth={result['peak_kb'] / 1024:>8.1f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=100, help="File size in MB")
+    parser.add_argument("--formats", default="json,yaml")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--stream", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, bool(args.stream))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in args.formats.split(","):
+            if fmt == "yaml" and not has_yaml:
+                print("yaml  skipped, pyyaml is not installed")
+                continue
+            path = os.path.join(tmpdir, f"config.{fmt}")
+            write_config(path, fmt, args.size)
+            print(f"{fmt:<5} {os.path.getsize(path) / 1024 / 1024:.1f} MiB file")
+            measure(path, fmt, stream=False)
+            measure(path, fmt, stream=True)
+
+
+if __name__ == "__main__":
+    main()
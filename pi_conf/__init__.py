@@ -1,17 +1,31 @@
 from pi_conf.config import (
     AttrDict,
     Config,
+    FrozenConfig,
     ProvenanceDict,
     cfg,
+    cfg_snapshot,
+    find_config,
     load_config,
+    load_configs,
+    reload_config,
     set_config,
 )
+from pi_conf.aio import aload_config, areload_config, aset_config
 
 __all__ = [
     "load_config",
+    "load_configs",
     "set_config",
+    "reload_config",
+    "aload_config",
+    "aset_config",
+    "areload_config",
+    "find_config",
     "cfg",
     "Config",
+    "FrozenConfig",
+    "cfg_snapshot",
     "AttrDict",
     "ProvenanceDict",
 ]
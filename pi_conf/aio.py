@@ -0,0 +1,67 @@
+"""Async counterparts of the config loaders for asyncio services. Discovery, reads and
+parsing run in a small thread pool shared by all loads, so the event loop isn't blocked
+while a config is loaded or reloaded. See `set_executor` to size the pool."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+
+from pi_conf.config import Config, FrozenConfig, load_config, reload_config, set_config
+
+LOADER_THREADS = 4
+
+R = TypeVar("R")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _new_executor(max_workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pi-conf")
+
+
+def set_executor(max_workers: int = LOADER_THREADS) -> None:
+    """Set how many threads async loads run in, loads already running finish in the
+    previous pool
+
+    Args:
+        max_workers (int): Maximum number of configs loaded at the same time
+    """
+    global _executor
+    with _executor_lock:
+        previous, _executor = _executor, _new_executor(max_workers)
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the thread pool async loads run in, it is created on first use"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = _new_executor(LOADER_THREADS)
+    return _executor
+
+
+async def run_in_executor(func: Callable[..., R], *args: Any, **kwargs: Any) -> R:
+    """Run func(*args, **kwargs) in the loader thread pool without blocking the loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(func, *args, **kwargs))
+
+
+async def aload_config(*args: Any, **kwargs: Any) -> Config:
+    """Async `load_config`, takes the same arguments"""
+    return await run_in_executor(load_config, *args, **kwargs)
+
+
+async def aset_config(*args: Any, **kwargs: Any) -> Config:
+    """Async `set_config`, takes the same arguments"""
+    return await run_in_executor(set_config, *args, **kwargs)
+
+
+async def areload_config(*args: Any, **kwargs: Any) -> FrozenConfig:
+    """Async `reload_config`, takes the same arguments"""
+    return await run_in_executor(reload_config, *args, **kwargs)
@@ -3,7 +3,19 @@ import json
 import logging
 import os
 from dataclasses import fields, is_dataclass
-from typing import Any, Dict, Iterable, Optional, Type, TypeVar, cast
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Type,
+    TypeVar,
+    cast,
+)
 
 from pi_conf.module_check import has_stdlib_tomllib, has_toml_package, has_yaml
 
@@ -23,6 +35,150 @@ log = logging.getLogger(__name__)
 sentinel = object()
 _attr_dict_dont_overwrite = set([func for func in dir(dict) if getattr(dict, func)])
 
+PATH_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def _split_path(keys: str, split_delimiter: str) -> tuple[str, ...]:
+    """Split a dotted key path, cached as the same paths are read again and again"""
+    return tuple(keys.split(split_delimiter))
+
+
+def _nested_step(current: Any, key: str, list_item: Optional[int]) -> Any:
+    """Get key from current, stepping into item list_item when current is a list (or
+    the tuple a frozen list becomes)"""
+    if isinstance(current, dict):
+        if key in current:
+            return current[key]
+        raise KeyError(f"Key not found: '{key}'")
+    elif list_item is not None and isinstance(current, (list, tuple)):
+        if list_item < len(current):
+            current = current[list_item]
+            if isinstance(current, dict) and key in current:
+                return current[key]
+            raise KeyError(f"Key not found: '{key}'")
+        raise KeyError(f"'{key}', List index out of range: idx={list_item}, len={len(current)}")
+    raise KeyError(f"'{key}' is not a nested dictionary")
+
+
+_dict_get = dict.get
+_dict_getitem = dict.__getitem__
+
+## A node of the trie used by `AttrDict.get_many`: the child nodes by key, and the
+## indices of the requested paths that end at this node
+_PathTrie = tuple[Dict[str, Any], list[int]]
+
+
+def _trie_indices(node: _PathTrie) -> list[int]:
+    """Get the indices of every path that ends at or below node"""
+    indices = []
+    stack = [node]
+    while stack:
+        children, node_indices = stack.pop()
+        indices.extend(node_indices)
+        stack.extend(children.values())
+    return indices
+
+
+## A selection of subtrees used by `load_config(include=...)`: the selected keys of a
+## mapping, each mapped to the selection within it, or None to take the whole subtree
+IncludeTrie = Dict[str, Any]
+
+
+def _include_trie(paths: Iterable[str], split_delimiter: str = ".") -> IncludeTrie:
+    """Merge dotted paths into a selection trie, a path also selects everything below it"""
+    root: IncludeTrie = {}
+    for p in paths:
+        node: Optional[IncludeTrie] = root
+        *parents, last = _split_path(p, split_delimiter)
+        for key in parents:
+            child = node.setdefault(key, {})  # type: ignore[union-attr]
+            if child is None:
+                break  ## An ancestor is already selected whole
+            node = child
+        else:
+            node[last] = None  # type: ignore[index]
+    return root
+
+
+def _select(d: dict, trie: IncludeTrie) -> dict:
+    """Get the selected subtrees of d as a dict with the same nesting, sharing the
+    subtrees rather than copying them. Selected keys that are missing are skipped."""
+    result: dict = {}
+    created: list[tuple[dict, str]] = []  ## The intermediate dicts, parents first
+    stack = [(result, d, trie)]
+    while stack:
+        target, src, node = stack.pop()
+        for key, child in node.items():
+            if key not in src:
+                continue
+            value = src[key]
+            if child is None:
+                target[key] = value
+            elif isinstance(value, dict):
+                target[key] = {}
+                created.append((target, key))
+                stack.append((target[key], value, child))
+    for parent, key in reversed(created):
+        if not parent[key]:
+            del parent[key]  ## Nothing below it was found
+    return result
+
+
+def _get_path(current: Any, keys: tuple[str, ...], default: Any, list_item: Optional[int]) -> Any:
+    """Walk the split key path from current, see `AttrDict.get_nested`"""
+    ## Fast path, dict.get raises TypeError for anything that isn't a dict. Lists,
+    ## missing keys and unconverted dicts take the slow path below.
+    node = current
+    try:
+        for key in keys:
+            node = _dict_get(node, key, sentinel)
+            if node is sentinel:
+                break
+        else:
+            if not isinstance(node, dict) or isinstance(node, AttrDict):
+                return node
+    except TypeError:
+        pass
+
+    for key in keys:
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+            continue
+        try:
+            current = _nested_step(current, key, list_item)
+        except KeyError:
+            if default is not sentinel:
+                return default
+            raise
+    return current
+
+
+def _compile_walk(keys: tuple[str, ...]) -> Callable[[Any], Any]:
+    """Build a reader of the split key path made of chained `dict` lookups, unrolled
+    for paths of up to four keys. It raises KeyError or TypeError at the first step
+    that is missing or isn't a dict."""
+    get = _dict_getitem
+    if len(keys) == 1:
+        (k0,) = keys
+        return lambda d: get(d, k0)
+    if len(keys) == 2:
+        k0, k1 = keys
+        return lambda d: get(get(d, k0), k1)
+    if len(keys) == 3:
+        k0, k1, k2 = keys
+        return lambda d: get(get(get(d, k0), k1), k2)
+    if len(keys) == 4:
+        k0, k1, k2, k3 = keys
+        return lambda d: get(get(get(get(d, k0), k1), k2), k3)
+
+    def walk(d: Any) -> Any:
+        for key in keys:
+            d = get(d, key)
+        return d
+
+    return walk
+
 
 def _is_iterable_with_type(obj):
     try:
@@ -38,6 +194,186 @@ def _is_iterable_with_type(obj):
         return False, None
 
 
+def _is_converted_list(values: list) -> bool:
+    """Whether no element of the list, or of its nested lists, needs converting"""
+    stack = [values]
+    while stack:
+        for v in stack.pop():
+            if isinstance(v, dict):
+                if not isinstance(v, AttrDict):
+                    return False
+            elif isinstance(v, list):
+                stack.append(v)
+    return True
+
+
+_scalar_types = frozenset([str, int, float, bool, type(None)])
+_new_dict = dict.__new__
+_dict_update = dict.update
+
+
+def _new_attr_dict() -> "AttrDict":
+    """Create an empty AttrDict without the overhead of calling __init__"""
+    node = _new_dict(AttrDict)
+    node.__dict__ = node
+    return node
+
+
+def _raise_if_reserved_keys(d: dict) -> None:
+    """Raise if any key of d would overwrite a default dict attr/func"""
+    if not _attr_dict_dont_overwrite.isdisjoint(d):
+        k = next(k for k in d if k in _attr_dict_dont_overwrite)
+        raise ValueError(f"Error! config key={k} would overwrite a default dict attr/func")
+
+
+def _convert_tree(root: Any, source: Any, keep: Optional[type | tuple[type, ...]] = None) -> None:
+    """Fill root (an AttrDict or list) with a converted copy of source, nested dicts
+    become AttrDicts and nested lists are copied. Walks with an explicit stack so
+    there is no depth limit, values that are already a `keep` (default AttrDict) are
+    kept as they are, pass () to copy every dict."""
+    keep = AttrDict if keep is None else keep
+    stack = [(root, source)]
+    while stack:
+        target, src = stack.pop()
+        ## Copy everything in bulk, then replace the nested dicts and lists
+        if type(target) is list:
+            target.extend(src)
+            items: Iterable = enumerate(src)
+            setitem = list.__setitem__
+        else:
+            _raise_if_reserved_keys(src)
+            _dict_update(target, src)
+            items = src.items()
+            setitem = dict.__setitem__
+        for k, v in items:
+            if type(v) in _scalar_types:
+                continue
+            if isinstance(v, dict) and not isinstance(v, keep):
+                node: Any = _new_attr_dict()
+            elif isinstance(v, list):
+                node = []
+            else:
+                continue
+            stack.append((node, v))
+            setitem(target, k, node)
+
+
+def _parse_str(config_str: str, config_type: str) -> dict:
+    """Parse a config string of the given type (toml|json|ini|yaml) into a dict"""
+    if config_type == "toml":
+        if has_stdlib_tomllib:
+            d = tomllib.loads(config_str)  # type: ignore
+        elif has_toml_package:
+            d = toml_package.loads(config_str)  # type: ignore
+        else:
+            raise ImportError(
+                "TOML parsing requires Python 3.11+ (stdlib tomllib) or the 'toml' package."
+            )
+    elif config_type == "json":
+        d = json.loads(config_str)
+    elif config_type == "ini":
+        cfg_parser = configparser.ConfigParser()
+        cfg_parser.read_string(config_str)
+        d = {}
+        for section in cfg_parser.sections():
+            d[section] = {}
+            for k, v in cfg_parser.items(section):
+                d[section][k] = v
+    elif config_type == "yaml":
+        if not has_yaml:
+            raise Exception(
+                "Error! YAML not installed. If you would like to use YAML with pi-conf, "
+                'install it with `pip install pyyaml` or `pip install "pi-conf[yaml]"`'
+            )
+        d = yaml.safe_load(config_str)  # type: ignore
+    else:
+        raise Exception(f"Error! Unknown config_type '{config_type}'")
+    return d
+
+
+def _strict_equal(a: Any, b: Any) -> bool:
+    """a == b, except that leaves of different types are never equal, so 1, 1.0 and
+    True all differ. Dicts are compared by their items whatever their class, lists and
+    tuples by their items, and sets and frozensets by their elements, so a value equals
+    its frozen copy. Walks with an explicit stack so there is no depth limit."""
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if isinstance(a, dict):
+            if not isinstance(b, dict) or len(a) != len(b):
+                return False
+            pairs: Iterable = ((v, dict.get(b, k, sentinel)) for k, v in dict.items(a))
+        elif isinstance(a, (list, tuple)):
+            if not isinstance(b, (list, tuple)) or len(a) != len(b):
+                return False
+            pairs = zip(a, b)
+        else:
+            pairs = ((a, b),)
+        for x, y in pairs:
+            if x is y:
+                continue
+            if isinstance(x, (dict, list, tuple)):
+                stack.append((x, y))
+            elif isinstance(x, (set, frozenset)):
+                if not isinstance(y, (set, frozenset)):
+                    return False
+                if {(type(e), e) for e in x} != {(type(e), e) for e in y}:
+                    return False
+            elif type(x) is not type(y) or x != y:
+                return False
+    return True
+
+
+class ConfigDiff(NamedTuple):
+    """The dotted paths that differ between two configs, each list sorted. A changed
+    path is set in both but to different values, values of different types such as 1
+    and True differ. A subtree only one side has is reported at its root. A diff is
+    falsy if the configs are equal."""
+
+    added: list[str]
+    removed: list[str]
+    changed: list[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def _same_subtree(a: dict, b: dict) -> bool:
+    """Whether a and b can be skipped without walking them. Only frozen dicts are
+    compared here, their cached hashes rule out most changed subtrees at once and the
+    subtrees they share are the same objects, which the comparison doesn't enter."""
+    if not (isinstance(a, FrozenAttrDict) and isinstance(b, FrozenAttrDict)):
+        return False
+    if a._hash is None or a._hash != b._hash:
+        return False
+    return _strict_equal(a, b)
+
+
+def _diff(a: dict, b: dict, split_delimiter: str) -> ConfigDiff:
+    """Walk a and b together, descending only into dicts that differ"""
+    added: list[str] = []
+    removed: list[str] = []
+    changed: list[str] = []
+    stack: list[tuple[str, dict, dict]] = [("", a, b)]
+    while stack:
+        prefix, old, new = stack.pop()
+        for key, value in dict.items(old):
+            other = dict.get(new, key, sentinel)
+            if value is other:
+                continue
+            path = f"{prefix}{key}"
+            if other is sentinel:
+                removed.append(path)
+            elif isinstance(value, dict) and isinstance(other, dict):
+                if not _same_subtree(value, other):
+                    stack.append((path + split_delimiter, value, other))
+            elif not _strict_equal(value, other):
+                changed.append(path)
+        if len(new) != len(old) or removed:
+            added.extend(f"{prefix}{key}" for key in new if not dict.__contains__(old, key))
+    return ConfigDiff(sorted(added), sorted(removed), sorted(changed))
+
+
 class AttrDict(dict):
     """A dictionary class that allows referencing by attribute
     Example:
@@ -84,28 +420,30 @@ class AttrDict(dict):
         else:
             result = cast(T, AttrDict())
 
-        for k, v in d.items():
-            if k in _attr_dict_dont_overwrite:
-                raise ValueError(f"Error! config key={k} would overwrite a default dict attr/func")
-            result[k] = cls._convert_value(v, depth=depth + 1)
-
+        _convert_tree(result, d, cls)
         return result
 
     def __setitem__(self, key, value):
         super().__setitem__(key, self._convert_value(value, depth=1))
 
-    def __getattribute__(self, name: str) -> Any:
-        """Get an attribute from the dictionary.
-        This will allow you to access the dictionary keys as attributes.
-        Returning Any removes MyPy errors."""
-        return super().__getattribute__(name)
+    if TYPE_CHECKING:
+        ## Only declared for type checkers, a runtime override would slow down
+        ## every attribute and method lookup
+
+        def __getattribute__(self, name: str) -> Any:
+            """Get an attribute from the dictionary.
+            This will allow you to access the dictionary keys as attributes.
+            Returning Any removes MyPy errors."""
+            return super().__getattribute__(name)
 
     @classmethod
     def _convert_value(cls, value, depth: int):
         if isinstance(value, dict) and not isinstance(value, cls):
             return cls._from_dict(value, depth)
         elif isinstance(value, list):
-            return [cls._convert_value(v, depth) for v in value]
+            result: list = []
+            _convert_tree(result, value, cls)
+            return result
         return value
 
     def update(self, *args, **kwargs):
@@ -118,6 +456,20 @@ class AttrDict(dict):
         for k, v in dict(*args, **kwargs).items():
             self[k] = v  # This will call __setitem__, which converts the value
 
+    def _update_converted(self, other: "AttrDict"):
+        """Update from a freshly built AttrDict that nothing else holds, such as a just
+        loaded config. Its converted subtrees and lists are inserted as they are,
+        without walking or copying them, so they end up shared with other."""
+        items = {}
+        for k, v in other.items():
+            if isinstance(v, list):
+                if not _is_converted_list(v):
+                    v = self._convert_value(v, depth=1)
+            elif isinstance(v, dict) and not isinstance(v, AttrDict):
+                v = self._convert_value(v, depth=1)
+            items[k] = v
+        super().update(items)
+
     def get_nested(
         self,
         keys: str,
@@ -143,36 +495,114 @@ class AttrDict(dict):
             d.get_nested('x.y.z', None) == None
             d.get_nested("notfound") # raises KeyError
         """
-        current = self
-        for key in keys.split(split_delimiter):
-            if isinstance(current, dict):
-                if key in current:
-                    current = current[key]
-                elif default is not sentinel:
-                    return default
-                else:
-                    raise KeyError(f"Key not found: '{key}'")
-            elif list_item is not None and isinstance(current, list):
-                if list_item < len(current):
-                    current = current[list_item]
-                    if isinstance(current, dict) and key in current:
-                        current = current[key]
-                    elif default is not sentinel:
-                        return default
-                    else:
-                        raise KeyError(f"Key not found: '{key}'")
-                else:
-                    if default is not sentinel:
-                        return default
-                    else:
-                        raise KeyError(
-                            f"'{key}', List index out of range: idx={list_item}, len={len(current)}"
-                        )
-            elif default is not sentinel:
-                return default
-            else:
-                raise KeyError(f"'{key}' is not a nested dictionary")
-        return current
+        return _get_path(self, _split_path(keys, split_delimiter), default, list_item)
+
+    def get_many(
+        self,
+        paths: Iterable[str],
+        defaults: Optional[Dict[str, Any]] = None,
+        list_item: Optional[int] = 0,
+        split_delimiter: str = ".",
+        as_tuple: bool = False,
+    ) -> Dict[str, Any] | tuple:
+        """Get several nested values at once. The paths are merged into a prefix trie
+        so that each shared part of the tree is only walked once.
+        Args:
+            paths (Iterable[str]): The dotted key paths to get
+            defaults (Optional[dict]): Default values for paths that are not found,
+                keyed by path. Paths without one raise a KeyError like `get_nested`
+            list_item (int): If a key is a list, get the item at the index,
+                set to None to disable
+            as_tuple (bool): If True, return the values as a tuple in the order of paths
+        Returns:
+            dict | tuple: The values keyed by path, or a tuple of the values
+
+        Example:
+            d = AttrDict({"a":1, "b":{"c":3, "d":4}})
+            d.get_many(["a", "b.c", "b.d"]) == {"a": 1, "b.c": 3, "b.d": 4}
+            d.get_many(["b.c", "x"], defaults={"x": 0}, as_tuple=True) == (3, 0)
+        """
+        paths = list(paths)
+        results: list[Any] = [sentinel] * len(paths)
+        errors: dict[int, KeyError] = {}
+        root: _PathTrie = ({}, [])
+        for i, p in enumerate(paths):
+            node = root
+            for key in _split_path(p, split_delimiter):
+                node = node[0].setdefault(key, ({}, []))
+            node[1].append(i)
+
+        stack: list[tuple[_PathTrie, Any]] = [(root, self)]
+        while stack:
+            (children, indices), current = stack.pop()
+            for i in indices:
+                results[i] = current
+            for key, child in children.items():
+                try:
+                    value = _nested_step(current, key, list_item)
+                except KeyError as e:
+                    for i in _trie_indices(child):
+                        errors[i] = e
+                    continue
+                stack.append((child, value))
+
+        for i, e in sorted(errors.items()):
+            default = defaults.get(paths[i], sentinel) if defaults else sentinel
+            if default is sentinel:
+                raise KeyError(*e.args)
+            results[i] = default
+        if as_tuple:
+            return tuple(results)
+        return dict(zip(paths, results))
+
+    def freeze_config(self, reuse: Optional["FrozenAttrDict"] = None) -> "FrozenAttrDict":
+        """Get an immutable, hashable snapshot of the dictionary, see `FrozenAttrDict`
+
+        Args:
+            reuse (Optional[FrozenAttrDict]): A previous snapshot, its sections that
+                are unchanged are shared with the new snapshot instead of copied
+        """
+        return _freeze(self, FrozenAttrDict, reuse)
+
+    def compile_path(
+        self,
+        keys: str,
+        default: Any = sentinel,
+        list_item: Optional[int] = 0,
+        split_delimiter: str = ".",
+    ) -> "NestedPath":
+        """Compile a dotted key path once into an accessor for this dictionary,
+        with the same `default` and `list_item` behavior as `get_nested`. The
+        accessor reads the path with chained dict lookups, only lists, missing keys
+        and lazy sections fall back to the general walk of `get_nested`.
+
+        Example:
+            rps = cfg.compile_path("service.limits.rps")
+            rps() == cfg.get_nested("service.limits.rps")  # True
+        """
+        return NestedPath(self, _split_path(keys, split_delimiter), default, list_item)
+
+    def diff_config(self, other: dict, split_delimiter: str = ".") -> ConfigDiff:
+        """Get the dotted paths that were added, removed or changed going from this
+        dictionary to other. Subtrees that are the same object on both sides are
+        skipped, so diffing two snapshots that share their unchanged sections, such
+        as those of `reload_config`, only visits the paths that changed.
+
+        Example:
+            old = Config.from_dict({"db": {"host": "a", "port": 1}})
+            old.diff_config({"db": {"host": "b", "port": 1}, "web": {}})
+            # ConfigDiff(added=['web'], removed=[], changed=['db.host'])
+
+        Args:
+            other (dict): The dictionary to compare against
+            split_delimiter (str): The delimiter joining the keys of a path
+
+        Returns:
+            ConfigDiff: The added, removed and changed paths
+        """
+        if self is other or _same_subtree(self, other):
+            return ConfigDiff([], [], [])
+        return _diff(self, other, split_delimiter)
 
     def to_env(
         self,
@@ -264,6 +694,7 @@ class AttrDict(dict):
     def from_dict(
         cls: type["AttrDict"],
         d: dict,
+        lazy: bool = False,
     ) -> "AttrDict":
         """Make an AttrDict object without any keys
         that will overwrite the normal functions of a
@@ -271,12 +702,31 @@ class AttrDict(dict):
         Args:
             cls (AttrDict): Create a new AttrDict object (or subclass)
             d (dict): The dictionary to convert to an AttrDict
+            lazy (bool): If True, nested dicts are only converted when first accessed,
+                see `LazyAttrDict`
 
         Returns:
             AttrDict: the AttrDict object, or subclass
         """
+        if lazy:
+            return cls._from_dict_lazy(d)
         return cls._from_dict(d, depth=0)
 
+    @classmethod
+    def _from_dict_lazy(cls: Type[T] | Any, d: Dict[str, Any]) -> T:
+        """Make an object of cls whose values are converted to LazyAttrDicts"""
+        if is_dataclass(cls):
+            return cls._from_dict(d, depth=0)
+        result = cast(T, cls())
+        _raise_if_reserved_keys(d)
+        _dict_update(result, d)
+        for k, v in d.items():
+            if isinstance(v, dict) and not isinstance(v, AttrDict):
+                dict.__setitem__(result, k, LazyAttrDict._lazy_from_dict(v))
+            elif isinstance(v, list):
+                dict.__setitem__(result, k, _lazy_list(v))
+        return result
+
     @classmethod
     def from_str(
         cls: type["AttrDict"],
@@ -296,32 +746,301 @@ class AttrDict(dict):
         Returns:
             AttrDict: the AttrDict object, or subclass
         """
-        if config_type == "toml":
-            if has_stdlib_tomllib:
-                d = tomllib.loads(config_str)  # type: ignore
-            elif has_toml_package:
-                d = toml_package.loads(config_str)  # type: ignore
-            else:
-                raise ImportError(
-                    "TOML parsing requires Python 3.11+ (stdlib tomllib) or the 'toml' package."
-                )
-        elif config_type == "json":
-            d = json.loads(config_str)
-        elif config_type == "ini":
-            cfg_parser = configparser.ConfigParser()
-            cfg_parser.read_string(config_str)
-            d = {}
-            for section in cfg_parser.sections():
-                d[section] = {}
-                for k, v in cfg_parser.items(section):
-                    d[section][k] = v
-        elif config_type == "yaml":
-            if not has_yaml:
-                raise Exception(
-                    "Error! YAML not installed. If you would like to use YAML with pi-conf, "
-                    'install it with `pip install pyyaml` or `pip install "pi-conf[yaml]"`'
-                )
-            d = yaml.safe_load(config_str)  # type: ignore
+        return cls.from_dict(_parse_str(config_str, config_type))
+
+
+class NestedPath:
+    """A compiled dotted key path bound to a dictionary, see `AttrDict.compile_path`.
+    Calling it reads the current value, so it follows in place updates of the
+    dictionary. Pass another dictionary to read the same path from it instead.
+    """
+
+    __slots__ = ("root", "keys", "default", "list_item", "_walk")
+
+    def __init__(
+        self,
+        root: dict,
+        keys: tuple[str, ...],
+        default: Any = sentinel,
+        list_item: Optional[int] = 0,
+    ):
+        self.root = root
+        self.keys = keys
+        self.default = default
+        self.list_item = list_item
+        self._walk = _compile_walk(keys)
+
+    def __call__(self, d: Optional[dict] = None) -> Any:
+        root = self.root if d is None else d
+        try:
+            value = self._walk(root)
+            if type(value) is not dict:
+                return value
+        except (KeyError, TypeError):
+            pass
+        ## Lists, missing keys and unconverted dicts take the general walk
+        return _get_path(root, self.keys, self.default, self.list_item)
+
+    def __repr__(self):
+        return f"<NestedPath: {'.'.join(self.keys)}>"
+
+
+def _lazy_list(values: list) -> list:
+    """Copy a list (and its nested lists), making LazyAttrDicts of its dicts"""
+    result = list(values)
+    stack = [result]
+    while stack:
+        items = stack.pop()
+        for i, v in enumerate(items):
+            if isinstance(v, dict) and not isinstance(v, AttrDict):
+                items[i] = LazyAttrDict._lazy_from_dict(v)
+            elif isinstance(v, list):
+                items[i] = nested = list(v)
+                stack.append(nested)
+    return result
+
+
+class LazyAttrDict(AttrDict):
+    """An AttrDict that keeps its nested dicts as they are until they are first
+    accessed as an attribute or item, then converts them to a LazyAttrDict and
+    caches the result. Nested dicts are shared with the source dict until then.
+    Example:
+        d = AttrDict.from_dict({"a": {"b": {"c": 3}}}, lazy=True)
+        type(dict.__getitem__(d.a, "b")) == dict  # True, not converted yet
+        d.a.b.c == 3  # True, d.a.b is now a LazyAttrDict
+    """
+
+    @classmethod
+    def _lazy_from_dict(cls, d: dict) -> "LazyAttrDict":
+        """Make a LazyAttrDict of d, copying only its top level"""
+        _raise_if_reserved_keys(d)
+        node = _new_dict(LazyAttrDict)
+        node.__dict__ = node
+        _dict_update(node, d)
+        for k, v in d.items():
+            if isinstance(v, list):
+                dict.__setitem__(node, k, _lazy_list(v))
+        return node
+
+    def _convert_child(self, key: Any, value: Any) -> Any:
+        if isinstance(value, dict) and not isinstance(value, AttrDict):
+            value = LazyAttrDict._lazy_from_dict(value)
+            dict.__setitem__(self, key, value)
+        return value
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._convert_child(key, super().__getitem__(key))
+
+    def __getattribute__(self, name: str) -> Any:
+        value = super().__getattribute__(name)
+        if isinstance(value, dict) and not isinstance(value, AttrDict) and name in self:
+            value = self._convert_child(name, value)
+        return value
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def _convert_children(self):
+        for k, v in list(super().items()):
+            self._convert_child(k, v)
+
+    def items(self):
+        self._convert_children()
+        return super().items()
+
+    def values(self):
+        self._convert_children()
+        return super().values()
+
+    def pop(self, key: Any, *args: Any) -> Any:
+        if key in self:
+            self[key]
+        return super().pop(key, *args)
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+
+class FrozenAttrDict(AttrDict):
+    """An immutable and hashable AttrDict, nested dicts are FrozenAttrDicts and lists
+    are tuples. The hash is computed once when frozen. Freezing reuses any value
+    that is already frozen, so snapshots share the subtrees they have in common.
+    Example:
+        d = AttrDict.from_dict({"a": {"b": [1, 2]}}).freeze_config()
+        d.a.b == (1, 2)  # True
+        d["a"] = 1  # raises TypeError
+        {d: "memoized"}[d] == "memoized"  # True
+    """
+
+    __slots__ = ("_hash",)
+
+    _hash: Optional[int]
+    _mutable_cls: type = AttrDict  ## The class `thaw_config` returns
+
+    def __init__(self, *args, **kwargs):
+        frozen = _freeze(dict(*args, **kwargs), FrozenAttrDict)
+        _dict_update(self, frozen)
+        object.__setattr__(self, "__dict__", self)
+        object.__setattr__(self, "_hash", frozen._hash)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+    __setitem__ = __delitem__ = _readonly  # type: ignore[assignment]
+    update = clear = pop = popitem = setdefault = __ior__ = _readonly  # type: ignore[assignment]
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"'{type(self).__name__}' object is immutable")
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        if self._hash is None:
+            raise TypeError(f"'{type(self).__name__}' contains an unhashable value")
+        return self._hash
+
+    def __copy__(self) -> "FrozenAttrDict":
+        return self
+
+    def __deepcopy__(self, memo: dict) -> "FrozenAttrDict":
+        return self
+
+    def __reduce__(self):
+        return (type(self), (_thaw(self, dict),))
+
+    def freeze_config(self, reuse: Optional["FrozenAttrDict"] = None) -> "FrozenAttrDict":
+        return self
+
+    def thaw_config(self) -> AttrDict:
+        """Get a mutable copy, nested FrozenAttrDicts become AttrDicts and tuples lists"""
+        return _thaw(self, self._mutable_cls)
+
+    @classmethod
+    def from_dict(  # type: ignore[override]
+        cls, d: dict, lazy: bool = False, reuse: Optional["FrozenAttrDict"] = None
+    ) -> "FrozenAttrDict":
+        """Make a FrozenAttrDict (or subclass) from a dict
+
+        Args:
+            d (dict): The dictionary to freeze
+            lazy (bool): Unused, a frozen dict is always fully converted
+            reuse (Optional[FrozenAttrDict]): A previous snapshot to share unchanged
+                sections with, see `AttrDict.freeze_config`
+        """
+        return _freeze(d, cls, reuse)
+
+
+def _new_frozen(cls: type, items: dict) -> FrozenAttrDict:
+    """Create a frozen dict of cls holding items, which must already be frozen"""
+    node = _new_dict(cls)
+    _dict_update(node, items)
+    object.__setattr__(node, "__dict__", node)
+    try:
+        h = hash(frozenset(items.items()))
+    except TypeError:
+        h = None
+    object.__setattr__(node, "_hash", h)
+    return node
+
+
+def _freeze(value: Any, cls: type = FrozenAttrDict, reuse: Any = None) -> Any:
+    """Get an immutable copy of value, dicts become FrozenAttrDicts (cls at the top
+    level), lists and tuples become tuples and sets frozensets. Values that are
+    already frozen are reused. Walks with an explicit stack so there is no depth limit.
+
+    Args:
+        value (Any): The value to freeze
+        cls (type): The FrozenAttrDict class of the top level
+        reuse (Any): A previous frozen version of value, any part of it that is
+            equal to the new value at the same path is reused instead of copied
+    """
+    if isinstance(value, cls) and isinstance(value, FrozenAttrDict):
+        return value
+
+    ## Collect the containers in pre-order, then freeze them in reverse so that
+    ## every child is frozen before its parent
+    order: list[Any] = []
+    previous: dict[int, Any] = {}
+    stack = [(value, reuse)]
+    while stack:
+        node, prev = stack.pop()
+        if id(node) in previous:
+            continue
+        previous[id(node)] = prev
+        order.append(node)
+        if isinstance(node, dict):
+            prev_get = prev.get if isinstance(prev, FrozenAttrDict) else None
+            for k, v in dict.items(node):
+                if _needs_freezing(v):
+                    stack.append((v, prev_get(k) if prev_get else None))
+        else:
+            prev_items = prev if isinstance(prev, tuple) and len(prev) == len(node) else None
+            for i, v in enumerate(node):
+                if _needs_freezing(v):
+                    stack.append((v, prev_items[i] if prev_items else None))
+
+    frozen: dict[int, Any] = {}
+    for node in reversed(order):
+        prev = previous[id(node)]
+        if isinstance(node, dict):
+            if not isinstance(node, AttrDict):
+                _raise_if_reserved_keys(node)
+            items = {
+                k: frozen[id(v)] if _needs_freezing(v) else v for k, v in dict.items(node)
+            }
+            result: Any = _new_frozen(cls if node is value else FrozenAttrDict, items)
+            ## The hash rejects most changed subtrees before comparing them. Reused
+            ## children are the same objects, so only the leaves are compared here
+            if (
+                type(prev) is type(result)
+                and prev._hash == result._hash
+                and _strict_equal(prev, result)
+            ):
+                result = prev
         else:
-            raise Exception(f"Error! Unknown config_type '{config_type}'")
-        return cls.from_dict(d)
+            items_ = [frozen[id(v)] if _needs_freezing(v) else v for v in node]
+            is_set = isinstance(node, (set, frozenset))
+            result = frozenset(items_) if is_set else tuple(items_)
+            if type(prev) is type(result) and _strict_equal(prev, result):
+                result = prev
+        frozen[id(node)] = result
+    return frozen[id(value)]
+
+
+def _needs_freezing(value: Any) -> bool:
+    if isinstance(value, dict):
+        return not isinstance(value, FrozenAttrDict)
+    return isinstance(value, (list, tuple, set, frozenset))
+
+
+def _thaw(value: dict, cls: type = AttrDict) -> Any:
+    """Get a mutable copy of a frozen dict, the top level becomes a cls, nested
+    FrozenAttrDicts AttrDicts (plain dicts if cls is dict), tuples lists and
+    frozensets sets"""
+    node_cls = dict if cls is dict else None
+    root = cls()
+    stack: list[tuple[Any, Any]] = [(root, value)]
+    while stack:
+        target, src = stack.pop()
+        items: Iterable = dict.items(src) if isinstance(src, dict) else enumerate(src)
+        for k, v in items:
+            if isinstance(v, dict):
+                child: Any = node_cls() if node_cls else _new_attr_dict()
+                stack.append((child, v))
+                v = child
+            elif isinstance(v, tuple):
+                child = [None] * len(v)
+                stack.append((child, v))
+                v = child
+            elif isinstance(v, frozenset):
+                v = set(v)
+            if isinstance(target, list):
+                target[k] = v
+            else:
+                dict.__setitem__(target, k, v)
+    return root
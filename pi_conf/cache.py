@@ -0,0 +1,372 @@
+"""Caches of parsed config files, so that loading the same unchanged file again skips
+parsing it. See `set_parse_cache` for the opt-in in-process cache and `set_disk_cache`
+for the opt-in cache shared between processes. `set_discovery_cache` caches which config
+files exist in the searched directories."""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from pi_conf.definitions import PathType
+
+try:
+    from platformdirs import user_cache_dir
+except ImportError:
+
+    def user_cache_dir(appname: Optional[str] = None) -> str:  # type: ignore[misc]
+        return os.path.join(os.path.expanduser("~/.cache"), appname or "")
+
+
+log = logging.getLogger(__name__)
+
+PARSE_CACHE_SIZE = 128
+PARSE_CACHE_MAX_FILE_SIZE = 1 << 20  ## Larger files are parsed every time
+SIDECAR_VERSION = 1
+
+## Files modified this recently may change again within the filesystem's timestamp
+## granularity without changing size, so their hits are checked against the contents
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class _Entry(NamedTuple):
+    signature: tuple[int, int]  ## st_mtime_ns, st_size
+    digest: Optional[bytes]  ## Hash of the contents, set if hits must check them
+    value: dict
+
+
+def _digest(path: str) -> bytes:
+    with open(path, "rb") as fp:
+        return hashlib.blake2b(fp.read(), digest_size=16).digest()
+
+
+def _local_file(path: PathType) -> Optional[tuple[str, os.stat_result]]:
+    """Get the resolved path and stat of a local file, or None for anything else"""
+    try:
+        resolved = os.path.realpath(path)
+        return resolved, os.stat(resolved)
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+class ParseCache:
+    """LRU cache of parsed config files keyed on the resolved path, st_mtime_ns and
+    st_size, and optionally a hash of the contents. The parsed dict is shared by
+    every hit, so callers must copy it before handing it out (`Config.from_dict`
+    never modifies the dict it converts). Each entry keeps a whole parsed file alive,
+    so files larger than max_file_size bytes aren't cached.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = PARSE_CACHE_SIZE,
+        enabled: bool = True,
+        hash_contents: bool = False,
+        max_file_size: int = PARSE_CACHE_MAX_FILE_SIZE,
+    ):
+        if maxsize < 1:
+            raise ValueError(f"Error! maxsize must be >= 1, got {maxsize}")
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hash_contents = hash_contents
+        self.max_file_size = max_file_size
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get_or_parse(self, path: PathType, ext: str, parse: Callable[[Any, str], dict]) -> dict:
+        """Get the parsed contents of path, calling parse(path, ext) on a miss
+
+        Args:
+            path (PathType): The config file
+            ext (str): The extension that selects the parser
+            parse (Callable): The parser, called on a miss
+
+        Returns:
+            dict: The parsed config, shared with the cache
+        """
+        local = _local_file(path) if self.enabled else None
+        if local is None or local[1].st_size > self.max_file_size:
+            return parse(path, ext)  ## Disabled, too large, or not a local file, e.g. a url
+        resolved, st = local
+        key = (resolved, ext)
+        signature = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.signature == signature:
+            if entry.digest is None or entry.digest == _digest(resolved):
+                with self._lock:
+                    self._hits += 1
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                return entry.value
+
+        value = parse(path, ext)
+        racy = time.time_ns() - st.st_mtime_ns < RACY_WINDOW_NS
+        digest = _digest(resolved) if self.hash_contents or racy else None
+        with self._lock:
+            self._misses += 1
+            self._entries[key] = _Entry(signature, digest, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def info(self) -> CacheInfo:
+        """Get the hit, miss and eviction counts"""
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._evictions, self.maxsize, len(self._entries)
+            )
+
+    def clear(self) -> None:
+        """Remove every entry and reset the stats"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+
+class DiskCache:
+    """Opt-in cache of parsed config files as pickled sidecars, so that short lived
+    processes skip parsing files that haven't changed since another process parsed
+    them. A sidecar holds the source path, mtime, size and a hash of its contents,
+    and is only used if they all still match the source file. The cache directory
+    is created readable by the current user only, and sidecars in a directory that
+    others can write to are never loaded.
+    """
+
+    def __init__(self, enabled: bool = False, directory: Optional[str] = None):
+        self.enabled = enabled
+        self.directory = directory or user_cache_dir("pi-conf")
+        self.hits = self.misses = 0
+
+    def sidecar_path(self, resolved: str, ext: str) -> str:
+        """Get the sidecar file for a resolved config path"""
+        name = hashlib.blake2b(f"{resolved}\0{ext}".encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f"{name}.pickle")
+
+    def get_or_parse(self, path: PathType, ext: str, parse: Callable[[Any, str], dict]) -> dict:
+        """Get the parsed contents of path from its sidecar, calling parse(path, ext)
+        and writing a new sidecar if there is no valid one
+
+        Args:
+            path (PathType): The config file
+            ext (str): The extension that selects the parser
+            parse (Callable): The parser, called on a miss
+
+        Returns:
+            dict: The parsed config
+        """
+        local = _local_file(path) if self.enabled else None
+        if local is None:
+            return parse(path, ext)
+        resolved, st = local
+        header = (SIDECAR_VERSION, resolved, ext, st.st_mtime_ns, st.st_size, _digest(resolved))
+        sidecar = self.sidecar_path(resolved, ext)
+
+        value = self._read(sidecar, header)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = parse(path, ext)
+        self._write(sidecar, header, value)
+        return value
+
+    def _is_private(self) -> bool:
+        st = os.stat(self.directory)
+        if hasattr(os, "getuid") and st.st_uid != os.getuid():
+            return False
+        return not st.st_mode & 0o022
+
+    def _read(self, sidecar: str, header: tuple) -> Optional[dict]:
+        try:
+            if not self._is_private():
+                log.warning(f"Ignoring config cache '{self.directory}', others can write to it")
+                return None
+            with open(sidecar, "rb") as fp:
+                if pickle.load(fp) != header:
+                    return None
+                return pickle.load(fp)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.debug(f"Ignoring unreadable config cache sidecar '{sidecar}': {e}")
+            return None
+
+    def _write(self, sidecar: str, header: tuple, value: dict) -> None:
+        """Write the sidecar to a temporary file and move it into place, so readers in
+        other processes never see a partial sidecar"""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    pickle.dump(header, fp, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(value, fp, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, sidecar)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except Exception as e:
+            log.debug(f"Could not write config cache sidecar '{sidecar}': {e}")
+
+    def clear(self) -> None:
+        """Remove every sidecar in the cache directory"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".pickle"):
+                os.unlink(os.path.join(self.directory, name))
+
+
+class DirListing(dict):
+    """The names in a directory mapped to whether each is a file, and the case-folded
+    names of its files. On case-insensitive filesystems, such as the defaults of macOS
+    and Windows, a name also opens a file listed with another case."""
+
+    __slots__ = ("folded_files",)
+
+    def __init__(self, entries: Iterable[tuple[str, bool]] = ()):
+        super().__init__(entries)
+        self.folded_files = frozenset(name.casefold() for name, is_file in self.items() if is_file)
+
+
+class DiscoveryCache:
+    """Cache of directory listings used to find config files. Each directory is read
+    once with `os.scandir`, and the listing answers whether any name in it is a file,
+    so both found and missing files are remembered. Listings expire after ttl seconds,
+    a ttl of 0 disables the cache.
+    """
+
+    def __init__(self, ttl: float = 0):
+        if ttl < 0:
+            raise ValueError(f"Error! ttl must be >= 0, got {ttl}")
+        self.ttl = ttl
+        self._listings: dict[str, tuple[float, Optional[DirListing]]] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def listdir(self, directory: str) -> Optional[DirListing]:
+        """Get the names in directory, mapped to whether each is a file
+
+        Returns:
+            Optional[DirListing]: The listing, or None if directory can't be read
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._listings.get(directory)
+            if cached is not None and now - cached[0] < self.ttl:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        listing = _scan(directory)
+        if self.enabled:
+            with self._lock:
+                self._listings[directory] = (now, listing)
+        return listing
+
+    def invalidate(self, directory: Optional[str] = None) -> None:
+        """Forget the listing of directory, or of every directory if None"""
+        with self._lock:
+            if directory is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(directory, None)
+
+
+def _scan(directory: str) -> Optional[DirListing]:
+    try:
+        with os.scandir(directory) as it:
+            return DirListing((entry.name, entry.is_file()) for entry in it)
+    except OSError:
+        return None
+
+
+_parse_cache = ParseCache(enabled=False)
+_disk_cache = DiskCache()
+_discovery_cache = DiscoveryCache()
+
+
+def set_parse_cache(
+    enabled: bool = True,
+    maxsize: int = PARSE_CACHE_SIZE,
+    hash_contents: bool = False,
+    max_file_size: int = PARSE_CACHE_MAX_FILE_SIZE,
+) -> None:
+    """Set whether parsed config files are cached, this also clears the cache. The cache
+    is off by default, as it keeps the parsed contents of every file it holds alive.
+
+    Args:
+        enabled (bool): If False, every load reads and parses the file
+        maxsize (int): Maximum number of files kept, the least recently used go first
+        hash_contents (bool): If True, hits also check a hash of the file contents,
+            for filesystems whose timestamps can't be trusted
+        max_file_size (int): Files larger than this many bytes are never cached
+    """
+    global _parse_cache
+    _parse_cache = ParseCache(
+        maxsize=maxsize, enabled=enabled, hash_contents=hash_contents, max_file_size=max_file_size
+    )
+
+
+def get_parse_cache() -> ParseCache:
+    """Get the parse cache"""
+    return _parse_cache
+
+
+def set_disk_cache(enabled: bool = True, directory: Optional[str] = None) -> None:
+    """Set whether parsed config files are also cached on disk for other processes
+
+    Args:
+        enabled (bool): If True, keep a pickled sidecar of each parsed config file
+        directory (Optional[str]): The cache directory, defaults to the user cache dir
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(enabled=enabled, directory=directory)
+
+
+def get_disk_cache() -> DiskCache:
+    """Get the disk cache"""
+    return _disk_cache
+
+
+def set_discovery_cache(ttl: float = 30) -> None:
+    """Set how long the listings of searched config directories are kept
+
+    Args:
+        ttl (float): Seconds a listing is kept, files created or removed in that time
+            aren't noticed until it expires or `clear_discovery_cache` is called.
+            0 disables the cache.
+    """
+    global _discovery_cache
+    _discovery_cache = DiscoveryCache(ttl=ttl)
+
+
+def get_discovery_cache() -> DiscoveryCache:
+    """Get the discovery cache"""
+    return _discovery_cache
+
+
+def clear_discovery_cache(directory: Optional[str] = None) -> None:
+    """Forget the cached listing of directory, or of every directory if None"""
+    _discovery_cache.invalidate(directory)
@@ -4,15 +4,35 @@ import configparser
 import json
 import logging
 import os
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import repeat
 from pathlib import Path
-from typing import Literal, Optional, TypeVar
-
-from pi_conf.attr_dict import AttrDict
+from typing import Any, Iterable, Literal, Optional, TypeVar, cast
+
+from pi_conf import streaming
+from pi_conf.attr_dict import (
+    AttrDict,
+    FrozenAttrDict,
+    IncludeTrie,
+    _include_trie,
+    _parse_str,
+    _select,
+)
+from pi_conf.cache import DirListing, get_discovery_cache, get_disk_cache, get_parse_cache
 from pi_conf.definitions import PathType, PathTypes
+from pi_conf.merge import MergeStrategy, Strategies, _merge_layers, merge_into
 from pi_conf.module_check import has_stdlib_tomllib, has_toml_package, has_yaml
 from pi_conf.open_func import open_func as open
-from pi_conf.provenance import Provenance, ProvenanceOp
+from pi_conf.open_func import is_local_path, path_extension, read_mapped
+from pi_conf.provenance import Provenance, ProvenanceHistory, ProvenanceOp
 from pi_conf.provenance import get_provenance_manager as get_pmanager
+from pi_conf.remote import get_remote_fetcher
+from pi_conf.streaming import STREAMING_EXTENSIONS
 
 if has_yaml:
     import yaml
@@ -55,7 +75,7 @@ class ProvenanceDict(AttrDict):
 
         super().__init__(*args, **kwargs)
         self.__dict__ = self
-        get_pmanager().append(self, Provenance("dict", ProvenanceOp.set))
+        get_pmanager().record(self, "dict", ProvenanceOp.set, paths=((k,) for k in self))
 
     def __post_init__(self):
         ## Iterate over members and add them to the dict
@@ -79,8 +99,10 @@ class ProvenanceDict(AttrDict):
         appname_path_dict: str | dict,
         directories: Optional[PathType | PathTypes] = None,
         overwrite: bool = False,
+        strategy: Strategies = MergeStrategy.merge,
     ) -> None:
-        """Loads a config based on the given appname | path | dict
+        """Loads a config based on the given appname | path | dict and deep merges it
+        into this one, see `pi_conf.merge.merge_into`
 
         Args:
             appname_path_dict (str): Set the config from an appname | path | dict
@@ -89,48 +111,84 @@ class ProvenanceDict(AttrDict):
                 str: a path to a (.toml|.json|.ini|.yaml) file
                 str: appname to search for the config.toml in the the application config dir
             directories (Optional[str | list]): Optional list of directories to search
-            overwrite (bool): If True, allow incoming keys to overwrite existing keys
+            overwrite (bool): If True, allow incoming values to overwrite existing values
+            strategy (Strategies): A `MergeStrategy`, or a mapping of dotted paths to
+                strategies, e.g. {"db": "replace", "plugins": "append"}
         """
         if isinstance(directories, (str, Path)):
             directories = [directories]
         newcfg = load_config(appname_path_dict, directories=directories)
-        _raise_if_conflicts(self, newcfg, overwrite=overwrite)
-        self.update(newcfg, _add_to_provenance=False)
-        get_pmanager().extend(self, newcfg.provenance)
-        get_pmanager().delete(newcfg)
+        is_global = self is cfg
+        ## The global cfg is only written under its lock, then its snapshot is republished
+        with _reload_lock if is_global else nullcontext():
+            written = merge_into(self, newcfg, strategy=strategy, overwrite=overwrite)
+            get_pmanager().merge(self, newcfg, paths=written)
+            get_pmanager().delete(newcfg)
+            if is_global:
+                cfg_snapshot.publish_lazily(self)
 
     @property
-    def provenance(self) -> list[Provenance]:
+    def provenance(self) -> ProvenanceHistory:
         return get_pmanager().get(self)
 
-    def __del__(self):
-        """Delete the config from the provenance if this object is deleted"""
-        get_pmanager().delete(self)
+    def provenance_of(self, keys: str, split_delimiter: str = ".") -> Optional[Provenance]:
+        """Get the provenance event that last wrote the given key. Requires key
+        indexing, see `set_use_provenance(index_keys=True)`
+
+        Args:
+            keys (str): The dotted key path, e.g. "db.pool_size"
+            split_delimiter (str): The delimiter between keys
+
+        Returns:
+            Optional[Provenance]: The event, or None if the key wasn't indexed
+
+        Raises:
+            KeyError: If the key is not in the config
+        """
+        self.get_nested(keys, split_delimiter=split_delimiter)
+        return get_pmanager().provenance_of(self, tuple(keys.split(split_delimiter)))
 
     def update(self, *args, **kwargs):
         """Update the config with another dict"""
         _add_to_provenance = kwargs.pop("_add_to_provenance", True)
+        paths = None
+        if _add_to_provenance and get_pmanager().index_keys:
+            if len(args) != 1 or kwargs or not isinstance(args[0], dict):
+                args, kwargs = (dict(*args, **kwargs),), {}
+            paths = [(k,) for k in args[0]]
         super().update(*args, **kwargs)
         if _add_to_provenance:
-            get_pmanager().append(self, Provenance("dict", ProvenanceOp.update))
+            get_pmanager().record(self, "dict", ProvenanceOp.update, paths=paths)
 
     def clear(self) -> None:
         get_pmanager().clear(self)
         return super().clear()
 
+    def freeze_config(self, reuse: Optional[FrozenAttrDict] = None) -> "FrozenConfig":
+        """Get an immutable, hashable snapshot of the config that threads can share
+        without locks, see `ConfigSnapshot`
+
+        Args:
+            reuse (Optional[FrozenAttrDict]): A previous snapshot, its sections that
+                are unchanged are shared with the new snapshot instead of copied
+        """
+        return FrozenConfig.from_dict(self, reuse=reuse)
+
     @classmethod
-    def from_dict(cls: type[T], d: dict) -> T:
+    def from_dict(cls: type[T], d: dict, lazy: bool = False) -> T:
         """Make an AttrDict object without any keys
         that will overwrite the normal functions of a dict
 
         Args:
             cls (Type[AttrDict]): Create a new AttrDict object (or subclass)
             d (dict): The dictionary to convert to an AttrDict
+            lazy (bool): If True, nested dicts are only converted when first accessed
 
         Returns:
             AttrDict: the AttrDict object, or subclass
         """
-        ad: T = cls._from_dict(d, depth=0)
+        ad: T = cls._from_dict_lazy(d) if lazy else cls._from_dict(d, depth=0)
+        get_pmanager().index(ad, ((k,) for k in ad))
         return ad
 
 
@@ -138,31 +196,121 @@ class Config(ProvenanceDict):
     pass
 
 
-def _load_config_file(path: PathType, ext: Optional[str] = None) -> Config:
-    """Load a config file from the given path"""
-    if ext is None:
-        __, ext = os.path.splitext(path)
+class FrozenConfig(FrozenAttrDict):
+    """An immutable, hashable snapshot of a Config, see `Config.freeze_config`"""
 
+    _mutable_cls = Config
+
+
+class ConfigSnapshot:
+    """Holds the latest published FrozenConfig. Reading a published snapshot is an
+    attribute load or two, so readers don't take a lock and always see a complete
+    config. Writers publish a new snapshot by swapping the reference, or with
+    `publish_lazily` have the next `get` freeze it, so nothing is frozen while no one
+    reads snapshots. Only that one `get` takes a lock, the source lock, so it waits
+    for a writer that holds it.
+    Example:
+        cfg_snapshot.publish(cfg)
+        conf = cfg_snapshot.get()  ## conf stays the same even if a new one is published
+    """
+
+    __slots__ = ("_current", "_pending", "_lock", "_source_lock")
+
+    def __init__(
+        self, frozen: Optional[FrozenConfig] = None, source_lock: Optional[Any] = None
+    ):
+        """
+        Args:
+            frozen (Optional[FrozenConfig]): The initial snapshot
+            source_lock (Optional[Any]): The lock writers of lazily published configs
+                hold while changing them, taken while freezing one
+        """
+        self._current = frozen if frozen is not None else FrozenConfig()
+        self._pending: Optional[dict] = None  ## A config to freeze on the next get
+        self._lock = threading.Lock()  ## Only taken by writers
+        self._source_lock = source_lock if source_lock is not None else nullcontext()
+
+    def get(self) -> FrozenConfig:
+        """Get the current snapshot, freezing a lazily published config first"""
+        if self._pending is not None:
+            return self._publish_pending()
+        return self._current
+
+    def _publish_pending(self) -> FrozenConfig:
+        with self._source_lock, self._lock:
+            if self._pending is not None:
+                self._current = FrozenConfig.from_dict(self._pending, reuse=self._current)
+                self._pending = None
+            return self._current
+
+    def swap(self, frozen: FrozenConfig) -> FrozenConfig:
+        """Replace the current snapshot and return the old one"""
+        with self._lock:
+            old, self._current = self._current, frozen
+            self._pending = None
+        return old
+
+    def compare_and_swap(self, expected: FrozenConfig, frozen: FrozenConfig) -> bool:
+        """Replace the current snapshot only if it is still expected
+
+        Returns:
+            bool: True if the snapshot was replaced, False if it or a lazily
+                published config replaced expected
+        """
+        with self._lock:
+            if self._pending is not None or self._current is not expected:
+                return False
+            self._current = frozen
+        return True
+
+    def publish(self, config: dict) -> FrozenConfig:
+        """Freeze config and make it the current snapshot. Sections that are unchanged
+        since the current snapshot are shared with it rather than copied.
+
+        Returns:
+            FrozenConfig: The published snapshot
+        """
+        with self._lock:
+            frozen = FrozenConfig.from_dict(config, reuse=self._current)
+            self._current = frozen
+            self._pending = None
+        return frozen
+
+    def publish_lazily(self, config: dict) -> None:
+        """Publish config, but only freeze it on the next `get`. Until then config must
+        only be changed while holding the source lock."""
+        with self._lock:
+            self._pending = config
+
+
+def _parse_config_file(path: PathType, ext: str) -> dict:
+    """Parse a config file into a dict. Large local TOML and JSON files are decoded straight
+    from a memory map, see `pi_conf.open_func.read_mapped`"""
     if ext == ".toml":
         if has_stdlib_tomllib:
+            text = read_mapped(path)
+            if text is not None:
+                return tomllib.loads(text)  # type: ignore
             with open(path, "rb") as fp:
-                return Config.from_dict(tomllib.load(fp))  # type: ignore
+                return tomllib.load(fp)  # type: ignore
         elif has_toml_package:
             with open(path, "r") as fp:
-                return Config.from_dict(toml_package.loads(fp.read()))  # type: ignore
+                return toml_package.loads(fp.read())  # type: ignore
         else:
             raise ImportError(
                 "TOML support requires Python 3.11+ (stdlib tomllib) or the 'toml' package."
             )
     elif ext == ".json":
+        text = read_mapped(path)
+        if text is not None:
+            return json.loads(text)
         with open(path, "r") as fp:
-            return Config.from_dict(json.load(fp))
+            return json.load(fp)
     elif ext == ".ini":
         cfg_parser = configparser.ConfigParser()
         with open(path, "r") as fp:
             cfg_parser.read_file(fp)
-        cfg_dict = {section: dict(cfg_parser[section]) for section in cfg_parser.sections()}
-        return Config.from_dict(cfg_dict)
+        return {section: dict(cfg_parser[section]) for section in cfg_parser.sections()}
     elif ext == ".yaml":
         if not has_yaml:
             raise Exception(
@@ -170,10 +318,121 @@ def _load_config_file(path: PathType, ext: Optional[str] = None) -> Config:
                 "install it with 'pip install pyyaml' or 'pip install pi-conf[yaml]"
             )
         with open(path, "r") as fp:
-            return Config.from_dict(yaml.safe_load(fp))  # type: ignore
+            return yaml.safe_load(fp)  # type: ignore
     raise Exception(f"Error! Unknown config file extension '{ext}'")
 
 
+def _ini_include_trie(include: Iterable[str], sections: Iterable[str]) -> IncludeTrie:
+    """Build the selection trie of an INI file, whose section names may contain dots.
+    Each path selects the longest section name it starts with, the rest of the path
+    is a key within that section, e.g. "cache.redis.url" selects key "url" of the
+    section [cache.redis] if there is one, else key "redis.url" of [cache]."""
+    names = set(sections)
+    trie: IncludeTrie = {}
+    for p in include:
+        parts = p.split(".")
+        for i in range(len(parts), 0, -1):
+            section = ".".join(parts[:i])
+            if section in names:
+                key = ".".join(parts[i:])
+                if not key:
+                    trie[section] = None
+                elif trie.get(section, {}) is not None:
+                    trie.setdefault(section, {})[key] = None
+                break
+    return trie
+
+
+def _parse_ini_sections(path: PathType, include: Iterable[str]) -> dict:
+    """Parse only the sections of an INI file selected by the include paths, the lines
+    of every other section except the defaults are dropped before configparser sees
+    them"""
+    include = list(include)
+    ## Every section a path may select, the longest match is picked once all are known
+    prefixes = set()
+    for p in include:
+        parts = p.split(".")
+        prefixes.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    cfg_parser = configparser.ConfigParser()
+    keep = True
+    lines = []
+    with open(path, "r") as fp:
+        for line in fp:
+            if not line[:1].isspace():  ## Indented lines continue the previous value
+                m = cfg_parser.SECTCRE.match(line.strip())
+                if m:
+                    header = m.group("header")
+                    keep = header in prefixes or header == cfg_parser.default_section
+            if keep:
+                lines.append(line)
+    cfg_parser.read_file(lines, source=str(path))
+    d = {section: dict(cfg_parser[section]) for section in cfg_parser.sections()}
+    return _select(d, _ini_include_trie(include, d))
+
+
+def _parse_text(text: str, ext: str) -> dict:
+    return _parse_str(text, ext.lstrip("."))
+
+
+def _parse_cached(path: PathType, ext: str) -> dict:
+    """Parse a config file through the parse and disk caches, or revalidate a remote
+    one. The result may be shared (see `_is_shared_parse`), callers must not modify it."""
+    if not is_local_path(path):
+        return get_remote_fetcher().get_or_parse(os.fspath(path), ext, _parse_text)
+    parse = _parse_config_file
+    disk_cache = get_disk_cache()
+    if disk_cache.enabled:
+        parse = partial(disk_cache.get_or_parse, parse=_parse_config_file)
+    return get_parse_cache().get_or_parse(path, ext, parse)
+
+
+def _is_shared_parse(path: PathType) -> bool:
+    """Whether `_parse_cached(path)` may return a dict that a cache also holds"""
+    return not is_local_path(path) or get_parse_cache().enabled
+
+
+def _private_copy(d: dict) -> dict:
+    """Deep copy a parsed config, pickling is much faster than copy.deepcopy"""
+    return pickle.loads(pickle.dumps(d, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _load_config_file(
+    path: PathType,
+    ext: Optional[str] = None,
+    lazy: bool = False,
+    stream: bool = False,
+    include: Optional[Iterable[str]] = None,
+) -> Config:
+    """Load a config file from the given path, unchanged files are parsed only once,
+    see `pi_conf.cache.set_parse_cache` and `set_disk_cache`. Remote URLs are
+    revalidated instead, see `pi_conf.remote`."""
+    if ext is None:
+        ext = path_extension(path)
+    if include is not None:
+        include = list(include)
+    trie = None if include is None else _include_trie(include)
+    local = is_local_path(path)
+    if local and ext in STREAMING_EXTENSIONS and (stream or (trie is not None and ext == ".yaml")):
+        ## Built straight from the parser events, there is no parsed dict to cache
+        with open(path, "r") as fp:
+            newcfg = streaming.load(fp, ext, Config, include=trie)
+        get_pmanager().index(newcfg, ((k,) for k in newcfg))
+        return newcfg
+    if local and include is not None and ext == ".ini":
+        return Config.from_dict(_parse_ini_sections(path, include), lazy=lazy)
+    ## Cached parses are shared, from_dict copies them and never modifies its input
+    d = _parse_cached(path, ext)
+    if include is not None and ext == ".ini":
+        d = _select(d, _ini_include_trie(include, d))
+    elif trie is not None:
+        ## TOML and JSON parsers can't skip a table, only the selected ones are converted
+        d = _select(d, trie)
+    if lazy and _is_shared_parse(path):
+        ## Lazy nodes wrap the parsed dicts instead of copying them
+        d = _private_copy(d)
+    return Config.from_dict(d, lazy=lazy)
+
+
 def _get_default_search_paths(filename: PathType, appname: Optional[str] = None) -> list[str]:
     """Get the default search paths for a config file."""
     if appname:
@@ -201,26 +460,95 @@ def _get_search_paths(
         return [os.path.join(os.path.expanduser(d), filename) for d in directories]
 
 
-def _find_file_with_extensions(path: str, extensions: list[str]) -> Optional[str]:
-    """Find a file with given extensions."""
-    if os.path.exists(path):
+def _listed_isfile(listing: Optional[DirListing], path: PathType, name: str) -> bool:
+    """os.path.isfile answered from a listing of the directory of path. A directory
+    that can't be listed (e.g. mode 0711) may still be searchable, and a file listed
+    with another case is the same file on case-insensitive filesystems, so both are
+    checked with os.path.isfile."""
+    if listing is None:
+        return os.path.isfile(path)
+    is_file = listing.get(name)
+    if is_file is not None:
+        return is_file
+    return name.casefold() in listing.folded_files and os.path.isfile(path)
+
+
+def _isfile(path: PathType) -> bool:
+    """os.path.isfile, answered from the discovery cache when it is enabled"""
+    if not get_discovery_cache().enabled:
+        return os.path.isfile(path)
+    directory, name = os.path.split(os.path.abspath(path))
+    return _listed_isfile(get_discovery_cache().listdir(directory), path, name)
+
+
+CONFIG_EXTENSIONS = ["toml", "json", "ini", "yaml"]  ## In order of precedence
+
+
+@dataclass
+class ConfigLookup:
+    """The result of looking for a config file, the file found (if any) and every
+    path that was considered, in order of precedence"""
+
+    path: Optional[str] = None
+    candidates: list[str] = field(default_factory=list)
+    ## Directory listings read during this lookup, so each is read only once
+    _listings: dict[str, Optional[DirListing]] = field(default_factory=dict, repr=False)
+
+    def listdir(self, directory: str) -> Optional[DirListing]:
+        if directory not in self._listings:
+            self._listings[directory] = get_discovery_cache().listdir(directory)
+        return self._listings[directory]
+
+
+def _find_file_with_extensions(
+    path: str, extensions: list[str], lookup: Optional[ConfigLookup] = None
+) -> Optional[str]:
+    """Find a file with given extensions, picking by extension precedence from a
+    single listing of its directory, see `_listed_isfile`"""
+    lookup = lookup if lookup is not None else ConfigLookup()
+    directory, name = os.path.split(os.path.abspath(os.path.expanduser(path)))
+    listing = lookup.listdir(directory)
+
+    lookup.candidates.append(path)
+    if _listed_isfile(listing, os.path.expanduser(path), name):
         return path
     for ext in extensions:
-        full_path = path.replace("<ext>", ext)
-        full_path = os.path.expanduser(full_path)
-        if os.path.isfile(full_path):
+        full_path = os.path.expanduser(path.replace("<ext>", ext))
+        if full_path != path:
+            lookup.candidates.append(full_path)
+        if _listed_isfile(listing, full_path, name.replace("<ext>", ext)):
             log.debug(f"Found config: '{full_path}'")
             return full_path
     return None
 
 
-def _find_config(
-    config_file_or_appname: str | PathType, directories: Optional[PathTypes] = None
-) -> Optional[PathType]:
-    """Find the config file from the config directory or direct path."""
+def _search(search_paths: list[str], extensions: list[str], lookup: ConfigLookup) -> ConfigLookup:
+    """Search the paths in order and set the first file found on lookup"""
+    for path in search_paths:
+        found_path = _find_file_with_extensions(path, extensions, lookup)
+        if found_path:
+            log.debug(f"Found config: '{found_path}'")
+            lookup.path = found_path
+            break
+    return lookup
+
+
+def _lookup_config(
+    config_file_or_appname: str | PathType,
+    directories: Optional[PathTypes] = None,
+    lookup: Optional[ConfigLookup] = None,
+) -> ConfigLookup:
+    """Look for the config file from the config directory or direct path."""
+    lookup = lookup if lookup is not None else ConfigLookup()
     # First, check if it's a direct file path
-    if os.path.isfile(config_file_or_appname):
-        return config_file_or_appname
+    lookup.candidates.append(str(config_file_or_appname))
+    if not is_local_path(config_file_or_appname):
+        ## A URL, whether it exists is only known when it is fetched
+        lookup.path = str(config_file_or_appname)
+        return lookup
+    if _isfile(config_file_or_appname):
+        lookup.path = config_file_or_appname  # type: ignore[assignment]
+        return lookup
 
     # If not a direct file path, check if it looks like a filename (has an extension)
     _, ext = os.path.splitext(config_file_or_appname)
@@ -235,55 +563,78 @@ def _find_config(
     else:
         raise ValueError(f"Invalid config file or appname: '{config_file_or_appname}'")
 
-    extensions = ["toml", "json", "ini", "yaml"] if not ext else [""]
-    for path in search_paths:
-        found_path = _find_file_with_extensions(path, extensions)
-        if found_path:
-            log.debug(f"Found config: '{found_path}'")
-            return found_path
-
-    return None
+    extensions = CONFIG_EXTENSIONS if not ext else [""]
+    return _search(search_paths, extensions, lookup)
 
 
-def _find_config_from_appname(
-    appname: str, file: Optional[PathType] = None, directories: Optional[PathTypes] = None
-) -> Optional[str]:
+def _lookup_config_from_appname(
+    appname: str,
+    file: Optional[PathType] = None,
+    directories: Optional[PathTypes] = None,
+    lookup: Optional[ConfigLookup] = None,
+) -> ConfigLookup:
     """
-    Find a config file based on the appname and optionally a specific file name.
+    Look for a config file based on the appname and optionally a specific file name.
     """
+    lookup = lookup if lookup is not None else ConfigLookup()
     filenames = [file] if file else [".config.toml", "config.<ext>"]
 
     for filename in filenames:
         search_paths = _get_search_paths(filename, directories=directories, appname=appname)
-        extensions = ["toml", "json", "ini", "yaml"] if not file else [""]
+        extensions = CONFIG_EXTENSIONS if not file else [""]
+        if _search(search_paths, extensions, lookup).path:
+            break
+    return lookup
 
-        for path in search_paths:
-            found_path = _find_file_with_extensions(path, extensions)
-            if found_path:
-                log.debug(f"Found config: '{found_path}'")
-                return found_path
 
-    return None
+def _find_config(
+    config_file_or_appname: str | PathType, directories: Optional[PathTypes] = None
+) -> Optional[PathType]:
+    """Find the config file from the config directory or direct path."""
+    return _lookup_config(config_file_or_appname, directories).path
 
 
-def _raise_if_conflicts(existing: dict, incoming: dict, overwrite: bool = False) -> None:
-    if overwrite:
-        return
+def _find_config_from_appname(
+    appname: str, file: Optional[PathType] = None, directories: Optional[PathTypes] = None
+) -> Optional[str]:
+    """
+    Find a config file based on the appname and optionally a specific file name.
+    """
+    return _lookup_config_from_appname(appname, file, directories).path
 
-    conflicting_keys = sorted(set(existing).intersection(incoming))
-    if conflicting_keys:
-        raise ValueError(
-            "Config update would overwrite existing keys: "
-            f"{', '.join(conflicting_keys)}. Pass overwrite=True to allow overwriting."
-        )
+
+def find_config(
+    appname_path: PathType,
+    file: Optional[PathType] = None,
+    directories: Optional[PathType | PathTypes] = None,
+) -> ConfigLookup:
+    """Find the config file that `load_config` would load, first as a path and then
+    as an appname. Each directory is read at most once.
+
+    Args:
+        appname_path (str): A path to a config file or an appname
+        file (Optional[str]): Specific file to search for when resolving an appname
+        directories (Optional[str | list]): Optional list of directories to search
+
+    Returns:
+        ConfigLookup: The file found, if any, and every path that was considered
+    """
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+    lookup = _lookup_config(appname_path, directories)
+    if lookup.path is None and isinstance(appname_path, str):
+        _lookup_config_from_appname(appname_path, file, directories, lookup)
+    return lookup
 
 
 def update_config(
     appname_path_dict: PathType | dict,
     directories: Optional[PathTypes],
     overwrite: bool = False,
+    strategy: Strategies = MergeStrategy.merge,
 ) -> Config:
-    """Update the global config with another config
+    """Update the global config by deep merging another config into it, see
+    `pi_conf.merge.merge_into`
 
     Args:
         appname_path_dict (str): Set the config from an appname | path | dict
@@ -291,16 +642,14 @@ def update_config(
             Dict: updates cfg with the given dict
             str: a path to a (.toml|.json|.ini|.yaml) file
             str: appname to search for the config.toml in the the application config dir
-        overwrite (bool): If True, allow incoming keys to overwrite existing keys
+        overwrite (bool): If True, allow incoming values to overwrite existing values
+        strategy (Strategies): A `MergeStrategy`, or a mapping of dotted paths to
+            strategies, e.g. {"db": "replace", "plugins": "append"}
 
     Returns:
         Config: A config object (an attribute dictionary)
     """
-    newcfg = load_config(appname_path_dict, directories=directories)
-    _raise_if_conflicts(cfg, newcfg, overwrite=overwrite)
-    cfg.update(newcfg, _add_to_provenance=False)
-    get_pmanager().extend(cfg, newcfg.provenance)
-    get_pmanager().delete(newcfg)
+    cfg.load_config(appname_path_dict, directories, overwrite=overwrite, strategy=strategy)
     return cfg
 
 
@@ -327,33 +676,95 @@ def set_config(
     """
     if isinstance(directories, (str, Path)):
         directories = [directories]
-    ncfg = load_config(appname_path_dict, directories=directories, ignore_warnings=True)
-    cfg.clear()
-    cfg.update(ncfg, _add_to_provenance=False)
-    get_pmanager().extend(cfg, ncfg.provenance)
+    with _reload_lock:
+        ncfg = load_config(appname_path_dict, directories=directories, ignore_warnings=True)
+        _last_source[:] = [appname_path_dict, directories]
+        _replace_global_config(ncfg, publish=False)
 
     return cfg
 
 
-def load_from_dict(d: dict) -> Config:
-    """Load a config from a dict"""
-    return Config.from_dict(d)
+def reload_config(
+    appname_path_dict: Optional[str | dict] = None,
+    directories: Optional[str | PathTypes] = None,
+) -> FrozenConfig:
+    """Reload the global config and publish it with a single reference swap. The new
+    config is built off to the side, and the sections that didn't change reuse the
+    subtrees of the previous snapshot, so readers of `cfg_snapshot` only ever see the
+    old or the new config.
 
+    Args:
+        appname_path_dict (Optional[str | dict]): The source to load, see `set_config`.
+            Defaults to the source last given to `set_config` or `reload_config`
+        directories (Optional[str | list]): Optional list of directories to search
 
-def load_from_path(path: PathType, directories: Optional[PathType | PathTypes] = None) -> Config:
+    Returns:
+        FrozenConfig: The published snapshot
+    """
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+    with _reload_lock:
+        if appname_path_dict is None:
+            appname_path_dict, last_directories = _last_source
+            directories = directories if directories is not None else last_directories
+        ncfg = load_config(appname_path_dict, directories=directories, ignore_warnings=True)
+        _last_source[:] = [appname_path_dict, directories]
+        return cast(FrozenConfig, _replace_global_config(ncfg))
+
+
+def _replace_global_config(ncfg: Config, publish: bool = True) -> Optional[FrozenConfig]:
+    """Publish ncfg as the global snapshot, then make cfg hold the same keys. cfg is
+    never emptied on the way, so readers of it see each key either before or after.
+    If publish is False, the snapshot is only frozen when it is next read."""
+    frozen = cfg_snapshot.publish(ncfg) if publish else None
+    stale = [k for k in cfg if k not in ncfg]
+    cfg._update_converted(ncfg)  ## ncfg was just loaded, its subtrees can be shared
+    for k in stale:
+        dict.pop(cfg, k, None)
+    get_pmanager().clear(cfg)
+    get_pmanager().merge(cfg, ncfg)
+    get_pmanager().delete(ncfg)
+    if not publish:
+        cfg_snapshot.publish_lazily(cfg)
+    return frozen
+
+
+def load_from_dict(
+    d: dict, lazy: bool = False, include: Optional[Iterable[str]] = None
+) -> Config:
+    """Load a config from a dict, optionally only the sections at the include paths"""
+    if include is not None:
+        d = _select(d, _include_trie(include))
+    return Config.from_dict(d, lazy=lazy)
+
+
+def load_from_path(
+    path: PathType,
+    directories: Optional[PathType | PathTypes] = None,
+    lazy: bool = False,
+    stream: bool = False,
+    include: Optional[Iterable[str]] = None,
+) -> Config:
     """Load a config from a file path"""
     if isinstance(directories, (str, Path)):
         directories = [directories]
     full_path = _find_config(path, directories=directories)
     if full_path is None:
         raise FileNotFoundError(f"No config file found at '{path}' or in provided directories")
-    newcfg = _load_config_file(full_path)
-    get_pmanager().set(newcfg, Provenance(str(full_path), ProvenanceOp.set))
+    newcfg = _load_config_file(full_path, lazy=lazy, stream=stream, include=include)
+    get_pmanager().record(
+        newcfg, str(full_path), ProvenanceOp.set, replace=True, paths=((k,) for k in newcfg)
+    )
     return newcfg
 
 
 def load_from_appname(
-    appname: str, file: Optional[PathType] = None, directories: Optional[PathTypes] = None
+    appname: str,
+    file: Optional[PathType] = None,
+    directories: Optional[PathTypes] = None,
+    lazy: bool = False,
+    stream: bool = False,
+    include: Optional[Iterable[str]] = None,
 ) -> Config:
     """
     Load a config from an appname, optionally specifying a file name.
@@ -362,6 +773,11 @@ def load_from_appname(
         appname (str): The name of the application
         file (Optional[str]): Specific file to search for. If None, defaults to 'config.<ext>'
         directories (Optional[str | list[str]]): Optional list of directories to search
+        lazy (bool): If True, nested dicts are only converted when first accessed
+        stream (bool): If True, build JSON and YAML configs straight from the parser
+            events, see `load_config`
+        include (Optional[Iterable[str]]): Dotted paths of the only sections to load,
+            see `load_config`
 
     Returns:
         Config: A config object (an attribute dictionary)
@@ -379,7 +795,7 @@ def load_from_appname(
         )
         raise FileNotFoundError(f"No config file found for '{appname}' {filestr}")
 
-    return load_from_path(config_path)
+    return load_from_path(config_path, lazy=lazy, stream=stream, include=include)
 
 
 def load_config(
@@ -391,6 +807,9 @@ def load_config(
     data: Optional[dict] = None,
     path: Optional[PathType] = None,
     appname: Optional[str] = None,
+    lazy: bool = False,
+    stream: bool = False,
+    include: Optional[Iterable[str]] = None,
 ) -> Config:
     """Loads a config based on the given appname | path | dict
 
@@ -402,6 +821,16 @@ def load_config(
         data: Load explicitly from a dict (keyword-only; do not pass a positional source with this).
         path: Load explicitly from a file path (keyword-only).
         appname: Load by application name under OS config dirs (keyword-only).
+        lazy: If True, keep nested dicts as they are and convert each to an AttrDict on
+            first access, so startup cost scales with the sections actually read.
+        stream: If True, build JSON and YAML configs straight from the parser events
+            without an intermediate tree of plain dicts, which lowers peak memory for
+            very large files. Slower than the default for small files.
+        include: Dotted paths of the only sections to load, e.g. ["db", "cache.redis"].
+            The other sections of INI and YAML files are skipped while parsing, those of
+            TOML and JSON files (unless streamed) are parsed but never converted.
+            Selected paths that are missing are ignored. INI section names may contain
+            dots, a path selects the longest section name it starts with.
 
     Returns:
         Config: A config object (an attribute dictionary)
@@ -416,16 +845,25 @@ def load_config(
                 "Use either the positional argument or keyword arguments."
             )
         if data is not None:
-            return load_from_dict(data)
+            return load_from_dict(data, lazy=lazy, include=include)
         if path is not None:
             try:
-                return load_from_path(path, directories)
+                return load_from_path(
+                    path, directories, lazy=lazy, stream=stream, include=include
+                )
             except FileNotFoundError:
                 if ignore_warnings:
                     return Config.from_dict({})
                 raise
         try:
-            return load_from_appname(appname, file, directories)  # type: ignore[arg-type]
+            return load_from_appname(
+                appname,  # type: ignore[arg-type]
+                file,
+                directories,
+                lazy=lazy,
+                stream=stream,
+                include=include,
+            )
         except FileNotFoundError:
             if ignore_warnings:
                 return Config.from_dict({})
@@ -435,16 +873,25 @@ def load_config(
         appname_path_dict = ".config.toml"
 
     if isinstance(appname_path_dict, dict):
-        return load_from_dict(appname_path_dict)
+        return load_from_dict(appname_path_dict, lazy=lazy, include=include)
 
     try:
-        return load_from_path(appname_path_dict, directories)
+        return load_from_path(
+            appname_path_dict, directories, lazy=lazy, stream=stream, include=include
+        )
     except FileNotFoundError:
         # If it's not found as a direct path, try as an appname
 
         try:
             if isinstance(appname_path_dict, str):
-                return load_from_appname(appname_path_dict, file, directories)
+                return load_from_appname(
+                    appname_path_dict,
+                    file,
+                    directories,
+                    lazy=lazy,
+                    stream=stream,
+                    include=include,
+                )
             raise FileNotFoundError(
                 f"No config file found at '{appname_path_dict}' or in provided directories"
             )
@@ -454,4 +901,81 @@ def load_config(
             raise
 
 
+MAX_LOAD_WORKERS = 8
+
+
+def _find_and_parse(path: PathType, directories: Optional[PathTypes]) -> tuple[str, dict]:
+    """Find and parse one file of `load_configs`, in a worker thread or process"""
+    full_path = _find_config(path, directories=directories)
+    if full_path is None:
+        raise FileNotFoundError(f"No config file found at '{path}' or in provided directories")
+    return str(full_path), _parse_cached(full_path, path_extension(full_path))
+
+
+def load_configs(
+    paths: Iterable[PathType],
+    directories: Optional[PathType | PathTypes] = None,
+    merge: Literal["deep", "shallow"] = "deep",
+    executor: Literal["thread", "process"] = "thread",
+    max_workers: Optional[int] = None,
+    lazy: bool = False,
+    strategy: Strategies = MergeStrategy.merge,
+) -> Config:
+    """Load layered config files, such as a base config and environment, region and
+    feature overlays, and merge them in the order given. The files are found and
+    parsed in parallel, then merged in a single pass and converted once.
+
+    Args:
+        paths (Iterable[PathType]): The config files, lowest layer first
+        directories (Optional[str | list]): Optional list of directories to search
+        merge (str): "deep" merges nested sections key by key, "shallow" lets a later
+            file replace whole top level sections
+        executor (str): "thread" parses in threads that share the parse cache,
+            "process" in separate processes. Processes are faster for many large
+            TOML or YAML files, whose parsers hold the GIL.
+        max_workers (Optional[int]): Maximum number of files parsed at the same time
+        lazy (bool): If True, nested dicts are only converted when first accessed
+        strategy (Strategies): How to merge each path of a deep merge, a
+            `MergeStrategy` or a mapping of dotted paths to strategies, see
+            `pi_conf.merge.merge_into`. Later files always win conflicts.
+
+    Returns:
+        Config: The merged config, with a provenance event for each file in order
+
+    Raises:
+        FileNotFoundError: If any of the files is not found
+    """
+    if merge not in ("deep", "shallow"):
+        raise ValueError(f"Error! merge must be 'deep' or 'shallow', got '{merge}'")
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Error! executor must be 'thread' or 'process', got '{executor}'")
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+    paths = list(paths)
+    in_process = executor == "thread" or len(paths) <= 1
+    if len(paths) <= 1:
+        layers = [_find_and_parse(p, directories) for p in paths]
+    else:
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_cls(max_workers=max_workers or min(len(paths), MAX_LOAD_WORKERS)) as pool:
+            layers = list(pool.map(_find_and_parse, paths, repeat(directories)))
+
+    merged, written = _merge_layers((d for __, d in layers), merge == "deep", strategy)
+    if lazy and in_process and any(_is_shared_parse(p) for p, __ in layers):
+        ## Lazy nodes wrap the parsed dicts instead of copying them, and dicts parsed
+        ## in this process may be held by a cache
+        merged = _private_copy(merged)
+    newcfg = Config.from_dict(merged, lazy=lazy)
+    for i, ((source, __), layer_paths) in enumerate(zip(layers, written)):
+        op = ProvenanceOp.set if i == 0 else ProvenanceOp.update
+        get_pmanager().record(newcfg, source, op, replace=i == 0, paths=layer_paths)
+    return newcfg
+
+
 cfg = Config()  ## Our global config
+## Serializes writers of cfg. Readers of cfg_snapshot only take it in the first get()
+## after a lazy publish, to freeze cfg while no writer is changing it
+_reload_lock = threading.RLock()
+## Frozen copy of cfg, published by reload_config and lazily by set_config/update_config
+cfg_snapshot = ConfigSnapshot(source_lock=_reload_lock)
+_last_source: list = [None, None]  ## The source and directories of the last set_config
@@ -1,6 +1,7 @@
 """ Custom BaseSettings class for loading in complex types from toml files 
 using the Config class."""
 
+import inspect
 import json
 import re
 import tempfile
@@ -18,6 +19,7 @@ from pydantic import BaseModel, PrivateAttr, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from pi_conf import Config, load_config
+from pi_conf.aio import run_in_executor
 from pi_conf.config import load_from_appname
 
 # Check if pymongo is installed
@@ -28,6 +30,15 @@ try:
 except ImportError:
     MONGODB_AVAILABLE = False
 
+# An async driver for MongoConfigSource.aload_config, pymongo's own (4.10+) or motor
+try:
+    from pymongo import AsyncMongoClient
+except ImportError:
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+    except ImportError:
+        AsyncMongoClient = None
+
 sentinel = object()
 M = TypeVar('M', bound=BaseModel)
 
@@ -57,6 +68,14 @@ class ConfigSource(ABC):
     @abstractmethod
     def refresh_config(self) -> Config: ...
 
+    async def aload_config(self) -> Config:
+        """Async `load_config`, run in the loader thread pool unless overridden"""
+        return await run_in_executor(self.load_config)
+
+    async def arefresh_config(self) -> Config:
+        """Async `refresh_config`, run in the loader thread pool unless overridden"""
+        return await run_in_executor(self.refresh_config)
+
 
 @dataclass
 class TomlConfigSource(ConfigSource):
@@ -65,12 +84,14 @@ class TomlConfigSource(ConfigSource):
     toml_table_header: str = ""
 
     def load_config(self) -> Config:
+        ## Only the table is converted, the rest of the file is never turned into AttrDicts
+        include = [self.toml_table_header] if self.toml_table_header else None
         if self.toml_file and self.appname:
-            cfg = load_from_appname(appname=self.appname, file=self.toml_file)
+            cfg = load_from_appname(appname=self.appname, file=self.toml_file, include=include)
         elif self.toml_file:
-            cfg = load_config(self.toml_file)
+            cfg = load_config(self.toml_file, include=include)
         elif self.appname:
-            cfg = load_config(self.appname)
+            cfg = load_config(self.appname, include=include)
         else:
             raise ValueError("Either toml_file or appname must be provided")
 
@@ -143,6 +164,31 @@ if MONGODB_AVAILABLE:
             finally:
                 client.close()
 
+        async def aload_config(self) -> Config:
+            """Load the config with an async driver if one is installed, otherwise in
+            the loader thread pool"""
+            if AsyncMongoClient is None:
+                return await run_in_executor(self.load_config)
+            client = AsyncMongoClient(self.mongo_uri)
+            try:
+                collection = client[self.mongo_database][self.mongo_collection]
+                config = await collection.find_one(self.mongo_query)
+                if config is None:
+                    hostname = self._extract_hostname(self.mongo_uri)
+                    raise ValueError(
+                        f"No configuration found in mongodb+srv://{hostname} "
+                        f"{self.mongo_database}.{self.mongo_collection} query: {self.mongo_query}"
+                    )
+                self._id = ObjectId(config.pop("_id"))
+                return Config(config)
+            finally:
+                closed = client.close()  ## A coroutine for pymongo's client, not for motor's
+                if inspect.isawaitable(closed):
+                    await closed
+
+        async def arefresh_config(self) -> Config:
+            return await self.aload_config()
+
         def update_config(self, updates: dict[str, Any]) -> None:
             if self._id is None:
                 raise ValueError("No document ID available. Make sure to load the config first.")
@@ -271,6 +317,14 @@ class ConfigSettings(BaseSettings):
         new_config = self._config_source.refresh_config()
         self.__dict__.update(new_config)
 
+    async def _arefresh(self) -> None:
+        if self._config_source is None:
+            raise ValueError(
+                "ConfigSettings was constructed without a TOML/Mongo source; _arefresh is not available."
+            )
+        new_config = await self._config_source.arefresh_config()
+        self.__dict__.update(new_config)
+
     def _get_config_source(self, model_config: ConfigDict) -> ConfigSource:
         if "mongo_uri" in model_config:
             if MONGODB_AVAILABLE:
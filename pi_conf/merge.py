@@ -0,0 +1,195 @@
+"""Merging of layered config trees, such as a base config with environment and region
+overlays on top. A merge walks the incoming tree once. Dicts that both trees have are
+merged key by key, so setting `db.host` keeps the other keys under `db`, and only the
+values that differ are conflicts. How each path is merged can be set with a
+`MergeStrategy`."""
+
+from enum import Enum
+from typing import Any, Iterable, Mapping, Optional
+
+from pi_conf.attr_dict import AttrDict, _is_converted_list
+
+KeyPath = tuple[str, ...]
+
+
+class MergeStrategy(str, Enum):
+    merge = "merge"  ## Merge dicts key by key, any other value is a conflict
+    replace = "replace"  ## Replace the existing value, subtree or list, never a conflict
+    append = "append"  ## Append incoming lists to existing ones, otherwise like merge
+
+    def __str__(self):
+        return self.value
+
+
+## A strategy for the whole tree, or a mapping of dotted paths to strategies. Paths
+## that aren't given use the strategy of their nearest given parent ("" is the root).
+Strategies = MergeStrategy | str | Mapping[str, MergeStrategy | str]
+
+_MISSING = object()
+_STRATEGY = None  ## The key of a trie node's own strategy, config keys are never None
+
+
+def _strategy_trie(strategy: Strategies, split_delimiter: str) -> tuple[MergeStrategy, dict]:
+    """Get the root strategy and a trie of the strategies set for nested paths"""
+    if isinstance(strategy, str):
+        return MergeStrategy(strategy), {}
+    root_strategy = MergeStrategy(strategy.get("", MergeStrategy.merge))
+    trie: dict = {}
+    for path, s in strategy.items():
+        if path == "":
+            continue
+        node = trie
+        for key in path.split(split_delimiter):
+            node = node.setdefault(key, {})
+        node[_STRATEGY] = MergeStrategy(s)
+    return root_strategy, trie
+
+
+def _store(dest: dict, key: Any, value: Any) -> None:
+    """Set dest[key], converting value first if dest is an AttrDict and it isn't"""
+    if isinstance(dest, AttrDict) and not isinstance(value, AttrDict):
+        if isinstance(value, dict) or (isinstance(value, list) and not _is_converted_list(value)):
+            value = dest._convert_value(value, depth=1)
+    dict.__setitem__(dest, key, value)
+
+
+def _merge(
+    target: dict,
+    incoming: dict,
+    strategy: Strategies,
+    overwrite: bool,
+    write: bool,
+    owned: Optional[dict[int, dict]] = None,
+    split_delimiter: str = ".",
+) -> tuple[list[KeyPath], list[KeyPath]]:
+    """Walk incoming once, merging it into target if write is set
+
+    Args:
+        owned: The dicts created by this merge, by id. If given, any other dict of
+            target is copied before it is written to, so target's subtrees can be
+            shared with other trees. If None, target is modified in place.
+
+    Returns:
+        tuple: The paths written (subtrees only incoming has are written at their
+            root) and the paths of the conflicting values
+    """
+    root_strategy, trie = _strategy_trie(strategy, split_delimiter)
+    written: list[KeyPath] = []
+    conflicts: list[KeyPath] = []
+    stack: list[tuple[dict, dict, KeyPath, MergeStrategy, Optional[dict]]] = [
+        (target, incoming, (), root_strategy, trie)
+    ]
+    while stack:
+        dest, src, path, inherited, node = stack.pop()
+        for key, value in src.items():
+            child = node.get(key) if node else None
+            s = child.get(_STRATEGY, inherited) if child else inherited
+            key_path = path + (key,)
+            current = dest.get(key, _MISSING)
+            if current is _MISSING or s is MergeStrategy.replace:
+                pass
+            elif isinstance(current, dict) and isinstance(value, dict):
+                if write and owned is not None and id(current) not in owned:
+                    copy = dict(current)
+                    dict.__setitem__(dest, key, copy)
+                    owned[id(copy)] = current = copy
+                stack.append((current, value, key_path, s, child))
+                continue
+            elif (
+                s is MergeStrategy.append and isinstance(current, list) and isinstance(value, list)
+            ):
+                value = current + value  ## A new list, current may be shared
+            elif current is value or current == value:
+                continue  ## Setting the same value isn't a conflict and writes nothing
+            elif not overwrite:
+                conflicts.append(key_path)
+                continue
+            if write:
+                _store(dest, key, value)
+            written.append(key_path)
+    return written, conflicts
+
+
+def merge_into(
+    target: dict,
+    incoming: dict,
+    strategy: Strategies = MergeStrategy.merge,
+    overwrite: bool = False,
+    split_delimiter: str = ".",
+) -> list[KeyPath]:
+    """Deep merge incoming into target in place. Branches of target that incoming
+    doesn't touch are left as they are, and nothing is written if there is a conflict.
+
+    Args:
+        target (dict): The config to merge into
+        incoming (dict): The config to merge, its subtrees may end up shared with target
+        strategy (Strategies): A `MergeStrategy` for the whole tree, or a mapping of
+            dotted paths to strategies, e.g. {"db": "replace", "plugins": "append"}
+        overwrite (bool): If True, incoming values replace conflicting ones
+        split_delimiter (str): The delimiter of the dotted paths in strategy
+
+    Returns:
+        list[KeyPath]: The key paths written
+
+    Raises:
+        ValueError: If incoming would change existing values and overwrite is False
+    """
+    if not overwrite:
+        __, conflicts = _merge(target, incoming, strategy, False, False, None, split_delimiter)
+        if conflicts:
+            paths = ", ".join(sorted(split_delimiter.join(map(str, p)) for p in conflicts))
+            raise ValueError(
+                f"Config update would overwrite existing keys: {paths}. "
+                "Pass overwrite=True to allow overwriting."
+            )
+    written, __ = _merge(target, incoming, strategy, True, True, None, split_delimiter)
+    return written
+
+
+def deep_merge(base: dict, overlay: dict, strategy: Strategies = MergeStrategy.merge) -> dict:
+    """Merge overlay on top of base, overlay wins any conflict
+
+    Args:
+        base (dict): The lower layer
+        overlay (dict): The upper layer
+        strategy (Strategies): How to merge each path, see `merge_into`
+
+    Returns:
+        dict: A new dict, sharing the branches that only one of the inputs has
+    """
+    return merge_all([base, overlay], strategy=strategy)
+
+
+def merge_all(
+    layers: Iterable[dict], deep: bool = True, strategy: Strategies = MergeStrategy.merge
+) -> dict:
+    """Merge the layers in order in a single pass, later layers win. The layers are
+    never modified, only the dicts along the paths that several of them set are copied.
+
+    Args:
+        layers (Iterable[dict]): The layers, lowest first
+        deep (bool): If False, a top level key of a later layer replaces the whole
+            subtree of an earlier one
+        strategy (Strategies): How to merge each path of a deep merge, see `merge_into`
+
+    Returns:
+        dict: A new dict, sharing the branches that only one of the layers has
+    """
+    return _merge_layers(layers, deep, strategy)[0]
+
+
+def _merge_layers(
+    layers: Iterable[dict], deep: bool, strategy: Strategies
+) -> tuple[dict, list[list[KeyPath]]]:
+    """`merge_all`, also returning the key paths written by each layer"""
+    result: dict = {}
+    ## Holding the copies keeps their ids from being reused by a later layer's dicts
+    owned = {id(result): result}
+    written = []
+    for layer in layers:
+        if deep:
+            written.append(_merge(result, layer, strategy, True, True, owned)[0])
+        else:
+            result.update(layer)
+            written.append([(k,) for k in layer])
+    return result, written
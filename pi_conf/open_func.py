@@ -1,4 +1,15 @@
+import mmap
+import os
+import re
+from typing import Optional
+from urllib.parse import urlsplit
 
+from pi_conf.definitions import PathType
+
+MMAP_MIN_SIZE = 1 << 20  ## Smaller files are read faster than they are mapped
+_URL = re.compile(r"[A-Za-z][A-Za-z0-9+.-]+://")  ## One letter would be a Windows drive
+
+local_open = open
 open_func = open
 try:
     import fsspec  # type: ignore
@@ -15,3 +26,38 @@ try:
     has_smart_open = True
 except ImportError:
     has_smart_open = False
+
+
+def is_local_path(path: PathType) -> bool:
+    """Whether path names a local file rather than a URL such as s3:// or http://"""
+    return _URL.match(os.fspath(path)) is None
+
+
+def path_extension(path: PathType) -> str:
+    """Get the extension of a file path or URL, for URLs only the path part counts so
+    e.g. 'https://host/config.json?v=1' has the extension '.json'"""
+    path = os.fspath(path)
+    if not is_local_path(path):
+        path = urlsplit(path).path
+    return os.path.splitext(path)[1]
+
+
+def read_mapped(path: PathType, min_size: int = MMAP_MIN_SIZE) -> Optional[str]:
+    """Read a large local file as UTF-8 text decoded straight from a read-only memory map,
+    without first copying its bytes into a Python object.
+
+    Args:
+        path (PathType): The file path
+        min_size (int): Files smaller than this are not mapped
+
+    Returns:
+        Optional[str]: The text, or None if the file is remote or smaller than min_size,
+            in which case read it with `open_func` as usual
+    """
+    if not is_local_path(path):
+        return None
+    with local_open(path, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size < max(min_size, 1):  ## Empty files can't be mapped
+            return None
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, "utf-8")
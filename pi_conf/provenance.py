@@ -1,14 +1,85 @@
-import inspect
 import logging
 import os
-from collections import defaultdict
+import sys
+import weakref
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Optional, overload
 
 log = logging.getLogger(__name__)
 
 PROVENANCE_DEPTH = 2
+SHARED_STACKS_CACHE_SIZE = 1024
+
+RawFrames = tuple[tuple[CodeType, int], ...]
+KeyPath = tuple[str, ...]
+
+_is_pi_conf_file_cache: dict[str, bool] = {}
+
+
+def _is_pi_conf_file(filename: str) -> bool:
+    """Whether the file lives in the pi_conf package, cached per filename"""
+    is_internal = _is_pi_conf_file_cache.get(filename)
+    if is_internal is None:
+        is_internal = os.path.basename(os.path.dirname(filename)) == "pi_conf"
+        _is_pi_conf_file_cache[filename] = is_internal
+    return is_internal
+
+
+def format_frames(frames: Optional[RawFrames]) -> list[str]:
+    """Format raw frames as 'base_name::fn:lineno' strings"""
+    if frames is None:
+        return ["Unknown"]
+    return [
+        f"{os.path.basename(code.co_filename)}::{code.co_name}:{lineno}" for code, lineno in frames
+    ]
+
+
+def _intern(value: Any) -> Any:
+    """Intern plain strings so repeated sources and operations are stored once"""
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+@lru_cache(maxsize=SHARED_STACKS_CACHE_SIZE)
+def _shared_frames(frames: Optional[RawFrames]) -> Optional[RawFrames]:
+    """Return the first stored copy of an identical capture so it is shared"""
+    return frames
+
+
+class FrameStack(tuple):
+    """An abbreviated call stack. It is a tuple so records can share it, and compares
+    equal to a list of the same frames as the stack used to be a list.
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = tuple.__hash__
+
+
+@lru_cache(maxsize=SHARED_STACKS_CACHE_SIZE)
+def _shared_stack(stack: tuple[str, ...]) -> FrameStack:
+    """Return the first stored copy of an identical stack, with interned frame strings"""
+    return FrameStack(sys.intern(frame) for frame in stack)
+
+
+@lru_cache(maxsize=SHARED_STACKS_CACHE_SIZE)
+def _format_shared_frames(frames: Optional[RawFrames]) -> FrameStack:
+    """Format raw frames once per distinct capture"""
+    return _shared_stack(tuple(format_frames(frames)))
 
 
 class ProvenanceOp(str, Enum):
@@ -22,106 +93,461 @@ class ProvenanceOp(str, Enum):
 
 
 class Provenance:
-    """Provenance of the config"""
+    """Provenance of the config, an immutable record. Sources, operations and stack
+    frames are interned, and identical stacks are shared between records.
+    """
+
+    __slots__ = ("source", "operation", "_frames", "_stack")
+
+    source: str
+    operation: str
+    _frames: Optional[RawFrames]
+    _stack: Optional[FrameStack]
+
+    def __init__(self, source: str, operation: str, stack: Optional[Iterable[str]] = None):
+        _set = object.__setattr__
+        _set(self, "source", _intern(source))
+        _set(self, "operation", _intern(operation))
+        if stack is None:
+            frames = _provenance_manager.capture_frames(PROVENANCE_DEPTH)
+            _set(self, "_frames", _shared_frames(frames))
+            _set(self, "_stack", None)
+        else:
+            _set(self, "_frames", None)
+            _set(self, "_stack", _shared_stack(tuple(stack)))
+
+    @property
+    def stack(self) -> FrameStack:
+        """The abbreviated call stack, formatted on first access. A read-only sequence
+        that compares equal to a list of the same frames."""
+        stack = self._stack
+        if stack is None:
+            stack = _format_shared_frames(self._frames)
+            object.__setattr__(self, "_stack", stack)
+            object.__setattr__(self, "_frames", None)
+        return stack
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"Provenance is immutable, cannot set '{name}'")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"Provenance is immutable, cannot delete '{name}'")
 
-    def __init__(self, source: str, operation: str, stack: Optional[list[str]] = None):
-        self.source = source
-        self.stack = stack
-        self.operation = operation
-        if self.stack is None:
-            self.stack = _provenance_manager.get_methods_that_called_this_method(PROVENANCE_DEPTH)
+    def __reduce__(self):
+        return (Provenance, (self.source, self.operation, self.stack))
 
     def __repr__(self):
         return (
-            f"<Provenance: abbr_stack='{self.stack}' source='{self.source}' op='{self.operation}'>"
+            f"<Provenance: abbr_stack='{list(self.stack)}' source='{self.source}' "
+            f"op='{self.operation}'>"
         )
 
     def __str__(self):
         return (
-            f"<Provenance: abbr_stack='{self.stack}' source='{self.source}'> op='{self.operation}'"
+            f"<Provenance: abbr_stack='{list(self.stack)}' source='{self.source}'> "
+            f"op='{self.operation}'"
         )
 
 
+class ProvenanceHistory(Sequence):
+    """Provenance events of an object, oldest first. Stored in a ring buffer, once
+    `maxlen` events are held the oldest event is evicted for each new one and
+    counted in `dropped`. A maxlen of None keeps every event.
+    """
+
+    __slots__ = ("_events", "_start", "maxlen", "dropped")
+
+    def __init__(self, events: Iterable[Provenance] = (), maxlen: Optional[int] = None):
+        self._events: list[Provenance] = []
+        self._start = 0  ## index of the oldest event once the buffer is full
+        self.maxlen = maxlen
+        self.dropped = 0
+        self.extend(events)
+
+    def append(self, provenance: Provenance):
+        """Append an event, evicting the oldest if the history is full"""
+        if self.maxlen is None or len(self._events) < self.maxlen:
+            self._events.append(provenance)
+            return
+        self.dropped += 1
+        if self.maxlen == 0:
+            return
+        self._events[self._start] = provenance
+        self._start = (self._start + 1) % self.maxlen
+
+    def extend(self, provenance: Iterable[Provenance]):
+        """Append each of the given events"""
+        for p in list(provenance):
+            self.append(p)
+
+    def clear(self):
+        """Remove all events and reset the dropped count"""
+        self._events = []
+        self._start = 0
+        self.dropped = 0
+
+    def set_maxlen(self, maxlen: Optional[int]):
+        """Change the maximum number of events, evicting the oldest if needed"""
+        events = list(self)
+        if maxlen is not None and len(events) > maxlen:
+            self.dropped += len(events) - maxlen
+            events = events[len(events) - maxlen :]
+        self._events = events
+        self._start = 0
+        self.maxlen = maxlen
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @overload
+    def __getitem__(self, index: int) -> Provenance: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Provenance]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self._events)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("provenance index out of range")
+        return self._events[(self._start + index) % n]
+
+    def __iter__(self) -> Iterator[Provenance]:
+        events, start = self._events, self._start
+        return iter(events[start:] + events[:start])
+
+    def __eq__(self, other):
+        ## Compares equal to a list of the same events, as the history used to be a list
+        if isinstance(other, (ProvenanceHistory, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        return f"<ProvenanceHistory: {list(self)} dropped={self.dropped}>"
+
+
+class _KeyIndexNode:
+    """A node of the per key index, the event that last wrote the key and the
+    nodes of any nested keys written after it"""
+
+    __slots__ = ("event", "children")
+
+    def __init__(self, event: Optional[Provenance] = None):
+        self.event = event
+        self.children: Optional[dict[str, _KeyIndexNode]] = None
+
+    def copy(self) -> "_KeyIndexNode":
+        node = _KeyIndexNode(self.event)
+        if self.children:
+            node.children = {k: child.copy() for k, child in self.children.items()}
+        return node
+
+    def set(
+        self,
+        path: KeyPath,
+        event: Optional[Provenance],
+        subtree: Optional["_KeyIndexNode"] = None,
+    ):
+        """Set the event that wrote path, replacing anything indexed below it with
+        a copy of subtree's nested keys"""
+        node = self
+        for key in path:
+            if node.children is None:
+                node.children = {}
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _KeyIndexNode()
+            node = child
+        node.event = event
+        node.children = subtree.copy().children if subtree is not None else None
+
+    def lookup(self, path: KeyPath) -> tuple[Optional[Provenance], Optional["_KeyIndexNode"]]:
+        """Get the last event that wrote path or one of its parents, and the node of
+        path itself if it was indexed"""
+        node: Optional[_KeyIndexNode] = self
+        event = self.event
+        for key in path:
+            if node is None or not node.children:
+                return event, None
+            node = node.children.get(key)
+            if node is not None and node.event is not None:
+                event = node.event
+        return event, node
+
+
 @dataclass
 class ProvenanceManager:
-    """Provenance manager"""
-
-    _provenance: dict[int, list[Provenance]] = field(default_factory=lambda: defaultdict(list))
+    """Provenance manager. Entries are keyed by id(obj) and dropped through a weakref
+    callback when the object is collected, so a new object that reuses the id of a
+    collected one starts with a clean history.
+
+    Args:
+        max_events (Optional[int]): Default maximum number of events kept per object,
+            the oldest events are dropped first. None keeps every event.
+        index_keys (bool): If True, keep an index from each key path to the event
+            that last wrote it, see `provenance_of`
+    """
+
+    max_events: Optional[int] = None
+    index_keys: bool = False
+    _provenance: dict[int, ProvenanceHistory] = field(default_factory=dict)
+    _key_index: dict[int, _KeyIndexNode] = field(default_factory=dict)
     _enabled: set[int] = field(default_factory=set)
+    _refs: dict[int, weakref.ref] = field(default_factory=dict)
+
+    def _track(self, obj) -> int:
+        """Watch obj so that its entries are removed when it is collected"""
+        oid = id(obj)
+        ref = self._refs.get(oid)
+        if ref is not None and ref() is obj:
+            return oid
+        self._forget(oid)  ## Anything left under this id belonged to a dead object
+
+        def on_collect(ref: weakref.ref, oid: int = oid):
+            if self._refs.get(oid) is ref:
+                self._forget(oid)
+
+        try:
+            self._refs[oid] = weakref.ref(obj, on_collect)
+        except TypeError:  ## Not weak referenceable, relies on an explicit delete
+            pass
+        return oid
+
+    def _forget(self, oid: int):
+        """Remove every entry kept for the given id"""
+        self._provenance.pop(oid, None)
+        self._key_index.pop(oid, None)
+        self._enabled.discard(oid)
+        self._refs.pop(oid, None)
+
+    def _history(self, oid: int) -> ProvenanceHistory:
+        """Get the history for the given id, creating it if needed"""
+        history = self._provenance.get(oid)
+        if history is None:
+            history = self._provenance[oid] = ProvenanceHistory(maxlen=self.max_events)
+        return history
 
     def set_enabled(self, obj, enable: bool = True):
         """Set whether or not to enable provenance"""
         if enable:
-            self._enabled.add(id(obj))
+            self._enabled.add(self._track(obj))
         else:
             self._enabled.discard(id(obj))
 
-    def get(self, obj) -> list[Provenance]:
+    def set_max_events(self, obj, max_events: Optional[int]):
+        """Set the maximum number of events kept for the given object"""
+        oid = id(obj)
+        if oid not in self._enabled:
+            return
+        self._history(oid).set_maxlen(max_events)
+
+    def get(self, obj) -> ProvenanceHistory:
         """Get the provenance of the given object"""
-        return self._provenance.get(id(obj), [])
+        history = self._provenance.get(id(obj))
+        if history is None:
+            return ProvenanceHistory()
+        return history
 
-    def set(self, obj, provenance: Provenance | list[Provenance]):
+    def set(self, obj, provenance: Provenance | Iterable[Provenance]):
         """Set the provenance of the given object"""
         oid = id(obj)
         if oid not in self._enabled:
             return
         if isinstance(provenance, Provenance):
             provenance = [provenance]
-        self._provenance[oid] = provenance
+        history = self._history(oid)
+        history.clear()
+        history.extend(provenance)
 
     def append(self, obj, provenance: Provenance):
         """Append to the provenance of the given object"""
         oid = id(obj)
         if oid not in self._enabled:
             return
-        self._provenance[oid].append(provenance)
-
-    def extend(self, obj, provenance: list[Provenance]):
+        self._history(oid).append(provenance)
+
+    def record(
+        self,
+        obj,
+        source: str,
+        operation: str,
+        replace: bool = False,
+        paths: Optional[Iterable[KeyPath]] = None,
+    ):
+        """Record a new event for the given object, only building the Provenance
+        (and capturing its stack) if provenance is enabled for it
+
+        Args:
+            obj: The object the event happened to
+            source (str): Where the change came from, a path or "dict"
+            operation (str): The ProvenanceOp of the change
+            replace (bool): If True, the event replaces the existing history
+            paths (Optional[Iterable[KeyPath]]): The key paths written by the event,
+                only consumed when `index_keys` is set
+        """
+        oid = id(obj)
+        if oid not in self._enabled:
+            return
+        history = self._history(oid)
+        if replace:
+            history.clear()
+            self._key_index.pop(oid, None)
+        stack = None if self._capture_stack(history) else ()
+        history.append(Provenance(source, operation, stack))
+        if paths is not None:
+            self.index(obj, paths)
+
+    def index(self, obj, paths: Iterable[KeyPath], event: Optional[Provenance] = None):
+        """Index the given key paths as written by event, the latest event by default"""
+        oid = id(obj)
+        if not self.index_keys or oid not in self._enabled:
+            return
+        if event is None:
+            history = self._provenance.get(oid)
+            if not history:
+                return
+            event = history[-1]
+        root = self._key_index.get(oid)
+        if root is None:
+            root = self._key_index[oid] = _KeyIndexNode()
+        for path in paths:
+            root.set(path, event)
+
+    def merge(self, obj, other, paths: Optional[Iterable[KeyPath]] = None):
+        """Add the events of other to obj, indexing the key paths taken from other
+        (its top level keys by default) with the events other recorded for them"""
+        oid = id(obj)
+        if oid not in self._enabled:
+            return
+        other_history = self.get(other)
+        self._history(oid).extend(other_history)
+        if not self.index_keys:
+            return
+        if paths is None:
+            paths = ((k,) for k in other)
+        root = self._key_index.get(oid)
+        if root is None:
+            root = self._key_index[oid] = _KeyIndexNode()
+        other_root = self._key_index.get(id(other))
+        last_event = other_history[-1] if other_history else None
+        for path in paths:
+            if other_root is None:
+                root.set(path, last_event)
+            else:
+                event, node = other_root.lookup(path)
+                root.set(path, event, subtree=node)
+
+    def provenance_of(self, obj, path: KeyPath) -> Optional[Provenance]:
+        """Get the event that last wrote the given key path, None if not indexed"""
+        root = self._key_index.get(id(obj))
+        if root is None:
+            return None
+        return root.lookup(path)[0]
+
+    def _capture_stack(self, history: ProvenanceHistory) -> bool:
+        """Whether to capture the call stack of the next event added to history"""
+        return True
+
+    def extend(self, obj, provenance: Iterable[Provenance]):
         """Extend the provenance of the given object"""
         oid = id(obj)
         if oid not in self._enabled:
             return
-        self._provenance[id(obj)].extend(provenance)
+        self._history(oid).extend(provenance)
 
     def clear(self, obj):
         """Clear the provenance of the given object"""
         oid = id(obj)
         if oid not in self._enabled:
             return
-        self._provenance[id(obj)] = []
+        self._history(oid).clear()
+        self._key_index.pop(oid, None)
 
     def __repr__(self):
         return f"<ProvenanceManager: {self._provenance}>"
 
+    def footprint(self) -> dict[str, int]:
+        """Report the number of tracked objects, kept and dropped events, and the
+        approximate memory in bytes held by the manager's bookkeeping and events"""
+        histories = list(self._provenance.values())
+        nbytes = (
+            sys.getsizeof(self._provenance)
+            + sys.getsizeof(self._enabled)
+            + sys.getsizeof(self._refs)
+            + sum(sys.getsizeof(ref) for ref in self._refs.values())
+            + sum(sys.getsizeof(h) + sys.getsizeof(h._events) for h in histories)
+            + sum(sys.getsizeof(p) for h in histories for p in h._events)
+        )
+        return {
+            "objects": len(self._refs),
+            "events": sum(len(h) for h in histories),
+            "dropped": sum(h.dropped for h in histories),
+            "bytes": nbytes,
+        }
+
     def delete(self, obj):
         """Delete the provenance of the given object"""
+        self._provenance.pop(id(obj), None)
+        self._key_index.pop(id(obj), None)
+
+    @staticmethod
+    def capture_frames(depth: Optional[int] = None) -> Optional[RawFrames]:
+        """Capture the calling frames outside of pi_conf in a single walk of the stack.
+        Only the code object and line number are recorded, formatting is left to
+        `format_frames` so it can be deferred until the stack is read.
+        """
         try:
-            del self._provenance[id(obj)]
-        except KeyError:
-            pass
+            frames = []
+            frame = sys._getframe(1)
+            while frame is not None:
+                code = frame.f_code
+                if not _is_pi_conf_file(code.co_filename):
+                    frames.append((code, frame.f_lineno))
+                frame = frame.f_back
+        except Exception as e:
+            log.error(f"Error! {e}")
+            return None
+        if depth is not None:
+            frames = frames[-depth:]
+        frames.reverse()
+        return tuple(frames)
 
     @staticmethod
     def get_methods_that_called_this_method(depth: Optional[int] = None) -> list[str]:
         """Get the method that called this method"""
-        try:
-            stack = []
-            for i in range(len(inspect.stack())):
-                frame = inspect.stack()[i]
-                lineno = frame.lineno
-                module_path = frame.filename
-                base_name = os.path.basename(module_path)
-                n = os.path.basename(os.path.dirname(module_path))
-                if n == "pi_conf":
-                    continue
-                fn = frame.function
-                stack.append(f"{base_name}::{fn}:{lineno}")
-            if depth is not None:
-                return stack[-depth:][::-1]
-            return stack[::-1]
+        return format_frames(ProvenanceManager.capture_frames(depth))
 
-        except Exception as e:
-            log.error(f"Error! {e}")
-            return ["Unknown"]
+
+@dataclass
+class SamplingProvenanceManager(ProvenanceManager):
+    """Provenance manager that records the source and operation of every event, but
+    only captures call stacks for a sample of them. Events recorded without a stack
+    have an empty `stack`.
+
+    Args:
+        sample_every (int): Capture the stack of 1 in every N events
+        sample_first (Optional[int]): Only capture stacks for the first K events of
+            each object. None doesn't limit by count.
+    """
+
+    sample_every: int = 1
+    sample_first: Optional[int] = None
+    _events_seen: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.sample_every < 1:
+            raise ValueError(f"Error! sample_every must be at least 1, got {self.sample_every}")
+
+    def _capture_stack(self, history: ProvenanceHistory) -> bool:
+        if self.sample_first is not None and len(history) + history.dropped >= self.sample_first:
+            return False
+        self._events_seen += 1
+        return (self._events_seen - 1) % self.sample_every == 0
 
 
 @dataclass
@@ -131,17 +557,40 @@ class NullOpProvenanceManager(ProvenanceManager):
     def set_enabled(self, obj, enable: bool = True):
         pass
 
-    def get(self, obj) -> list[Provenance]:
+    def set_max_events(self, obj, max_events: Optional[int]):
+        """Set the maximum number of events kept for the given object"""
+
+    def get(self, obj) -> ProvenanceHistory:
         """Get the provenance of the given object"""
-        return []
+        return ProvenanceHistory()
 
-    def set(self, obj, provenance: Provenance | list[Provenance]):
+    def set(self, obj, provenance: Provenance | Iterable[Provenance]):
         """Set the provenance of the given object"""
 
     def append(self, obj, provenance: Provenance):
         """Append to the provenance of the given object"""
 
-    def extend(self, obj, provenance: list[Provenance]):
+    def record(
+        self,
+        obj,
+        source: str,
+        operation: str,
+        replace: bool = False,
+        paths: Optional[Iterable[KeyPath]] = None,
+    ):
+        """Record a new event for the given object"""
+
+    def index(self, obj, paths: Iterable[KeyPath], event: Optional[Provenance] = None):
+        """Index the given key paths as written by event"""
+
+    def merge(self, obj, other, paths: Optional[Iterable[KeyPath]] = None):
+        """Add the events of other to obj"""
+
+    def provenance_of(self, obj, path: KeyPath) -> Optional[Provenance]:
+        """Get the event that last wrote the given key path"""
+        return None
+
+    def extend(self, obj, provenance: Iterable[Provenance]):
         """Extend the provenance of the given object"""
 
     def clear(self, obj):
@@ -153,6 +602,11 @@ class NullOpProvenanceManager(ProvenanceManager):
     def delete(self, obj):
         """Delete the provenance of the given object"""
 
+    @staticmethod
+    def capture_frames(depth: Optional[int] = None) -> Optional[RawFrames]:
+        """Capture the calling frames, a null op"""
+        return None
+
     @staticmethod
     def get_methods_that_called_this_method(depth: Optional[int] = None) -> list[str]:
         """Get the method that called this method"""
@@ -162,11 +616,35 @@ class NullOpProvenanceManager(ProvenanceManager):
 _provenance_manager = ProvenanceManager()  ## provenance of the config
 
 
-def set_use_provenance(use_provenance: bool = True):
-    """Set whether or not to use provenance"""
+def set_use_provenance(
+    use_provenance: bool = True,
+    max_events: Optional[int] = None,
+    sample_every: Optional[int] = None,
+    sample_first: Optional[int] = None,
+    index_keys: bool = False,
+):
+    """Set whether or not to use provenance
+
+    Args:
+        use_provenance (bool): If False, no provenance is recorded
+        max_events (Optional[int]): Maximum number of events kept per config,
+            the oldest events are dropped first. None keeps every event.
+        sample_every (Optional[int]): Only capture call stacks for 1 in N events
+        sample_first (Optional[int]): Only capture call stacks for the first K events
+            of each config
+        index_keys (bool): If True, index which event last wrote each key so that
+            `Config.provenance_of` can answer without replaying the history
+    """
     global _provenance_manager
-    if use_provenance:
-        _provenance_manager = ProvenanceManager()
+    if use_provenance and (sample_every is not None or sample_first is not None):
+        _provenance_manager = SamplingProvenanceManager(
+            max_events=max_events,
+            index_keys=index_keys,
+            sample_every=sample_every if sample_every is not None else 1,
+            sample_first=sample_first,
+        )
+    elif use_provenance:
+        _provenance_manager = ProvenanceManager(max_events=max_events, index_keys=index_keys)
     else:
         _provenance_manager = NullOpProvenanceManager()
 
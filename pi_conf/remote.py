@@ -0,0 +1,234 @@
+"""Loading config files from remote URLs. http(s) configs are fetched over pooled
+keep-alive connections and revalidated with ETag / If-Modified-Since, so loading an
+unchanged config again costs one round trip that returns no body. Redirects are followed
+up to MAX_REDIRECTS times. Other URLs, such as s3:// or gs://, go through fsspec when it
+is installed, reusing one filesystem per protocol and comparing the object's ETag or
+modification time before downloading it again. See `set_remote_fetcher`."""
+
+import http.client
+import logging
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+from urllib.parse import urljoin, urlsplit
+
+from pi_conf.open_func import has_fsspec
+
+if has_fsspec:
+    import fsspec  # type: ignore
+
+log = logging.getLogger(__name__)
+
+REMOTE_TIMEOUT = 10.0
+MAX_IDLE_CONNECTIONS = 4  ## Kept open per host
+MAX_REDIRECTS = 5
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+## A keep-alive connection the server has since closed fails on its next request
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class _Remote(NamedTuple):
+    validator: tuple  ## (ETag, Last-Modified) for http(s), the object's info otherwise
+    content: bytes
+    parsed: dict  ## ext -> the parsed content
+
+
+class RemoteFetcher:
+    """Fetches remote config files, keeping the last content of each URL to revalidate
+    it against the server instead of downloading it again.
+
+    Args:
+        timeout (float): Seconds to wait for a connection or response
+        max_idle (int): Idle keep-alive connections kept open per host
+    """
+
+    def __init__(self, timeout: float = REMOTE_TIMEOUT, max_idle: int = MAX_IDLE_CONNECTIONS):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.hits = self.misses = 0  ## Unchanged and downloaded fetches
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._filesystems: dict[str, Any] = {}
+        self._entries: dict[str, _Remote] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> bytes:
+        """Get the content at url, downloading it only if it changed since the last fetch
+
+        Args:
+            url (str): An http(s) URL, or any URL fsspec supports
+
+        Returns:
+            bytes: The content
+
+        Raises:
+            FileNotFoundError: If there is nothing at url
+        """
+        return self._fetch(url).content
+
+    def get_or_parse(self, url: str, ext: str, parse: Callable[[str, str], dict]) -> dict:
+        """Get the parsed content at url, calling parse(text, ext) only if it changed
+        since it was last parsed. The result is shared, callers must not modify it.
+        """
+        entry = self._fetch(url)
+        parsed = entry.parsed.get(ext)
+        if parsed is None:
+            parsed = entry.parsed[ext] = parse(entry.content.decode("utf-8"), ext)
+        return parsed
+
+    def close(self) -> None:
+        """Close the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def clear(self) -> None:
+        """Forget the cached content, the next fetch of every URL downloads it again"""
+        with self._lock:
+            self._entries.clear()
+
+    def _fetch(self, url: str) -> _Remote:
+        scheme = urlsplit(url).scheme
+        with self._lock:
+            cached = self._entries.get(url)
+        if scheme in ("http", "https"):
+            entry = self._fetch_http(url, cached)
+        else:
+            entry = self._fetch_fsspec(url, scheme, cached)
+        if entry is cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+            with self._lock:
+                self._entries[url] = entry
+        return entry
+
+    def _fetch_http(self, url: str, cached: Optional[_Remote]) -> _Remote:
+        headers = {}
+        if cached is not None:
+            etag, last_modified = cached.validator
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        location = url
+        for __ in range(MAX_REDIRECTS + 1):
+            resp, body = self._get(location, headers)
+            if resp.status not in _REDIRECT_STATUSES:
+                break
+            target = resp.getheader("Location")
+            if not target:
+                raise OSError(
+                    f"Error! Fetching '{url}' failed, HTTP {resp.status} has no Location header"
+                )
+            location = urljoin(location, target)
+            if urlsplit(location).scheme not in ("http", "https"):
+                raise OSError(f"Error! '{url}' redirects to unsupported URL '{location}'")
+            log.debug(f"Following HTTP {resp.status} redirect of '{url}' to '{location}'")
+        else:
+            raise OSError(f"Error! Fetching '{url}' failed, more than {MAX_REDIRECTS} redirects")
+
+        if resp.status == 304 and cached is not None:
+            return cached
+        if resp.status == 404:
+            raise FileNotFoundError(f"No config file found at '{url}'")
+        if resp.status != 200:
+            raise OSError(f"Error! Fetching '{url}' failed with HTTP {resp.status} {resp.reason}")
+        return _Remote((resp.getheader("ETag"), resp.getheader("Last-Modified")), body, {})
+
+    def _get(self, url: str, headers: dict[str, str]) -> tuple[http.client.HTTPResponse, bytes]:
+        """GET url over a pooled connection, the body is read so the connection can
+        be reused"""
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        key = (parts.scheme, parts.netloc)
+        conn, reused = self._connection(key)
+        try:
+            try:
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                log.debug(f"Reconnecting to '{parts.netloc}', the idle connection was closed")
+                conn.close()
+                conn, reused = self._connection(key, new=True)
+                conn.request("GET", target, headers=headers)
+                resp = conn.getresponse()
+            body = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return resp, body
+
+    def _connection(
+        self, key: tuple[str, str], new: bool = False
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        """Get an idle connection to the host, or a new one, and whether it was idle"""
+        if not new:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), True
+        scheme, netloc = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout), False
+
+    def _release(self, key: tuple[str, str], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _fetch_fsspec(self, url: str, protocol: str, cached: Optional[_Remote]) -> _Remote:
+        if not has_fsspec:
+            raise ImportError(
+                f"Error! Loading '{url}' requires fsspec, install it with 'pip install fsspec'"
+            )
+        with self._lock:
+            fs = self._filesystems.get(protocol)
+            if fs is None:
+                fs = self._filesystems[protocol] = fsspec.filesystem(protocol)
+        path = fs._strip_protocol(url)
+        try:
+            info = fs.info(path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No config file found at '{url}'")
+        ## Whichever of these the filesystem reports changes when the object does
+        validator = tuple(
+            info.get(k) for k in ("ETag", "etag", "LastModified", "mtime", "generation", "size")
+        )
+        if cached is not None and cached.validator == validator:
+            return cached
+        return _Remote(validator, fs.cat_file(path), {})
+
+
+_remote_fetcher = RemoteFetcher()
+
+
+def set_remote_fetcher(
+    timeout: float = REMOTE_TIMEOUT, max_idle: int = MAX_IDLE_CONNECTIONS
+) -> None:
+    """Set up the fetcher of remote config files, this closes the previous one's
+    connections and drops its cached content
+
+    Args:
+        timeout (float): Seconds to wait for a connection or response
+        max_idle (int): Idle keep-alive connections kept open per host
+    """
+    global _remote_fetcher
+    _remote_fetcher.close()
+    _remote_fetcher = RemoteFetcher(timeout=timeout, max_idle=max_idle)
+
+
+def get_remote_fetcher() -> RemoteFetcher:
+    """Get the fetcher of remote config files"""
+    return _remote_fetcher
@@ -0,0 +1,547 @@
+"""Build AttrDict trees straight from parser events, without first parsing the whole
+file into a tree of plain dicts. Used by `load_config(..., stream=True)` to roughly
+halve the peak memory of loading very large JSON and YAML configs."""
+
+import json
+import re
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from typing import IO, Any, Optional
+
+from pi_conf.attr_dict import (
+    AttrDict,
+    IncludeTrie,
+    _attr_dict_dont_overwrite,
+    _convert_tree,
+    _new_attr_dict,
+    _select,
+    sentinel,
+)
+from pi_conf.module_check import has_yaml
+
+if has_yaml:
+    import yaml
+
+CHUNK_SIZE = 1 << 16
+STREAMING_EXTENSIONS = (".json", ".yaml")
+
+_JSON_TOKEN = re.compile(
+    r"[ \t\n\r]*(?:([{}\[\],:])|(\")|(-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(true|false|null|NaN|Infinity|-Infinity))"
+)
+_JSON_CONSTANTS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+    "-Infinity": float("-inf"),
+}
+
+
+_SKIP = object()  ## The selection trie of a key that isn't included
+
+
+def _raise_if_reserved_key(key: Any) -> None:
+    if key in _attr_dict_dont_overwrite:
+        raise ValueError(f"Error! config key={key} would overwrite a default dict attr/func")
+
+
+class _Tree:
+    """Builds the tree as containers are opened and closed and values are added,
+    keeping only the selected subtrees"""
+
+    def __init__(self, cls: type, include: Optional[IncludeTrie] = None):
+        self.cls = cls
+        self.include = include
+        self.root: Any = None
+        self.stack: list[Any] = []  ## The open containers
+        self.saved: list[tuple[Any, Any, Any]] = []  ## Each enclosing (key, trie, child key)
+        self.key: Any = sentinel  ## The pending key of the innermost dict
+        self.trie: Any = include  ## The selection within the innermost container
+        self.value_trie: Any = None  ## The selection within the value of the pending key
+
+    def in_mapping(self) -> bool:
+        return bool(self.stack) and not isinstance(self.stack[-1], list)
+
+    def expects_key(self) -> bool:
+        return self.key is sentinel and self.in_mapping()
+
+    def set_key(self, key: Any) -> None:
+        _raise_if_reserved_key(key)
+        self.key = key
+        self.value_trie = None if self.trie is None else self.trie.get(key, _SKIP)
+
+    def selected(self, is_dict: bool) -> bool:
+        """Whether the next value is kept, the pending key is dropped if it isn't"""
+        if not self.in_mapping():
+            return True
+        if _value_selected(self.value_trie, is_dict):
+            return True
+        self.key = sentinel
+        return False
+
+    def add(self, value: Any) -> tuple[Any, Any]:
+        """Add value to the innermost container
+
+        Returns:
+            tuple: The selection within value and the key it was added under
+        """
+        if not self.stack:
+            raise ValueError("Error! The top level of a config must be a mapping")
+        top = self.stack[-1]
+        if isinstance(top, list):
+            top.append(value)
+            return None, sentinel
+        key, self.key = self.key, sentinel
+        dict.__setitem__(top, key, value)
+        return self.value_trie, key
+
+    def open(self, is_dict: bool, detached: bool = False) -> Any:
+        """Open a container, a detached one is built whole but not added to the tree"""
+        child_trie, child_key = None, sentinel
+        if detached:
+            node = _new_attr_dict() if is_dict else []
+        elif not self.stack and self.root is None:
+            if not is_dict:
+                raise ValueError("Error! The top level of a config must be a mapping")
+            node = self.root = self.cls()
+            child_trie = self.include
+        else:
+            node = _new_attr_dict() if is_dict else []
+            child_trie, child_key = self.add(node)
+        self.stack.append(node)
+        self.saved.append((self.key, self.trie, child_key))
+        self.key = sentinel
+        self.trie = child_trie if is_dict else None
+        return node
+
+    def close(self) -> Any:
+        closed, closed_trie = self.stack.pop(), self.trie
+        self.key, self.trie, child_key = self.saved.pop()
+        if not closed and closed_trie is not None and child_key is not sentinel:
+            del self.stack[-1][child_key]  ## Nothing selected was found below it
+        return closed
+
+    def result(self) -> Any:
+        if self.stack:
+            raise ValueError("Error! Unexpected end of config, a mapping or list is not closed")
+        return self.root if self.root is not None else self.cls()
+
+
+def _value_selected(trie: Any, is_dict: bool) -> bool:
+    """Whether a value under a key with the given selection trie is kept: a selected
+    key keeps its whole value, a path that continues below it needs a mapping"""
+    return trie is None or (trie is not _SKIP and is_dict)
+
+
+## What the next JSON token may be
+_VALUE, _FIRST_VALUE, _KEY, _FIRST_KEY, _COLON, _SEP, _END = range(7)
+_EXPECTING = {
+    _VALUE: "expecting value",
+    _FIRST_VALUE: "expecting value",
+    _KEY: "expecting property name enclosed in double quotes",
+    _FIRST_KEY: "expecting property name enclosed in double quotes",
+    _COLON: "expecting ':' delimiter",
+    _SEP: "expecting ',' delimiter",
+    _END: "extra data after the config",
+}
+
+
+def _raise_unexpected(state: int, token: str, kinds: list[str]) -> None:
+    in_array = kinds[-1:] == ["["]
+    if (state == _KEY and token == "}") or (state == _VALUE and token == "]" and in_array):
+        kind = "object" if token == "}" else "array"
+        raise ValueError(f"Error! Invalid JSON, illegal trailing comma before end of {kind}")
+    raise ValueError(f"Error! Invalid JSON, {_EXPECTING[state]}")
+
+
+def _closing_quote(s: str, start: int) -> int:
+    """Get the index of the first unescaped quote in s at or after start, or -1. start
+    must be inside a string, whose opening quote stops the count of backslashes."""
+    i = s.find('"', start)
+    while i >= 0:
+        j = i
+        while s[j - 1] == "\\":
+            j -= 1
+        if (i - j) % 2 == 0:
+            return i
+        i = s.find('"', i + 1)
+    return -1
+
+
+def _read_string_end(fp: IO[str], buf: str, chunk_size: int) -> tuple[str, bool]:
+    """Read until buf, which ends inside a string, holds the string's closing quote.
+    Only the text read since the last look is searched, and reads grow with buf so
+    joining a long string stays linear.
+
+    Returns:
+        tuple: The buffer and whether the end of the file was reached
+    """
+    while True:
+        search = len(buf)
+        chunk = fp.read(max(chunk_size, search))
+        if not chunk:
+            return buf, True
+        buf += chunk
+        if _closing_quote(buf, search) >= 0:
+            return buf, False
+
+
+def load_json(
+    fp: IO[str],
+    cls: type = AttrDict,
+    chunk_size: int = CHUNK_SIZE,
+    include: Optional[IncludeTrie] = None,
+) -> Any:
+    """Load a JSON config into a tree of cls (top level) and AttrDicts, reading the
+    file a chunk at a time. Invalid JSON raises a ValueError, as with `json.load`.
+
+    Args:
+        fp (IO[str]): The open file
+        cls (type): The AttrDict class of the top level
+        chunk_size (int): The number of characters read at a time
+        include (Optional[IncludeTrie]): Only build these subtrees, the rest of the
+            file is tokenized but nothing is built for it
+
+    Returns:
+        AttrDict: The config, an instance of cls
+    """
+    ## One loop with everything in locals, this runs once per token
+    match = _JSON_TOKEN.match
+    setitem = dict.__setitem__
+    keys: dict[str, str] = {}  ## Repeated keys share one string, as with json.load
+    root: Any = None
+    stack: list[Any] = []  ## The open containers
+    saved: list[tuple[Any, Any, Any]] = []  ## Each enclosing (key, trie, key of the child)
+    kinds: list[str] = []  ## The opening bracket of each open container, skipped ones too
+    state = _VALUE  ## What the next token may be
+    key: Any = sentinel  ## The pending key of the innermost dict, if it is a dict
+    trie: Any = include  ## The selection within the innermost container, None for all
+    value_trie: Any = None  ## The selection within the value of the pending key
+    top: Any = None
+    skip = 0  ## The number of open containers that are being skipped
+    buf, pos, eof = "", 0, False
+
+    while True:
+        m = match(buf, pos)
+        ## A token near the end of the buffer may continue in the next chunk, a number
+        ## can be cut off as "1e-" so a couple of characters must follow it
+        if m is None or (not eof and m.end() + 2 >= len(buf)):
+            chunk = fp.read(chunk_size)
+            if chunk:
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            eof = True
+            if m is None:
+                if buf[pos:].strip():
+                    raise json.JSONDecodeError("Expecting value", buf, pos)
+                break
+        punct, quote, number, constant = m.groups()
+
+        if quote:
+            try:
+                value, end = scanstring(buf, m.end())
+            except json.JSONDecodeError:
+                if eof or _closing_quote(buf, m.end()) >= 0:
+                    raise
+                buf, eof = _read_string_end(fp, buf[pos:], chunk_size)
+                pos = 0
+                continue
+            pos = end
+            if state == _KEY or state == _FIRST_KEY:
+                state = _COLON
+                if skip:
+                    continue
+                if value in _attr_dict_dont_overwrite:
+                    _raise_if_reserved_key(value)
+                key = keys.setdefault(value, value)
+                value_trie = None if trie is None else trie.get(key, _SKIP)
+                continue
+            if state != _VALUE and state != _FIRST_VALUE:
+                _raise_unexpected(state, '"', kinds)
+            state = _SEP if kinds else _END
+            if skip:
+                continue
+        else:
+            pos = m.end()
+            if punct:
+                if punct == ":":
+                    if state != _COLON:
+                        _raise_unexpected(state, punct, kinds)
+                    state = _VALUE
+                    continue
+                if punct == ",":
+                    if state != _SEP:
+                        _raise_unexpected(state, punct, kinds)
+                    state = _KEY if kinds[-1] == "{" else _VALUE
+                    continue
+                if punct == "}" or punct == "]":
+                    if not (
+                        state == _SEP or state == (_FIRST_KEY if punct == "}" else _FIRST_VALUE)
+                    ) or kinds[-1] != ("{" if punct == "}" else "["):
+                        _raise_unexpected(state, punct, kinds)
+                    kinds.pop()
+                    state = _SEP if kinds else _END
+                    if skip:
+                        skip -= 1
+                        continue
+                    closed, closed_trie = stack.pop(), trie
+                    key, trie, child_key = saved.pop()
+                    top = stack[-1] if stack else None
+                    if not closed and closed_trie is not None and child_key is not sentinel:
+                        del top[child_key]  ## Nothing selected was found below it
+                    continue
+                if state != _VALUE and state != _FIRST_VALUE:
+                    _raise_unexpected(state, punct, kinds)
+                kinds.append(punct)
+                state = _FIRST_KEY if punct == "{" else _FIRST_VALUE
+                if skip:
+                    skip += 1
+                    continue
+                value = _new_attr_dict() if punct == "{" else []
+                if root is None:
+                    if punct != "{":
+                        raise ValueError("Error! The top level of a config must be a mapping")
+                    value = root = cls()
+            else:
+                if state != _VALUE and state != _FIRST_VALUE:
+                    _raise_unexpected(state, number or constant, kinds)
+                state = _SEP if kinds else _END
+                if skip:
+                    continue
+                if number:
+                    is_float = "." in number or "e" in number or "E" in number
+                    value = float(number) if is_float else int(number)
+                else:
+                    value = _JSON_CONSTANTS[constant]
+
+        child_trie = None
+        child_key = sentinel
+        if top is None:
+            if value is not root:
+                raise ValueError("Error! The top level of a config must be a mapping")
+            child_trie = include
+        elif type(top) is list:
+            top.append(value)
+        elif not _value_selected(value_trie, punct == "{"):
+            key = sentinel
+            if punct == "{" or punct == "[":
+                skip = 1
+            continue
+        else:
+            setitem(top, key, value)
+            child_trie, child_key = value_trie, key
+            key = sentinel
+        if punct == "{" or punct == "[":
+            stack.append(value)
+            saved.append((key, trie, child_key))
+            key = sentinel
+            trie = child_trie if punct == "{" else None
+            top = value
+
+    if kinds:
+        raise ValueError("Error! Unexpected end of config, a mapping or list is not closed")
+    if root is None:
+        raise ValueError("Error! Invalid JSON, expecting value, the config is empty")
+    return root
+
+
+_MERGE_KEY = object()  ## The pending key of a '<<' merge, whose value is never set as a key
+
+
+def _yaml_scalar(loader: Any, event: Any) -> Any:
+    """Construct the value of a scalar event the same way yaml.safe_load does"""
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = loader.resolve(yaml.ScalarNode, event.value, event.implicit)
+    node = yaml.ScalarNode(tag, event.value, event.start_mark, event.end_mark, event.style)
+    constructor = loader.yaml_constructors.get(tag) or loader.yaml_constructors[None]
+    return constructor(loader, node)
+
+
+def load_yaml(fp: IO[str], cls: type = AttrDict, include: Optional[IncludeTrie] = None) -> Any:
+    """Load a YAML config into a tree of cls (top level) and AttrDicts from the
+    parser events, with the same values, anchors and merge keys as `yaml.safe_load`.
+
+    Args:
+        fp (IO[str]): The open file
+        cls (type): The AttrDict class of the top level
+        include (Optional[IncludeTrie]): Only build these subtrees. The rest is only
+            parsed, apart from anchored nodes that aliases may refer to later
+
+    Returns:
+        AttrDict: The config, an instance of cls
+    """
+    if not has_yaml:
+        raise Exception(
+            "Error! YAML not installed. If you would like to use YAML with pi-conf, "
+            "install it with 'pip install pyyaml' or 'pip install pi-conf[yaml]"
+        )
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)(fp)
+    tree = _Tree(cls, include)
+    anchors: dict[str, Any] = {}
+    merges: list[list[Any]] = []  ## The mappings merged into each open mapping with '<<'
+    ## The detached containers being built: (stack depth, skip count to restore, merge)
+    detached: list[tuple[int, int, bool]] = []
+    skip = 0  ## The number of open containers that are being skipped
+    documents = 0
+    try:
+        while loader.check_event():
+            event = loader.get_event()
+            if isinstance(event, yaml.DocumentStartEvent):
+                documents += 1
+                if documents > 1:
+                    raise ValueError("Error! Expected a single document in the YAML stream")
+                continue
+            is_start = isinstance(event, yaml.CollectionStartEvent)
+            is_alias = isinstance(event, yaml.AliasEvent)
+            anchor = None if is_alias else getattr(event, "anchor", None)
+
+            if isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                if skip:
+                    skip -= 1
+                    continue
+                if isinstance(event, yaml.MappingEndEvent):
+                    _apply_merges(tree.stack[-1], merges.pop(), tree.trie)
+                node = tree.close()
+                if detached and len(tree.stack) == detached[-1][0]:
+                    _, skip, is_merge = detached.pop()
+                    if is_merge:
+                        _add_merge(merges, node)
+                continue
+            if not isinstance(event, (yaml.ScalarEvent, yaml.AliasEvent)) and not is_start:
+                continue
+
+            if skip:
+                ## Only anchored nodes are built, aliases later on may refer to them
+                if is_start and anchor:
+                    value = _open_detached(tree, event, detached, merges, skip)
+                    anchors[anchor] = value
+                    skip = 0
+                elif is_start:
+                    skip += 1
+                elif anchor:
+                    anchors[anchor] = _yaml_scalar(loader, event)
+                continue
+
+            if isinstance(event, yaml.AliasEvent):
+                if event.anchor not in anchors:
+                    raise ValueError(f"Error! Found undefined YAML alias '{event.anchor}'")
+                value = anchors[event.anchor]
+            elif isinstance(event, yaml.ScalarEvent):
+                is_merge_key = tree.expects_key() and event.value == "<<" and event.implicit[0]
+                if is_merge_key:
+                    tree.key = _MERGE_KEY
+                    continue
+                value = _yaml_scalar(loader, event)
+            else:
+                value = None
+
+            if tree.expects_key():
+                if is_start or not isinstance(value, (str, int, float, bool, type(None))):
+                    raise ValueError("Error! Only scalar mapping keys are supported when streaming")
+                tree.set_key(value)
+                continue
+            if tree.key is _MERGE_KEY:
+                tree.key = sentinel
+                if is_start:  ## An inline mapping or a list of mappings, added when closed
+                    detached.append((len(tree.stack), 0, True))
+                    value = tree.open(isinstance(event, yaml.MappingStartEvent), detached=True)
+                    if isinstance(event, yaml.MappingStartEvent):
+                        merges.append([])
+                else:
+                    _add_merge(merges, value)
+                if anchor:
+                    anchors[anchor] = value
+                continue
+
+            is_mapping = isinstance(event, yaml.MappingStartEvent) or (
+                is_alias and isinstance(value, dict)
+            )
+            if not tree.selected(is_mapping):
+                if is_start and anchor:
+                    anchors[anchor] = _open_detached(tree, event, detached, merges, 0)
+                elif is_start:
+                    skip = 1
+                elif anchor:
+                    anchors[anchor] = value
+                continue
+            if is_start:
+                value = tree.open(is_mapping)
+                if is_mapping:
+                    merges.append([])
+            elif is_alias and is_mapping and tree.in_mapping() and tree.value_trie is not None:
+                ## An alias to an already built mapping, only part of which is selected
+                value = _selected_copy(value, tree.value_trie)
+                if value:
+                    tree.add(value)
+                else:
+                    tree.key = sentinel
+            elif is_alias:
+                tree.add(_copy_node(value))
+            else:
+                tree.add(value)
+            if anchor:
+                anchors[anchor] = value
+    finally:
+        loader.dispose()
+    return tree.result()
+
+
+def _open_detached(tree: _Tree, event: Any, detached: list, merges: list, skip: int) -> Any:
+    """Start building an anchored container that isn't part of the selected tree"""
+    detached.append((len(tree.stack), skip, False))
+    is_mapping = isinstance(event, yaml.MappingStartEvent)
+    if is_mapping:
+        merges.append([])
+    return tree.open(is_mapping, detached=True)
+
+
+def _selected_copy(d: dict, trie: IncludeTrie) -> AttrDict:
+    """Get a copy of the selected subtrees of an already built mapping as an AttrDict"""
+    selected = _new_attr_dict()
+    _convert_tree(selected, _select(d, trie), keep=())
+    return selected
+
+
+def _copy_node(value: Any) -> Any:
+    """Get a copy of an already built mapping or list, so that an alias doesn't share
+    its nodes with the anchor as the eagerly loaded config doesn't either"""
+    if isinstance(value, dict):
+        node: Any = _new_attr_dict()
+    elif isinstance(value, list):
+        node = []
+    else:
+        return value
+    _convert_tree(node, value, keep=())
+    return node
+
+
+def _apply_merges(node: dict, merged: list[dict], trie: Any) -> None:
+    """Set copies of the keys of the '<<' merged mappings that node doesn't have, the
+    earlier mappings first, keeping only the selected subtrees"""
+    for m in merged:
+        m = _copy_node(m) if trie is None else _selected_copy(m, trie)
+        for k, v in m.items():
+            if k not in node:
+                dict.__setitem__(node, k, v)
+
+
+def _add_merge(merges: list[list[Any]], value: Any) -> None:
+    """Add the value of a '<<' key, a mapping or list of mappings, to the open mapping"""
+    merged = value if isinstance(value, list) else [value]
+    if not all(isinstance(m, dict) for m in merged):
+        raise ValueError("Error! YAML merge keys must refer to mappings")
+    merges[-1].extend(merged)
+
+
+def load(
+    fp: IO[str], ext: str, cls: type = AttrDict, include: Optional[IncludeTrie] = None
+) -> Any:
+    """Stream a config file of the given extension into a tree of cls and AttrDicts,
+    building only the subtrees selected by include if it is given"""
+    if ext == ".json":
+        return load_json(fp, cls, include=include)
+    elif ext == ".yaml":
+        return load_yaml(fp, cls, include=include)
+    raise ValueError(f"Error! Streaming is only supported for {STREAMING_EXTENSIONS}, not '{ext}'")
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from pi_conf import aio, aload_config, load_config
+
+
+def test_aload_config_matches_load_config(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text("a = 1\n[b]\nc = [1, 2]\n")
+
+    cfg = asyncio.run(aload_config(path=str(path), include=["b"]))
+
+    assert cfg == load_config(path=str(path), include=["b"]) == {"b": {"c": [1, 2]}}
+    assert cfg.provenance[-1].source == str(path)
+
+
+def test_aload_config_runs_off_the_loop(monkeypatch):
+    threads: list = []
+    load = lambda *args, **kwargs: threads.append(threading.current_thread())
+    monkeypatch.setattr(aio, "load_config", load)
+
+    async def main():
+        await aload_config({"a": 1})
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(main())
+    assert threads[0] is not loop_thread and threads[0].name.startswith("pi-conf")
+
+
+def test_set_executor_bounds_concurrent_loads(monkeypatch):
+    running = [0, 0]  ## Current and most loads running at once
+    lock = threading.Lock()
+
+    def load(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        threading.Event().wait(0.01)
+        with lock:
+            running[0] -= 1
+
+    monkeypatch.setattr(aio, "load_config", load)
+    aio.set_executor(max_workers=2)
+    try:
+
+        async def main():
+            await asyncio.gather(*(aload_config({}) for _ in range(8)))
+
+        asyncio.run(main())
+    finally:
+        aio.set_executor()
+    assert running[1] <= 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
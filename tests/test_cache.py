@@ -0,0 +1,308 @@
+import os
+
+import pytest
+
+from pi_conf import cache, load_configs
+from pi_conf.config import _find_config, _find_config_from_appname, _load_config_file
+
+
+@pytest.fixture
+def parse_cache():
+    previous = cache.get_parse_cache()
+    cache.set_parse_cache(maxsize=2)
+    yield cache.get_parse_cache()
+    cache._parse_cache = previous
+
+
+def write(path, text: str, mtime_ns: int = 1_000_000_000):
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))  ## An old mtime, so hits skip the content check
+
+
+def test_parse_cache_hits_unchanged_file(parse_cache, tmp_path):
+    path = tmp_path / "config.toml"
+    write(path, "a = 1\n[b]\nc = [1, 2]\n")
+
+    first = _load_config_file(str(path))
+    second = _load_config_file(str(path))
+
+    assert first == second == {"a": 1, "b": {"c": [1, 2]}}
+    assert parse_cache.info()[:2] == (1, 1)
+
+
+def test_parse_cache_hits_are_independent_copies(parse_cache, tmp_path):
+    path = tmp_path / "config.json"
+    write(path, '{"a": {"b": [1]}}')
+
+    first = _load_config_file(str(path))
+    first.a.b.append(2)
+    first.a.c = 3
+
+    assert _load_config_file(str(path)) == {"a": {"b": [1]}}
+
+
+def test_parse_cache_lazy_loads_get_private_copies(parse_cache, tmp_path):
+    path = tmp_path / "config.json"
+    write(path, '{"a": {"b": {"c": 1}}}')
+
+    lazy = _load_config_file(str(path), lazy=True)
+    dict(lazy.a)["b"]["c"] = 99  ## Reaches the raw dict a lazy node wraps
+
+    assert _load_config_file(str(path)).a.b.c == 1
+    assert _load_config_file(str(path), lazy=True).a.b.c == 1
+    assert parse_cache.info().hits == 2
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parse_cache_single_lazy_load_configs_gets_private_copy(parse_cache, tmp_path, executor):
+    path = tmp_path / "config.json"
+    write(path, '{"a": {"b": {"c": 1}}}')
+
+    lazy = load_configs([str(path)], executor=executor, lazy=True)
+    dict(lazy.a)["b"]["c"] = 99  ## Reaches the raw dict a lazy node wraps
+
+    assert _load_config_file(str(path)).a.b.c == 1
+    assert parse_cache.info().hits == 1
+
+
+def test_parse_cache_is_off_by_default_and_skips_large_files(tmp_path):
+    assert not cache.get_parse_cache().enabled
+    parse_cache = cache.ParseCache(max_file_size=8)
+    calls = []
+    path = tmp_path / "config.toml"
+    write(path, "a = 1\nb = 2\n")
+    for _ in range(2):
+        parse_cache.get_or_parse(str(path), ".toml", parse_counting(calls))
+
+    assert len(calls) == 2
+    assert parse_cache.info().currsize == 0
+
+
+def test_parse_cache_misses_when_file_changes(parse_cache, tmp_path):
+    path = tmp_path / "config.toml"
+    write(path, "a = 1\n")
+    _load_config_file(str(path))
+    write(path, "a = 22\n", mtime_ns=2_000_000_000)
+
+    assert _load_config_file(str(path)).a == 22
+    assert parse_cache.info().misses == 2
+
+
+def test_parse_cache_checks_contents_of_recent_files(parse_cache, tmp_path):
+    ## Same size and mtime, as when a file is rewritten within the timestamp granularity
+    path = tmp_path / "config.toml"
+    now = os.stat(tmp_path).st_mtime_ns
+    write(path, "a = 1\n", mtime_ns=now)
+    _load_config_file(str(path))
+    write(path, "a = 2\n", mtime_ns=now)
+
+    assert _load_config_file(str(path)).a == 2
+
+
+def test_parse_cache_hash_contents(tmp_path):
+    parse_cache = cache.ParseCache(hash_contents=True)
+    path = tmp_path / "config.toml"
+    write(path, "a = 1\n")
+    parse = lambda p, ext: {"parsed": open(p).read()}
+
+    parse_cache.get_or_parse(str(path), ".toml", parse)
+    write(path, "a = 2\n")
+
+    assert parse_cache.get_or_parse(str(path), ".toml", parse) == {"parsed": "a = 2\n"}
+    assert parse_cache.info().misses == 2
+
+
+def test_parse_cache_evicts_least_recently_used(parse_cache, tmp_path):
+    paths = [tmp_path / f"config{i}.toml" for i in range(3)]
+    for i, path in enumerate(paths):
+        write(path, f"a = {i}\n")
+    _load_config_file(str(paths[0]))
+    _load_config_file(str(paths[1]))
+    _load_config_file(str(paths[0]))
+    _load_config_file(str(paths[2]))  ## Evicts paths[1]
+    _load_config_file(str(paths[0]))
+
+    info = parse_cache.info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (2, 3, 1, 2)
+
+
+def test_parse_cache_disabled(tmp_path):
+    previous = cache.get_parse_cache()
+    cache.set_parse_cache(enabled=False)
+    try:
+        path = tmp_path / "config.toml"
+        write(path, "a = 1\n")
+        _load_config_file(str(path))
+        _load_config_file(str(path))
+        assert cache.get_parse_cache().info()[:2] == (0, 0)
+    finally:
+        cache._parse_cache = previous
+
+
+def parse_counting(calls: list):
+    def parse(path, ext):
+        calls.append(path)
+        return {"parsed": open(path).read(), "nested": {"list": [1, 2]}}
+
+    return parse
+
+
+def test_disk_cache_reused_by_new_process(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, "a: 1\n")
+    calls: list = []
+    cache_dir = str(tmp_path / "cache")
+
+    first = cache.DiskCache(enabled=True, directory=cache_dir)
+    value = first.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    second = cache.DiskCache(enabled=True, directory=cache_dir)  ## A new process
+
+    assert second.get_or_parse(str(path), ".yaml", parse_counting(calls)) == value
+    assert len(calls) == 1 and (second.hits, second.misses) == (1, 0)
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+
+def test_disk_cache_checks_source_contents(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, "a: 1\n")
+    calls: list = []
+    disk_cache = cache.DiskCache(enabled=True, directory=str(tmp_path / "cache"))
+    disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    write(path, "a: 2\n")  ## Same size and mtime
+
+    value = disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    assert value["parsed"] == "a: 2\n"
+    assert len(calls) == 2
+
+
+def test_disk_cache_ignores_corrupt_sidecar(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, "a: 1\n")
+    calls: list = []
+    disk_cache = cache.DiskCache(enabled=True, directory=str(tmp_path / "cache"))
+    disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    with open(disk_cache.sidecar_path(str(path.resolve()), ".yaml"), "wb") as fp:
+        fp.write(b"not a pickle")
+
+    value = disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    assert value["parsed"] == "a: 1\n"
+    assert len(calls) == 2
+
+
+def test_disk_cache_ignores_shared_directory(tmp_path):
+    path = tmp_path / "config.yaml"
+    write(path, "a: 1\n")
+    calls: list = []
+    cache_dir = tmp_path / "cache"
+    disk_cache = cache.DiskCache(enabled=True, directory=str(cache_dir))
+    disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    os.chmod(cache_dir, 0o777)
+
+    disk_cache.get_or_parse(str(path), ".yaml", parse_counting(calls))
+    assert len(calls) == 2
+
+
+def test_load_config_uses_disk_cache(tmp_path):
+    previous = cache.get_disk_cache()
+    cache.set_disk_cache(directory=str(tmp_path / "cache"))
+    try:
+        path = tmp_path / "config.json"
+        write(path, '{"a": {"b": [1]}}')
+        cache.get_parse_cache().clear()
+        _load_config_file(str(path))
+        cache.get_parse_cache().clear()
+        cfg = _load_config_file(str(path))
+
+        assert cfg.a.b == [1]
+        assert cache.get_disk_cache().hits == 1
+    finally:
+        cache._disk_cache = previous
+
+
+@pytest.fixture
+def discovery_cache():
+    previous = cache.get_discovery_cache()
+    cache.set_discovery_cache(ttl=60)
+    yield cache.get_discovery_cache()
+    cache._discovery_cache = previous
+
+
+def test_discovery_cache_remembers_missing_files(discovery_cache, tmp_path):
+    assert _find_config_from_appname("app", directories=[str(tmp_path)]) is None
+    (tmp_path / "config.json").write_text("{}")
+    assert _find_config_from_appname("app", directories=[str(tmp_path)]) is None
+
+    cache.clear_discovery_cache(str(tmp_path))
+    found = _find_config_from_appname("app", directories=[str(tmp_path)])
+    assert found == str(tmp_path / "config.json")
+
+
+def test_discovery_cache_lists_each_directory_once(discovery_cache, tmp_path, monkeypatch):
+    (tmp_path / "config.yaml").write_text("a: 1")
+    scanned: list = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda d: scanned.append(d) or scan(d))
+
+    for _ in range(3):
+        found = _find_config_from_appname("app", directories=[str(tmp_path)])
+        assert found == str(tmp_path / "config.yaml")
+    assert scanned == [str(tmp_path)]
+
+
+@pytest.mark.parametrize("ttl", [0, 60])
+def test_discovery_checks_each_file_if_directory_cant_be_listed(tmp_path, monkeypatch, ttl):
+    ## Like a mode 0711 home directory, files can be opened but not listed
+    (tmp_path / "config.json").write_text('{"a": 1}')
+    monkeypatch.setattr(cache, "_discovery_cache", cache.DiscoveryCache(ttl=ttl))
+    monkeypatch.setattr(cache, "_scan", lambda d: None)
+
+    found = _find_config_from_appname("app", directories=[str(tmp_path)])
+    assert found == str(tmp_path / "config.json")
+    assert _find_config(str(tmp_path / "config.json")) == str(tmp_path / "config.json")
+    assert _load_config_file(str(tmp_path / "config.json")) == {"a": 1}
+
+
+def test_discovery_skips_broken_symlinks(tmp_path):
+    (tmp_path / "config.toml").symlink_to(tmp_path / "missing.toml")
+    (tmp_path / "config.json").write_text("{}")
+
+    found = _find_config_from_appname("app", directories=[str(tmp_path)])
+    assert found == str(tmp_path / "config.json")
+    (tmp_path / "settings.toml").symlink_to(tmp_path / "missing.toml")
+    assert _find_config("settings.toml", directories=[str(tmp_path)]) is None
+
+
+@pytest.mark.parametrize("ttl", [0, 60])
+def test_discovery_finds_other_case_on_case_insensitive_filesystems(tmp_path, monkeypatch, ttl):
+    (tmp_path / "Config.toml").write_text("a = 1")
+    monkeypatch.setattr(cache, "_discovery_cache", cache.DiscoveryCache(ttl=ttl))
+    isfile = os.path.isfile
+
+    ## Case-sensitive, as on Linux
+    assert _find_config_from_appname("app", directories=[str(tmp_path)]) is None
+    assert _find_config(str(tmp_path / "config.toml")) is None
+
+    ## Case-insensitive, as on macOS and Windows
+    monkeypatch.setattr(
+        os.path, "isfile", lambda p: isfile(os.path.join(os.path.dirname(p), "Config.toml"))
+    )
+    found = _find_config_from_appname("app", directories=[str(tmp_path)])
+    assert found == str(tmp_path / "config.toml")
+    assert _find_config(str(tmp_path / "config.toml")) == str(tmp_path / "config.toml")
+
+
+def test_discovery_cache_expires(tmp_path, monkeypatch):
+    discovery_cache = cache.DiscoveryCache(ttl=10)
+    now = [100.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    assert discovery_cache.listdir(str(tmp_path)) == {}
+    (tmp_path / "config.toml").write_text("")
+
+    now[0] += 5
+    assert discovery_cache.listdir(str(tmp_path)) == {}
+    now[0] += 6
+    assert discovery_cache.listdir(str(tmp_path)) == {"config.toml": True}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
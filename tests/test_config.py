@@ -1,10 +1,13 @@
+import asyncio
 import os
 import sys
+import threading
 
 import pytest
 
 import pi_conf.config as config_module
-from pi_conf import AttrDict, Config, load_config, set_config
+from pi_conf import AttrDict, Config, areload_config, load_config, set_config
+from pi_conf.attr_dict import FrozenAttrDict, LazyAttrDict
 
 basedir = os.path.abspath(os.getcwd())
 sys.path.append(basedir)
@@ -91,6 +94,103 @@ def test_update_attrdict_with_dict():
     assert d1.b.c == 3
 
 
+def test_update_with_converted_attrdict_copies_subtrees():
+    src = Config.from_dict({"a": {"b": 1}, "l": [{"c": 2}, [3]]})
+    dst = Config.from_dict({"x": 0})
+    dst.update(src)
+    assert dst.a == src.a and dst.a is not src.a
+    assert dst.l == src.l and dst.l is not src.l
+
+    user = AttrDict.from_dict({"y": 1})
+    copy = Config.from_dict({"s": user})
+    copy.load_config({"s": {"z": 2}})
+    assert copy.s.z == 2 and "z" not in user
+
+
+def test_update_converted_reuses_subtrees():
+    src = Config.from_dict({"a": {"b": 1}, "l": [{"c": 2}, [3]], "raw": 1})
+    dict.__setitem__(src, "plain", {"d": 4})
+    dst = Config.from_dict({"x": 0})
+    dst._update_converted(src)
+    assert dst.a is src.a
+    assert dst.l is src.l
+    assert dst.l[0].c == 2
+    assert isinstance(dst.plain, AttrDict)
+    assert dst.plain.d == 4
+    assert dst.x == 0
+
+
+def test_update_with_unconverted_list_converts():
+    src = AttrDict()
+    dict.__setitem__(src, "l", [{"a": 1}])
+    dst = AttrDict()
+    dst.update(src)
+    assert dst.l is not src.l
+    assert dst.l[0].a == 1
+
+
+def test_from_dict_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() * 2
+    d: dict = {"leaf": [{"x": 1}]}
+    for i in range(depth):
+        d = {f"k{i % 3}": d}
+    cfg = Config.from_dict(d)
+    node = cfg
+    for i in reversed(range(depth)):
+        node = node[f"k{i % 3}"]
+        assert type(node) is AttrDict
+    assert node.leaf[0].x == 1
+
+
+def test_from_dict_nested_lists_and_reserved_keys():
+    cfg = Config.from_dict({"a": [[{"b": 1}], 2], "c": {"d": [{"e": {"f": 3}}]}})
+    assert cfg.a[0][0].b == 1
+    assert cfg.a[1] == 2
+    assert cfg.c.d[0].e.f == 3
+    with pytest.raises(ValueError, match="key=items"):
+        Config.from_dict({"a": [{"b": {"items": 1}}]})
+
+
+def test_keys_dont_hide_methods():
+    cfg = Config.from_dict({"path": "/tmp", "diff": {"tool": "vimdiff"}, "freeze": 1, "thaw": 2})
+    assert cfg.path == "/tmp" and cfg.diff.tool == "vimdiff"
+    assert cfg.compile_path("diff.tool")() == "vimdiff"
+    assert cfg.diff_config({}).removed == ["diff", "freeze", "path", "thaw"]
+    assert cfg.freeze_config().thaw_config() == cfg
+
+
+def test_lazy_from_dict_converts_on_access():
+    d = {"a": {"b": {"c": 1}}, "l": [{"x": {"y": 2}}], "s": 3}
+    cfg = Config.from_dict(d, lazy=True)
+    assert type(cfg) is Config
+    assert type(dict.__getitem__(cfg.a, "b")) is dict
+    assert cfg.a.b.c == 1
+    assert type(dict.__getitem__(cfg.a, "b")) is LazyAttrDict
+    assert cfg["a"]["b"] is cfg.a.b
+    assert cfg.l[0].x.y == 2
+    assert d == {"a": {"b": {"c": 1}}, "l": [{"x": {"y": 2}}], "s": 3}
+
+
+def test_lazy_from_dict_matches_eager():
+    d = {"a": {"b": {"c": 1, "d": [{"e": 2}]}}, "f": [{"g": {"h": 3}}]}
+    lazy = Config.from_dict(d, lazy=True)
+    eager = Config.from_dict(d)
+    assert lazy == eager
+    assert lazy.get_nested("a.b.d.e") == 2
+    assert lazy.get_nested("f.g.h") == 3
+    assert lazy.to_env(overwrite=True) == eager.to_env(overwrite=True)
+    assert [type(v) for v in Config.from_dict(d, lazy=True).a.values()] == [LazyAttrDict]
+    assert all(isinstance(v, AttrDict) for _, v in Config.from_dict(d, lazy=True).a.items())
+
+
+def test_lazy_load_config(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"db": {"pool": {"size": 5}}, "other": {"x": {"y": 1}}}')
+    cfg = load_config(str(path), lazy=True)
+    assert cfg.db.pool.size == 5
+    assert type(dict.__getitem__(cfg.other, "x")) is dict
+
+
 def test_config_load_config_conflict_raises_by_default():
     cfg = Config.from_dict({"a": 1})
 
@@ -142,5 +242,266 @@ def test_update_config_overwrite_true_allows_replacement():
         pm.extend(config_module.cfg, original_provenance)
 
 
+def test_freeze_is_immutable_and_hashable():
+    frozen = Config.from_dict({"a": 1, "b": {"c": [1, {"d": 2}]}}).freeze_config()
+
+    assert isinstance(frozen, config_module.FrozenConfig)
+    assert isinstance(frozen.b, FrozenAttrDict)
+    assert frozen.b.c == (1, {"d": 2})
+    assert frozen.get_nested("b.c.d", list_item=1) == 2
+    with pytest.raises(TypeError):
+        frozen["a"] = 2
+    with pytest.raises(TypeError):
+        frozen.b.update({"c": 1})
+    with pytest.raises(AttributeError):
+        frozen.a = 2
+    assert {frozen: "memo"}[Config.from_dict({"a": 1, "b": {"c": [1, {"d": 2}]}}).freeze_config()]
+
+
+def test_freeze_shares_frozen_subtrees():
+    frozen = AttrDict.from_dict({"a": {"b": 1}, "c": 2}).freeze_config()
+    refrozen = AttrDict({"a": frozen.a, "c": 3}).freeze_config()
+
+    assert refrozen.a is frozen.a
+    assert frozen.freeze_config() is frozen
+
+
+def test_frozen_thaw_is_mutable_copy():
+    frozen = Config.from_dict({"a": {"b": [1, 2]}}).freeze_config()
+    thawed = frozen.thaw_config()
+    thawed.a.b.append(3)
+
+    assert isinstance(thawed, Config)
+    assert thawed.a.b == [1, 2, 3]
+    assert frozen.a.b == (1, 2)
+
+
+def test_frozen_thaw_restores_sets():
+    cfg = Config.from_dict({"s": {1, 2}, "l": [{"t": {"x"}}]})
+    thawed = cfg.freeze_config().thaw_config()
+
+    assert thawed == cfg
+    assert type(thawed.s) is set and type(thawed.l[0].t) is set
+
+
+def test_config_snapshot_swap():
+    snapshot = config_module.ConfigSnapshot()
+    first = snapshot.publish({"a": 1})
+    reader_view = snapshot.get()
+    second = snapshot.publish({"a": 2})
+
+    assert reader_view is first and reader_view.a == 1
+    assert snapshot.get() is second
+    assert not snapshot.compare_and_swap(first, Config().freeze_config())
+    assert snapshot.compare_and_swap(second, first)
+    assert snapshot.get() is first
+
+
+def test_update_config_publishes_snapshot():
+    original = Config.from_dict(dict(config_module.cfg))
+    original_snapshot = config_module.cfg_snapshot.get()
+    try:
+        config_module.cfg.clear()
+        config_module.update_config({"a": {"b": 1}}, directories=None)
+
+        assert config_module.cfg_snapshot.get().a.b == 1
+    finally:
+        config_module.cfg.clear()
+        config_module.cfg.update(original, _add_to_provenance=False)
+        config_module.cfg_snapshot.swap(original_snapshot)
+
+
+@pytest.fixture
+def restore_global_cfg():
+    original = Config.from_dict(dict(config_module.cfg))
+    original_snapshot = config_module.cfg_snapshot.get()
+    original_source = list(config_module._last_source)
+    yield config_module.cfg
+    config_module.cfg.clear()
+    config_module.cfg.update(original, _add_to_provenance=False)
+    config_module.cfg_snapshot.swap(original_snapshot)
+    config_module._last_source[:] = original_source
+
+
+def test_set_config_publishes_snapshot_on_first_get(restore_global_cfg, monkeypatch):
+    frozen = []
+    from_dict = config_module.FrozenConfig.from_dict
+    monkeypatch.setattr(
+        config_module.FrozenConfig,
+        "from_dict",
+        lambda *args, **kwargs: frozen.append(1) or from_dict(*args, **kwargs),
+    )
+    config_module.set_config({"a": {"b": 1}})
+    config_module.update_config({"a": {"c": 2}}, directories=None)
+    assert not frozen
+
+    snapshot = config_module.cfg_snapshot.get()
+    assert snapshot == {"a": {"b": 1, "c": 2}} and len(frozen) == 1
+    assert config_module.cfg_snapshot.get() is snapshot and len(frozen) == 1
+
+    config_module.update_config({"a": {"d": 3}}, directories=None)
+    assert not config_module.cfg_snapshot.compare_and_swap(snapshot, snapshot)
+    assert config_module.cfg_snapshot.get().a.d == 3
+
+
+def test_global_cfg_load_config_locks_and_republishes(restore_global_cfg, monkeypatch):
+    config_module.set_config({"a": {"b": 1}})
+    assert config_module.cfg_snapshot.get() == {"a": {"b": 1}}
+    locked = []
+    merge_into = config_module.merge_into
+    monkeypatch.setattr(
+        config_module,
+        "merge_into",
+        lambda *args, **kwargs: (
+            locked.append(config_module._reload_lock._is_owned()) or merge_into(*args, **kwargs)
+        ),
+    )
+
+    config_module.cfg.load_config({"a": {"c": 2}})
+    Config().load_config({"x": 1})
+
+    assert locked == [True, False]
+    assert config_module.cfg_snapshot.get() == {"a": {"b": 1, "c": 2}}
+
+
+def test_config_freeze_reuse():
+    old = Config.from_dict({"db": {"host": "a"}, "web": {"port": 1}}).freeze_config()
+    new = Config.from_dict({"db": {"host": "a"}, "web": {"port": 2}}).freeze_config(reuse=old)
+    assert isinstance(new, config_module.FrozenConfig)
+    assert new.db is old.db and new.web.port == 2
+
+
+def test_freeze_reuses_unchanged_sections():
+    old = AttrDict.from_dict(
+        {"db": {"host": "a", "pool": [1, 2]}, "web": {"port": 1}}
+    ).freeze_config()
+    new = AttrDict.from_dict({"db": {"host": "a", "pool": [1, 2]}, "web": {"port": 2}})
+    frozen = new.freeze_config(reuse=old)
+
+    assert frozen.db is old.db
+    assert frozen.web is not old.web and frozen.web.port == 2
+
+
+def test_freeze_doesnt_reuse_values_of_another_type():
+    old = AttrDict.from_dict(
+        {"a": {"debug": 1}, "b": {"ratio": 1}, "c": {"l": [1]}}
+    ).freeze_config()
+    new = AttrDict.from_dict({"a": {"debug": True}, "b": {"ratio": 1.0}, "c": {"l": [True]}})
+    frozen = new.freeze_config(reuse=old)
+
+    assert frozen.a.debug is True
+    assert type(frozen.b.ratio) is float
+    assert frozen.c.l[0] is True
+
+
+def test_diff():
+    old = Config.from_dict(
+        {"db": {"host": "a", "port": 1, "opts": {"ssl": True}}, "web": {"port": 1}, "x": [1]}
+    )
+    new = Config.from_dict({"db": {"host": "b", "port": 1, "pool": 4}, "x": [1], "y": {"z": 1}})
+
+    diff = old.diff_config(new)
+    assert diff.added == ["db.pool", "y"]
+    assert diff.removed == ["db.opts", "web"]
+    assert diff.changed == ["db.host"]
+    assert new.diff_config(old) == (diff.removed, diff.added, diff.changed)
+    assert old.diff_config(new, split_delimiter="/").changed == ["db/host"]
+    assert not old.diff_config(Config.from_dict(old))
+    assert not old.diff_config(old.freeze_config())  ## Lists and tuples with equal items are equal
+
+    typed = Config.from_dict({"a": 1, "b": 1, "c": [1], "d": {"e": 0}})
+    retyped = Config.from_dict({"a": True, "b": 1.0, "c": [True], "d": {"e": False}})
+    assert typed.diff_config(retyped).changed == ["a", "b", "c", "d.e"]
+    frozen_diff = typed.freeze_config().diff_config(retyped.freeze_config())
+    assert frozen_diff.changed == ["a", "b", "c", "d.e"]
+
+    sets = Config.from_dict({"s": {1, 2}, "l": [{"t": {"x"}}]})
+    assert not sets.diff_config(sets.freeze_config())
+    assert sets.diff_config(Config.from_dict({"s": {1.0, 2}, "l": [{"t": {"x"}}]})).changed == ["s"]
+
+
+def test_diff_skips_shared_subtrees():
+    old = AttrDict.from_dict({"db": {"host": "a"}, "web": {"port": 1}}).freeze_config()
+    new = AttrDict.from_dict({"db": {"host": "a"}, "web": {"port": 2}}).freeze_config(reuse=old)
+    assert new.db is old.db
+    assert old.diff_config(new) == ([], [], ["web.port"])
+
+    ## Frozen separately, the subtrees are equal but not shared
+    copy = AttrDict.from_dict(
+        {"db": {"host": "a"}, "web": {"port": 1, "tls": (1, 2)}}
+    ).freeze_config()
+    assert old.diff_config(copy) == (["web.tls"], [], [])
+
+
+def test_reload_config_reuses_unchanged_sections(restore_global_cfg, tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text("[db]\nhost = 'a'\n[web]\nport = 1\n")
+    config_module.set_config(str(path))
+    before = config_module.cfg_snapshot.get()
+
+    path.write_text("[db]\nhost = 'a'\n[web]\nport = 2\n")
+    after = config_module.reload_config()
+
+    assert config_module.cfg_snapshot.get() is after
+    assert after.db is before.db
+    assert after.web.port == 2 and before.web.port == 1
+    assert config_module.cfg.web.port == 2
+
+
+def test_areload_config(restore_global_cfg, tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": 1}')
+    config_module.set_config(str(path))
+    path.write_text('{"a": 2, "b": 3}')
+
+    snapshot = asyncio.run(areload_config())
+
+    assert snapshot == {"a": 2, "b": 3}
+    assert config_module.cfg_snapshot.get() is snapshot
+    assert config_module.cfg.a == 2
+
+
+def test_reload_config_removes_stale_keys(restore_global_cfg):
+    config_module.set_config({"a": 1, "b": 2})
+    config_module.reload_config({"a": 3})
+
+    assert dict(config_module.cfg) == {"a": 3}
+    assert dict(config_module.cfg_snapshot.get()) == {"a": 3}
+
+
+def test_reload_config_readers_see_consistent_snapshots(restore_global_cfg):
+    config_module.set_config({"a": {"version": 0}, "b": {"version": 0}, "static": {"x": 1}})
+    static = config_module.cfg_snapshot.get().static
+    stop = threading.Event()
+    errors: list = []
+
+    def read():
+        while not stop.is_set():
+            try:
+                snap = config_module.cfg_snapshot.get()
+                assert snap.a.version == snap.b.version
+                assert snap.static is static
+                config_module.cfg["a"]  ## Never missing while the global cfg is replaced
+            except Exception as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(8)]
+    for t in readers:
+        t.start()
+    try:
+        for version in range(1, 100):
+            config_module.reload_config(
+                {"a": {"version": version}, "b": {"version": version}, "static": {"x": 1}}
+            )
+    finally:
+        stop.set()
+        for t in readers:
+            t.join()
+
+    assert not errors
+    assert config_module.cfg_snapshot.get().a.version == 99
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -5,7 +6,8 @@ import pytest
 import toml
 from pydantic import BaseModel, ValidationError
 
-from pi_conf.config_settings import ConfigDict, ConfigSettings
+from pi_conf import Config
+from pi_conf.config_settings import ConfigDict, ConfigSettings, ConfigSource
 
 
 @pytest.fixture
@@ -298,5 +300,30 @@ def test_config_settings_update_without_file_source():
         s._refresh()
 
 
+class CountingSource(ConfigSource):
+    def __init__(self):
+        self.refreshes = 0
+
+    def load_config(self) -> Config:
+        return Config.from_dict({"count": self.refreshes})
+
+    def update_config(self, updates: Dict[str, Any]) -> None:
+        pass
+
+    def refresh_config(self) -> Config:
+        self.refreshes += 1
+        return self.load_config()
+
+
+def test_custom_config_source_async_defaults():
+    source = CountingSource()
+    assert asyncio.run(source.aload_config()) == {"count": 0}
+
+    s = PlainSettings(count=0)
+    s._config_source = source
+    asyncio.run(s._arefresh())
+    assert s.count == 1 and source.refreshes == 1
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
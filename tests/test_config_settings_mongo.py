@@ -1,3 +1,4 @@
+import asyncio
 from unittest.mock import Mock, patch
 
 import pytest
@@ -172,5 +173,47 @@ def test_mongo_connection_error(MockClient):
         config_source.load_config()
 
 
+@patch("pi_conf.config_settings.AsyncMongoClient", None)
+@patch("pi_conf.config_settings.MongoClient")
+def test_mongo_config_source_aload_without_async_driver(MockClient, mock_mongo):
+    MockClient.return_value = mock_mongo
+    config_source = MongoConfigSource(
+        mongo_uri="mongodb://localhost:27017",
+        mongo_database="test_db",
+        mongo_collection="test_collection",
+        mongo_query={"string_value": "test_string"},
+    )
+
+    config = asyncio.run(config_source.arefresh_config())
+
+    assert config["string_value"] == "test_string"
+    assert config["nested_config"]["value"] == 10
+
+
+class AsyncMockCollection(MockCollection):
+    async def find_one(self, query):  # type: ignore[override]
+        return super().find_one(query)
+
+
+@patch("pi_conf.config_settings.AsyncMongoClient")
+def test_mongo_config_source_aload(MockAsyncClient, mock_mongo):
+    document = dict(mock_mongo["test_db"]["test_collection"].find_one({}))
+    _id = document["_id"]
+    MockAsyncClient.return_value = MockMongoClient(
+        {"test_db": MockDatabase({"test_collection": AsyncMockCollection([document])})}
+    )
+    config_source = MongoConfigSource(
+        mongo_uri="mongodb://localhost:27017",
+        mongo_database="test_db",
+        mongo_collection="test_collection",
+        mongo_query={"string_value": "test_string"},
+    )
+
+    config = asyncio.run(config_source.aload_config())
+
+    assert config["nested_config"]["value"] == 10
+    assert config_source._id == _id
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
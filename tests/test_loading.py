@@ -4,8 +4,9 @@ from pathlib import Path
 
 import pytest
 
-from pi_conf import load_config
-from pi_conf.config import _load_config_file
+from pi_conf import cache, config, find_config, load_config, load_configs
+from pi_conf.config import _load_config_file, _parse_config_file
+from pi_conf.open_func import read_mapped
 
 
 def test_config_loads_toml():
@@ -196,5 +197,146 @@ def test_load_config_with_different_file_types_using_path(tmpdir):
         assert cfg["a"]["b"] == 1 if path.suffix != ".ini" else "1"
 
 
+def test_find_config_extension_precedence(tmp_path):
+    (tmp_path / "config.yaml").write_text("a: 1")
+    (tmp_path / "config.json").write_text("{}")
+
+    lookup = find_config("app", directories=[str(tmp_path)])
+
+    assert lookup.path == str(tmp_path / "config.json")
+    assert lookup.candidates[-2:] == [str(tmp_path / "config.toml"), str(tmp_path / "config.json")]
+
+
+def test_find_config_matches_load_config(tmp_path):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "config.toml").write_text("a = 'first'")
+    (second / ".config.toml").write_text("a = 'second'")
+
+    lookup = find_config("app", directories=[str(first), str(second)])
+
+    assert lookup.path == str(first / "config.toml")
+    assert load_config("app", directories=[str(first), str(second)]).a == "first"
+
+
+def test_find_config_reads_each_directory_once(tmp_path, monkeypatch):
+    scanned: list = []
+    scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda d: scanned.append(d) or scan(d))
+
+    lookup = find_config("app", directories=[str(tmp_path)])
+
+    assert lookup.path is None
+    assert str(tmp_path / "config.yaml") in lookup.candidates
+    assert str(tmp_path / ".config.toml") in lookup.candidates
+    assert scanned == [str(tmp_path)]
+
+
+INCLUDE_SOURCES = {
+    ".toml": "[db]\nhost = 'h'\nport = 1\n[cache.redis]\nurl = 'r'\n[cache.mem]\nsize = 2\n",
+    ".json": '{"db": {"host": "h", "port": 1}, "cache": {"redis": {"url": "r"}, "mem": {}}}',
+    ".yaml": "db: {host: h, port: 1}\ncache:\n  redis: {url: r}\n  mem: {size: 2}\n",
+    ".ini": "[DEFAULT]\nenv = prod\n[db]\nhost = h\n[cache]\nredis = r\n[other]\nx =\n  1\n",
+}
+
+
+@pytest.mark.parametrize("ext", list(INCLUDE_SOURCES))
+def test_load_config_include(tmp_path, ext):
+    path = tmp_path / f"config{ext}"
+    path.write_text(INCLUDE_SOURCES[ext])
+
+    cfg = load_config(path=str(path), include=["db.host", "cache.redis", "missing"])
+
+    assert cfg.db.host == "h" and "port" not in cfg.db
+    assert set(cfg) == {"db", "cache"} and list(cfg.cache) == ["redis"]
+    assert cfg.provenance[-1].source == str(path)
+
+
+def test_load_config_include_skips_ini_sections(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text("[db]\nhost = h\n[broken]\nno separator here\n")
+
+    assert load_config(path=str(path), include=["db"]) == {"db": {"host": "h"}}
+    with pytest.raises(Exception):
+        load_config(path=str(path))
+
+
+def test_load_config_include_dotted_ini_sections(tmp_path):
+    path = tmp_path / "config.ini"
+    path.write_text("[cache]\nttl = 1\n[cache.redis]\nurl = r\nport = 2\n[cache.mem]\nsize = 3\n")
+
+    assert load_config(path=str(path), include=["cache.redis"]) == {
+        "cache.redis": {"url": "r", "port": "2"}
+    }
+    cfg = load_config(path=str(path), include=["cache.redis.url", "cache.ttl", "cache.x.y"])
+    assert cfg == {"cache.redis": {"url": "r"}, "cache": {"ttl": "1"}}
+
+
+def test_load_config_include_dict():
+    cfg = load_config({"a": {"b": 1, "c": 2}, "d": 3}, include=["a.b"])
+    assert cfg == {"a": {"b": 1}}
+
+
+def test_read_mapped(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text('{"a": "\u00e9"}', encoding="utf-8")
+
+    assert read_mapped(path, min_size=0) == '{"a": "\u00e9"}'
+    assert read_mapped(path) is None  ## Smaller than MMAP_MIN_SIZE
+    assert read_mapped("s3://bucket/config.json", min_size=0) is None
+    (tmp_path / "empty.json").write_text("")
+    assert read_mapped(tmp_path / "empty.json", min_size=0) is None
+
+
+@pytest.mark.parametrize("ext", [".toml", ".json"])
+def test_parse_config_file_mapped(tmp_path, monkeypatch, ext):
+    path = tmp_path / f"config{ext}"
+    path.write_text('{"a": 1, "b": {"c": "d"}}' if ext == ".json" else "a = 1\n[b]\nc = 'd'\n")
+    mapped: list = []
+    monkeypatch.setattr(
+        config, "read_mapped", lambda p: mapped.append(p) or read_mapped(p, min_size=0)
+    )
+
+    assert _parse_config_file(str(path), ext) == {"a": 1, "b": {"c": "d"}}
+    assert mapped == [str(path)]
+
+
+@pytest.fixture
+def layers(tmp_path):
+    (tmp_path / "base.toml").write_text("[db]\nhost = 'base'\nport = 1\n[log]\nlevel = 'info'\n")
+    (tmp_path / "prod.json").write_text('{"db": {"host": "prod"}, "region": "eu"}')
+    (tmp_path / "feature.yaml").write_text("db:\n  pool: {size: 4}\n")
+    return [str(tmp_path / name) for name in ("base.toml", "prod.json", "feature.yaml")]
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_load_configs_deep(layers, executor):
+    cfg = load_configs(layers, executor=executor)
+
+    assert cfg == {
+        "db": {"host": "prod", "port": 1, "pool": {"size": 4}},
+        "log": {"level": "info"},
+        "region": "eu",
+    }
+    assert [p.source for p in cfg.provenance] == layers
+    assert cfg.provenance[0].operation == "set" and cfg.provenance[1].operation == "update"
+
+
+def test_load_configs_shallow(layers):
+    cfg = load_configs(layers, merge="shallow")
+    assert cfg.db == {"pool": {"size": 4}} and cfg.log.level == "info"
+
+
+def test_load_configs_leaves_cached_parses_alone(layers):
+    load_configs(layers)
+    assert load_config(path=layers[0]).db == {"host": "base", "port": 1}
+
+
+def test_load_configs_missing(layers, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_configs(layers + [str(tmp_path / "missing.toml")])
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
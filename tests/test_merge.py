@@ -0,0 +1,93 @@
+import copy
+
+import pytest
+
+import pi_conf.config as config_module
+from pi_conf import Config, load_configs
+from pi_conf.merge import MergeStrategy, deep_merge, merge_all, merge_into
+
+
+def test_merge_into_keeps_siblings():
+    target = Config.from_dict({"db": {"host": "a", "port": 1}, "web": {"port": 2}})
+    web = target.web
+
+    written = merge_into(target, {"db": {"host": "b", "pool": {"size": 4}}}, overwrite=True)
+
+    assert target == {"db": {"host": "b", "port": 1, "pool": {"size": 4}}, "web": {"port": 2}}
+    assert target.web is web  ## Untouched branches aren't rebuilt
+    assert target.db.pool.size == 4
+    assert sorted(written) == [("db", "host"), ("db", "pool")]
+
+
+def test_merge_into_conflicts_are_leaves():
+    target = {"db": {"host": "a", "port": 1}, "log": {"level": "info"}}
+    before = copy.deepcopy(target)
+
+    with pytest.raises(ValueError, match="overwrite existing keys: db.host, log"):
+        merge_into(target, {"db": {"host": "b", "port": 1, "new": 1}, "log": "debug"})
+
+    assert target == before  ## Nothing is written when there is a conflict
+    merge_into(target, {"db": {"port": 1, "new": 1}})
+    assert target["db"] == {"host": "a", "port": 1, "new": 1}
+
+
+def test_merge_into_strategies():
+    target = {"db": {"host": "a", "port": 1}, "plugins": ["a"], "opts": {"x": {"y": [1]}}}
+    strategy = {"db": "replace", "plugins": MergeStrategy.append, "opts": "append"}
+
+    merge_into(target, {"db": {"host": "b"}, "plugins": ["b"], "opts": {"x": {"y": [2]}}}, strategy)
+
+    assert target == {"db": {"host": "b"}, "plugins": ["a", "b"], "opts": {"x": {"y": [1, 2]}}}
+
+
+def test_merge_all_leaves_layers_alone():
+    layers = [{"a": {"b": 1, "l": [1]}}, {"a": {"c": 2}}, {"a": {"b": 3}, "d": {"e": 4}}]
+    before = copy.deepcopy(layers)
+
+    merged = merge_all(layers)
+
+    assert merged == {"a": {"b": 3, "c": 2, "l": [1]}, "d": {"e": 4}}
+    assert layers == before
+    assert merged["d"] is layers[2]["d"]
+    assert deep_merge(layers[0], layers[1]) == {"a": {"b": 1, "c": 2, "l": [1]}}
+    assert merge_all(layers, deep=False) == {"a": {"b": 3}, "d": {"e": 4}}
+
+
+def test_config_load_config_deep_merges(tmp_path):
+    cfg = Config.from_dict({"db": {"host": "a", "port": 1}})
+    overlay = tmp_path / "overlay.toml"
+    overlay.write_text("[db]\nhost = 'b'\n")
+
+    with pytest.raises(ValueError, match="db.host"):
+        cfg.load_config(str(overlay))
+    cfg.load_config(str(overlay), overwrite=True)
+
+    assert cfg.db == {"host": "b", "port": 1}
+
+
+@pytest.fixture
+def indexed_provenance():
+    from pi_conf import provenance
+
+    original = provenance.get_provenance_manager()
+    provenance.set_use_provenance(index_keys=True)
+    yield provenance.get_provenance_manager()
+    provenance._provenance_manager = original
+
+
+def test_merged_leaves_keep_their_provenance(indexed_provenance, tmp_path):
+    base, overlay = tmp_path / "base.toml", tmp_path / "overlay.json"
+    base.write_text("[db]\nhost = 'a'\nport = 1\n")
+    overlay.write_text('{"db": {"host": "b"}}')
+
+    cfg = config_module.load_config(str(base))
+    cfg.load_config(str(overlay), overwrite=True)
+    layered = load_configs([str(base), str(overlay)])
+
+    for c in (cfg, layered):
+        assert c.provenance_of("db.host").source == str(overlay)
+        assert c.provenance_of("db.port").source == str(base)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -1,6 +1,6 @@
 import pytest
 
-from pi_conf import AttrDict
+from pi_conf import AttrDict, Config
 
 
 @pytest.fixture
@@ -115,5 +115,69 @@ def test_get_nested_list_item():
     assert d.get_nested("a") == [{"b": 1}, {"b": 2}]
 
 
+def test_path_accessor(sample_dict):
+    accessor = sample_dict.compile_path("a.b.c")
+    assert accessor() == 1
+    sample_dict["a"]["b"]["c"] = 5
+    assert accessor() == 5
+    assert accessor(AttrDict({"a": {"b": {"c": 7}}})) == 7
+
+
+def test_path_accessor_default_and_missing(sample_dict):
+    assert sample_dict.compile_path("a.b.x", default="default")() == "default"
+    with pytest.raises(KeyError):
+        sample_dict.compile_path("f.x")()
+
+
+def test_path_accessor_list_item():
+    d = AttrDict({"a": [{"b": 1}, {"b": 2}]})
+    assert d.compile_path("a.b")() == 1
+    assert d.compile_path("a.b", list_item=1)() == 2
+    with pytest.raises(KeyError):
+        d.compile_path("a.b", list_item=2)()
+    assert d.compile_path("a/b", split_delimiter="/")() == 1
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, 5, 7])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_path_accessor_matches_get_nested(depth, lazy):
+    keys = [f"k{i}" for i in range(depth)]
+    d: dict = {"leaf": 1}
+    for key in reversed(keys):
+        d = {key: d, "x": "s"}
+    cfg = Config.from_dict(d, lazy=lazy)
+
+    for path in [".".join(keys), ".".join(keys + ["leaf"]), ".".join(keys[:-1] + ["x", "y"])]:
+        accessor = cfg.compile_path(path, default="default")
+        assert accessor() == cfg.get_nested(path, "default")
+        assert type(accessor()) is type(cfg.get_nested(path, "default"))
+
+
+def test_get_many(sample_dict):
+    assert sample_dict.get_many(["a.b.c", "a.e", "f", "a.b.d"]) == {
+        "a.b.c": 1,
+        "a.e": 2,
+        "f": 3,
+        "a.b.d": None,
+    }
+    assert sample_dict.get_many(["f", "a.b.c", "f"], as_tuple=True) == (3, 1, 3)
+
+
+def test_get_many_defaults_and_missing(sample_dict):
+    result = sample_dict.get_many(["a.b.x", "x.y.z", "a.e"], defaults={"a.b.x": 0, "x.y.z": None})
+    assert result == {"a.b.x": 0, "x.y.z": None, "a.e": 2}
+    with pytest.raises(KeyError, match="Key not found: 'x'"):
+        sample_dict.get_many(["a.e", "a.b.x"], defaults={"a.e": 0})
+    with pytest.raises(KeyError, match="is not a nested dictionary"):
+        sample_dict.get_many(["f.x"])
+
+
+def test_get_many_list_item():
+    d = AttrDict({"a": [{"b": 1, "c": 2}, {"b": 3}]})
+    assert d.get_many(["a.b", "a.c"], as_tuple=True) == (1, 2)
+    assert d.get_many(["a.b"], list_item=1) == {"a.b": 3}
+    assert d.get_many(["a.c"], list_item=1, defaults={"a.c": "d"}) == {"a.c": "d"}
+
+
 if __name__ == "__main__":
     pytest.main(["-v", __file__])
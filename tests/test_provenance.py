@@ -1,3 +1,4 @@
+import gc
 import os
 import sys
 import tempfile
@@ -5,7 +6,13 @@ import pytest
 
 import pi_conf.config as config
 from pi_conf import Config
-from pi_conf.provenance import ProvenanceOp
+from pi_conf.provenance import (
+    Provenance,
+    ProvenanceHistory,
+    ProvenanceManager,
+    ProvenanceOp,
+    SamplingProvenanceManager,
+)
 
 basedir = os.path.abspath(os.getcwd())
 sys.path.append(basedir)
@@ -93,5 +100,205 @@ def test_provenance_from_load_config_twice():
         pm = config.get_pmanager()
         pm._provenance
 
+
+def test_provenance_stack_formatted_lazily():
+    p = Provenance("dict", ProvenanceOp.set)
+    assert p._stack is None
+    assert len(p.stack) <= 2
+    assert all("::" in frame for frame in p.stack)
+    assert p._frames is None
+
+
+def test_provenance_capture_frames_skips_pi_conf():
+    stack = ProvenanceManager.get_methods_that_called_this_method()
+    assert stack[-1].startswith("test_provenance.py::test_provenance_capture_frames_skips_pi_conf:")
+    assert not any(frame.startswith("provenance.py::") for frame in stack)
+
+
+def test_provenance_explicit_stack():
+    p = Provenance("dict", ProvenanceOp.set, stack=["a.py::f:1"])
+    assert p.stack == ("a.py::f:1",)
+    assert p.stack == ["a.py::f:1"] and ["a.py::f:1"] == p.stack
+    assert p.stack != ["b.py::f:1"] and not p.stack != ["a.py::f:1"]
+
+
+def test_provenance_is_immutable():
+    p = Provenance("dict", ProvenanceOp.set)
+    with pytest.raises(AttributeError):
+        p.source = "other"
+    assert not hasattr(p, "__dict__")
+
+
+def test_provenance_shares_identical_stacks():
+    def make():
+        return Provenance("".join(["di", "ct"]), ProvenanceOp.set)
+
+    p1, p2 = make(), make()
+    assert p1.source is p2.source
+    assert p1.stack is p2.stack
+
+
+def test_provenance_removed_when_config_collected():
+    pm = config.get_pmanager()
+    cfg = Config.from_dict({"a": 1})
+    oid = id(cfg)
+    assert oid in pm._enabled
+    del cfg
+    gc.collect()
+    assert oid not in pm._enabled
+    assert oid not in pm._provenance
+
+
+def test_provenance_manager_flat_across_create_destroy_cycles():
+    pm = config.get_pmanager()
+    gc.collect()
+    before = pm.footprint()
+    for i in range(10_000):
+        cfg = Config.from_dict({"a": i})
+        cfg.update({"b": i})
+    del cfg
+    gc.collect()
+    after = pm.footprint()
+    assert after["objects"] == before["objects"]
+    assert after["events"] == before["events"]
+
+
+def test_provenance_not_inherited_on_id_reuse():
+    pm = ProvenanceManager()
+
+    class Obj:
+        pass
+
+    obj = Obj()
+    pm.set_enabled(obj)
+    pm.append(obj, Provenance("old", ProvenanceOp.set))
+    oid = id(obj)
+    del obj
+    gc.collect()
+    assert oid not in pm._provenance
+    new_obj = Obj()
+    pm.set_enabled(new_obj)
+    assert len(pm.get(new_obj)) == 0
+
+
+def test_provenance_history_evicts_oldest_first():
+    history = ProvenanceHistory(maxlen=3)
+    for i in range(5):
+        history.append(Provenance(str(i), ProvenanceOp.update, stack=[]))
+    assert [p.source for p in history] == ["2", "3", "4"]
+    assert history[0].source == "2"
+    assert history[-1].source == "4"
+    assert [p.source for p in history[1:]] == ["3", "4"]
+    assert history.dropped == 2
+    history.set_maxlen(1)
+    assert [p.source for p in history] == ["4"]
+    assert history.dropped == 4
+
+
+def test_provenance_history_compares_equal_to_lists():
+    events = [Provenance(str(i), ProvenanceOp.update, stack=[]) for i in range(3)]
+    history = ProvenanceHistory(events, maxlen=2)
+    assert history == events[1:] and events[1:] == history
+    assert history == ProvenanceHistory(events[1:]) and history != events
+    cfg = Config.from_dict({"a": 1})
+    assert ProvenanceHistory() == [] and cfg.provenance == list(cfg.provenance)
+
+
+def test_provenance_manager_max_events_per_config():
+    pm = ProvenanceManager(max_events=2)
+    cfg = Config.from_dict({"a": 1})
+    pm.set_enabled(cfg)
+    for i in range(10):
+        pm.append(cfg, Provenance(str(i), ProvenanceOp.update, stack=[]))
+    assert len(pm.get(cfg)) == 2
+    assert pm.get(cfg).dropped == 8
+    pm.set_max_events(cfg, 5)
+    pm.append(cfg, Provenance("10", ProvenanceOp.update, stack=[]))
+    assert [p.source for p in pm.get(cfg)] == ["8", "9", "10"]
+    assert pm.footprint()["dropped"] == 8
+
+
+def test_sampling_provenance_every_n():
+    pm = SamplingProvenanceManager(sample_every=3)
+    obj = Config.from_dict({})
+    pm.set_enabled(obj)
+    for i in range(6):
+        pm.record(obj, str(i), ProvenanceOp.update)
+    history = pm.get(obj)
+    assert [p.source for p in history] == ["0", "1", "2", "3", "4", "5"]
+    assert [len(p.stack) > 0 for p in history] == [True, False, False, True, False, False]
+
+
+def test_sampling_provenance_first_k():
+    pm = SamplingProvenanceManager(sample_first=2)
+    obj = Config.from_dict({})
+    pm.set_enabled(obj)
+    for i in range(4):
+        pm.record(obj, str(i), ProvenanceOp.update)
+    assert [len(p.stack) > 0 for p in pm.get(obj)] == [True, True, False, False]
+
+
+def test_set_use_provenance_sampling():
+    from pi_conf import provenance
+
+    original = provenance.get_provenance_manager()
+    try:
+        provenance.set_use_provenance(sample_every=2)
+        assert isinstance(provenance.get_provenance_manager(), SamplingProvenanceManager)
+        cfg = Config.from_dict({"a": 1})
+        cfg.update({"b": 2})
+        assert [p.operation for p in cfg.provenance] == [ProvenanceOp.set, ProvenanceOp.update]
+    finally:
+        provenance._provenance_manager = original
+
+
+def test_set_use_provenance_rejects_sample_every_zero():
+    from pi_conf import provenance
+
+    original = provenance.get_provenance_manager()
+    try:
+        with pytest.raises(ValueError, match="sample_every must be at least 1"):
+            provenance.set_use_provenance(sample_every=0)
+    finally:
+        provenance._provenance_manager = original
+    with pytest.raises(TypeError):
+        SamplingProvenanceManager(_events_seen=5)  # type: ignore[call-arg]
+
+
+@pytest.fixture
+def indexed_provenance():
+    from pi_conf import provenance
+
+    original = provenance.get_provenance_manager()
+    provenance.set_use_provenance(index_keys=True)
+    yield provenance.get_provenance_manager()
+    provenance._provenance_manager = original
+
+
+def test_provenance_of_key(indexed_provenance, tmp_path):
+    path = tmp_path / "base.toml"
+    path.write_text("[db]\nhost = 'localhost'\npool_size = 5\n[cache]\nttl = 1\n")
+    cfg = config.load_config(str(path))
+    assert cfg.provenance_of("db.pool_size").source == str(path)
+
+    cfg.update({"cache": {"ttl": 2}})
+    assert cfg.provenance_of("cache.ttl").operation == ProvenanceOp.update
+    assert cfg.provenance_of("db.pool_size").source == str(path)
+
+    overlay = tmp_path / "overlay.toml"
+    overlay.write_text("[extra]\nflag = true\n")
+    cfg.load_config(str(overlay))
+    assert cfg.provenance_of("extra.flag").source == str(overlay)
+    assert cfg.provenance_of("db").source == str(path)
+
+    with pytest.raises(KeyError):
+        cfg.provenance_of("db.missing")
+
+
+def test_provenance_of_without_index():
+    cfg = Config.from_dict({"a": {"b": 1}})
+    assert cfg.provenance_of("a.b") is None
+
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,148 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from urllib.parse import urlsplit
+
+import pytest
+
+from pi_conf import load_config, remote
+
+
+class ConfigServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), ConfigHandler)
+        self.files = {"/config.json": (b'{"db": {"host": "h"}}', '"v1"')}
+        self.redirects: dict[str, str] = {}  ## path -> Location
+        self.statuses: list[int] = []
+        self.connections = 0
+        self.drop_idle = False  ## Close each connection without telling the client
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}{path}"
+
+
+class ConfigHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  ## Keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1  # type: ignore[attr-defined]
+
+    def do_GET(self):
+        server = self.server
+        path = urlsplit(self.path).path
+        if path in server.redirects:  # type: ignore[attr-defined]
+            self.reply(302, b"", location=server.redirects[path])  # type: ignore[attr-defined]
+            return
+        if path not in server.files:  # type: ignore[attr-defined]
+            self.reply(404, b"")
+            return
+        body, etag = server.files[path]  # type: ignore[attr-defined]
+        if self.headers.get("If-None-Match") == etag:
+            self.reply(304, b"", etag)
+        else:
+            self.reply(200, body, etag)
+        self.close_connection = server.drop_idle  # type: ignore[attr-defined]
+
+    def reply(self, status: int, body: bytes, etag: str = "", location: str = ""):
+        self.server.statuses.append(status)  # type: ignore[attr-defined]
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if location:
+            self.send_header("Location", location)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ConfigServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    previous = remote.get_remote_fetcher()
+    remote._remote_fetcher = remote.RemoteFetcher(timeout=5)
+    yield server
+    remote.get_remote_fetcher().close()
+    remote._remote_fetcher = previous
+    server.shutdown()
+    server.server_close()
+
+
+def test_load_remote_config_revalidates(server):
+    url = server.url("/config.json")
+
+    first = load_config(path=url)
+    second = load_config(path=url)
+
+    assert first == second == {"db": {"host": "h"}}
+    assert first is not second and first.db is not second.db
+    assert first.provenance[-1].source == url
+    assert server.statuses == [200, 304]
+    assert server.connections == 1
+    fetcher = remote.get_remote_fetcher()
+    assert (fetcher.hits, fetcher.misses) == (1, 1)
+
+
+def test_load_remote_config_sees_changes(server):
+    url = server.url("/config.json")
+    load_config(path=url)
+    server.files["/config.json"] = (b'{"db": {"host": "other"}}', '"v2"')
+
+    assert load_config(path=url).db.host == "other"
+    assert server.statuses == [200, 200]
+
+
+def test_load_remote_config_include(server):
+    server.files["/config.json"] = (b'{"db": {"host": "h"}, "cache": {"ttl": 1}}', '"v1"')
+
+    assert load_config(path=server.url("/config.json"), include=["cache"]) == {"cache": {"ttl": 1}}
+
+
+def test_load_remote_config_missing(server):
+    with pytest.raises(FileNotFoundError):
+        load_config(path=server.url("/missing.json"))
+    assert load_config(path=server.url("/missing.json"), ignore_warnings=True) == {}
+
+
+def test_load_remote_config_extension_ignores_query(server):
+    assert load_config(path=server.url("/config.json?v=1#top")) == {"db": {"host": "h"}}
+
+
+def test_load_remote_config_follows_redirects(server):
+    server.redirects = {"/old.json": server.url("/moved.json"), "/moved.json": "config.json"}
+    url = server.url("/old.json")
+
+    assert load_config(path=url) == {"db": {"host": "h"}}
+    assert load_config(path=url) == {"db": {"host": "h"}}
+    assert server.statuses == [302, 302, 200, 302, 302, 304]
+
+
+def test_load_remote_config_redirect_loop(server):
+    server.redirects = {"/a.json": "/b.json", "/b.json": "/a.json"}
+
+    with pytest.raises(OSError, match=f"more than {remote.MAX_REDIRECTS} redirects"):
+        load_config(path=server.url("/a.json"))
+    assert len(server.statuses) == remote.MAX_REDIRECTS + 1
+
+
+def test_remote_fetcher_reconnects_closed_connection(server):
+    server.drop_idle = True
+    fetcher = remote.get_remote_fetcher()
+    url = server.url("/config.json")
+
+    fetcher.fetch(url)
+    assert fetcher.fetch(url) == b'{"db": {"host": "h"}}'
+    assert server.statuses == [200, 304]
+    assert server.connections == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,154 @@
+import io
+import json
+
+import pytest
+
+from pi_conf import AttrDict, Config, load_config
+from pi_conf.attr_dict import _include_trie, _select
+from pi_conf.module_check import has_yaml
+from pi_conf.streaming import load_json, load_yaml
+
+JSON_DATA = {
+    "a": 1,
+    "b": {"c": [1, 2.5, {"d": None}], "e": 'quote" escape\\n é'},
+    "empty": {"list": [], "dict": {}},
+    "nested": [[1, [2]], []],
+    "numbers": [-1e-3, 12345678901234567890, 0, True, False],
+}
+
+YAML_TEXT = """
+base: &base
+  host: localhost
+  port: 1
+service:
+  <<: *base
+  port: 2
+values_list: [1, 2.0, yes, null, 2020-01-01, "<<"]
+"<<": literal
+tagged: !!str 12
+multi: |
+  line1
+  line2
+shared: *base
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_load_json_matches_json_load(chunk_size, indent):
+    text = json.dumps(JSON_DATA, indent=indent, ensure_ascii=indent is None)
+    d = load_json(io.StringIO(text), chunk_size=chunk_size)
+
+    assert d == JSON_DATA
+    assert isinstance(d.b, AttrDict)
+    assert d.b.c[2].d is None
+
+
+def test_load_json_long_strings_span_chunks():
+    value = 'a\\"b\\\\' * 500 + "\u00e9"
+    text = json.dumps({"s": value, "t": [value]})
+    d = load_json(io.StringIO(text), chunk_size=7)
+    assert d.s == value and d.t == [value]
+
+
+@pytest.mark.parametrize(
+    "text, match",
+    [
+        ('{"items": 1}', "overwrite a default dict attr"),
+        ("[1, 2]", "must be a mapping"),
+        ('{"a": {"b": 1}', "not closed"),
+        ("{1: 2}", "property name"),
+        ('{"a" 1 "b" 2}', "expecting ':' delimiter"),
+        ('{"a": 1 "b": 2}', "expecting ',' delimiter"),
+        ('{"a": [1 2]}', "expecting ',' delimiter"),
+        ('{"a": 1,}', "trailing comma before end of object"),
+        ('{"a": [1,]}', "trailing comma before end of array"),
+        ('{"a": [1}', "expecting ',' delimiter"),
+        ('{"a":: 1}', "expecting value"),
+        ('{"a": 1}}', "extra data"),
+        ("", "config is empty"),
+        (" \n", "config is empty"),
+    ],
+)
+def test_load_json_errors(text, match):
+    with pytest.raises(ValueError, match=match):
+        load_json(io.StringIO(text), chunk_size=2)
+
+
+@pytest.mark.skipif(not has_yaml, reason="pyyaml not installed")
+def test_load_yaml_matches_safe_load():
+    import yaml
+
+    d = load_yaml(io.StringIO(YAML_TEXT))
+
+    assert d == yaml.safe_load(YAML_TEXT)
+    assert d.service.host == "localhost" and d.service.port == 2
+    assert isinstance(d.shared, AttrDict)
+
+
+
+@pytest.mark.skipif(not has_yaml, reason="pyyaml not installed")
+@pytest.mark.parametrize("include", [None, ["base", "other", "listed", "merged"]])
+def test_load_yaml_aliases_are_copies(tmp_path, include):
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "base: &b {x: 1, n: {l: [{y: 2}]}}\nother: *b\nlisted: [*b]\nmerged:\n  <<: *b\n"
+    )
+
+    cfg = load_config(path=str(path), stream=True, include=include)
+    cfg.base.x = 99
+    cfg.base.n.l[0].y = 99
+
+    for alias in (cfg.other, cfg.listed[0], cfg.merged):
+        assert alias == {"x": 1, "n": {"l": [{"y": 2}]}}
+    assert cfg.other.n is not cfg.merged.n
+
+@pytest.mark.skipif(not has_yaml, reason="pyyaml not installed")
+def test_load_yaml_rejects_multiple_documents():
+    with pytest.raises(ValueError, match="single document"):
+        load_yaml(io.StringIO("a: 1\n---\nb: 2\n"))
+
+
+@pytest.mark.parametrize("ext", [".json", ".yaml"])
+def test_load_config_stream(tmp_path, ext):
+    if ext == ".yaml" and not has_yaml:
+        pytest.skip("pyyaml not installed")
+    path = tmp_path / f"config{ext}"
+    path.write_text(json.dumps({"db": {"host": "h", "ports": [1, 2]}}))  ## JSON is YAML
+
+    cfg = load_config(path=str(path), stream=True)
+
+    assert isinstance(cfg, Config)
+    assert cfg.db.ports == [1, 2]
+    assert cfg == load_config(path=str(path))
+    assert cfg.provenance[-1].source == str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 16])
+def test_load_json_include(chunk_size):
+    text = json.dumps(JSON_DATA)
+    include = _include_trie(["b.c", "empty.dict", "nested.x", "missing"])
+
+    d = load_json(io.StringIO(text), chunk_size=chunk_size, include=include)
+
+    assert d == _select(JSON_DATA, include)
+    assert d == {"b": {"c": JSON_DATA["b"]["c"]}, "empty": {"dict": {}}}
+    assert isinstance(d.b.c[2], AttrDict)
+
+
+@pytest.mark.skipif(not has_yaml, reason="pyyaml not installed")
+@pytest.mark.parametrize(
+    "paths", [["service"], ["service.host"], ["shared.port", "values_list"], ["base.nope"]]
+)
+def test_load_yaml_include(paths):
+    import yaml
+
+    include = _include_trie(paths)
+    d = load_yaml(io.StringIO(YAML_TEXT), include=include)
+
+    assert d == _select(yaml.safe_load(YAML_TEXT), include)
+    assert all(isinstance(v, AttrDict) for v in d.values() if isinstance(v, dict))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])